@@ -0,0 +1,42 @@
+"""Composite indexes for the assessment and audit log filter paths
+
+Revision ID: 0001_hot_path_indexes
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+Databases created by init_db.py (Base.metadata.create_all) already carry these
+indexes, so every index is created with IF NOT EXISTS.
+
+This is the base revision: it expects the original schema. Model changes that
+predate it (users.job_role_id, assessment_summaries) are added by
+0007_user_job_role and 0008_assessment_summaries.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_hot_path_indexes"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_assessments_candidate_status_created", "assessments", ["candidate_id", "status", "created_at"]),
+    ("ix_assessments_job_role_id", "assessments", ["job_role_id"]),
+    ("ix_assessment_items_assessment_order", "assessment_items", ["assessment_id", "order_index"]),
+    ("ix_assessment_items_game_id", "assessment_items", ["game_id"]),
+    ("ix_audit_logs_actor_created", "audit_logs", ["actor_user_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
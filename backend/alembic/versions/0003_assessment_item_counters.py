@@ -0,0 +1,62 @@
+"""Running item counters on assessments
+
+Revision ID: 0003_assessment_item_counters
+Revises: 0002_catalog_versions
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_assessment_item_counters"
+down_revision: Union[str, None] = "0002_catalog_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = [
+    ("items_total", sa.Integer(), "0"),
+    ("items_submitted", sa.Integer(), "0"),
+    ("items_scored", sa.Integer(), "0"),
+    ("score_sum", sa.Float(), "0"),
+]
+
+
+def upgrade() -> None:
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("assessments")}
+    for name, type_, default in COLUMNS:
+        if name not in existing:
+            op.add_column("assessments", sa.Column(name, type_, nullable=True, server_default=default))
+
+    # Backfill from the items already stored
+    op.execute("""
+        UPDATE assessments SET
+            items_total = (
+                SELECT COUNT(*) FROM assessment_items
+                WHERE assessment_items.assessment_id = assessments.id
+            ),
+            items_submitted = (
+                SELECT COUNT(*) FROM assessment_items
+                WHERE assessment_items.assessment_id = assessments.id
+                AND assessment_items.status = 'SUBMITTED'
+            ),
+            items_scored = (
+                SELECT COUNT(*) FROM assessment_items
+                WHERE assessment_items.assessment_id = assessments.id
+                AND assessment_items.status = 'SUBMITTED' AND assessment_items.score IS NOT NULL
+            ),
+            score_sum = (
+                SELECT COALESCE(SUM(assessment_items.score), 0) FROM assessment_items
+                WHERE assessment_items.assessment_id = assessments.id
+                AND assessment_items.status = 'SUBMITTED'
+            )
+    """)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("assessments") as batch_op:
+        for name, _, _ in reversed(COLUMNS):
+            batch_op.drop_column(name)
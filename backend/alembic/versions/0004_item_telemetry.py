@@ -0,0 +1,40 @@
+"""Packed per-trial telemetry for assessment items
+
+Revision ID: 0004_item_telemetry
+Revises: 0003_assessment_item_counters
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_item_telemetry"
+down_revision: Union[str, None] = "0003_assessment_item_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("item_telemetry"):
+        return
+    op.create_table(
+        "item_telemetry",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("assessment_item_id", sa.String(), sa.ForeignKey("assessment_items.id"), nullable=True),
+        sa.Column("format_version", sa.Integer(), nullable=True),
+        sa.Column("trial_count", sa.Integer(), nullable=True),
+        sa.Column("data", sa.LargeBinary(), nullable=True),
+        sa.Column("aggregates", sa.JSON(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_item_telemetry_assessment_item_id", "item_telemetry", ["assessment_item_id"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_telemetry_assessment_item_id", table_name="item_telemetry")
+    op.drop_table("item_telemetry")
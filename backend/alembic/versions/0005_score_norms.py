@@ -0,0 +1,41 @@
+"""Score norm buckets for percentile ranks
+
+Revision ID: 0005_score_norms
+Revises: 0004_item_telemetry
+Create Date: 2026-10-17 00:00:00.000000
+
+Bucket keys are computed in Python; run rebuild_norms.py after upgrading to
+count the items already submitted.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_score_norms"
+down_revision: Union[str, None] = "0004_item_telemetry"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("score_norm_buckets"):
+        return
+    op.create_table(
+        "score_norm_buckets",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("game_id", sa.String(), sa.ForeignKey("games.id"), nullable=True),
+        sa.Column("job_role_id", sa.String(), sa.ForeignKey("job_roles.id"), nullable=True),
+        sa.Column("bucket", sa.Integer(), nullable=True),
+        sa.Column("count", sa.Integer(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("game_id", "job_role_id", "bucket"),
+    )
+    op.create_index("ix_score_norm_buckets_game_id", "score_norm_buckets", ["game_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_score_norm_buckets_game_id", table_name="score_norm_buckets")
+    op.drop_table("score_norm_buckets")
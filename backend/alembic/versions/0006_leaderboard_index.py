@@ -0,0 +1,31 @@
+"""Index for per-job-role leaderboards
+
+Revision ID: 0006_leaderboard_index
+Revises: 0005_score_norms
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_leaderboard_index"
+down_revision: Union[str, None] = "0005_score_norms"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_assessments_job_role_score",
+        "assessments",
+        ["job_role_id", sa.text("total_score DESC")],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assessments_job_role_score", table_name="assessments", if_exists=True)
@@ -0,0 +1,36 @@
+"""Job role assigned to candidate users
+
+Revision ID: 0007_user_job_role
+Revises: 0006_leaderboard_index
+Create Date: 2026-10-17 00:00:00.000000
+
+Databases created by init_db.py after the column was added to the model
+already have it, so the column and its index are only added when missing.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_user_job_role"
+down_revision: Union[str, None] = "0006_leaderboard_index"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    existing = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("users")}
+    if "job_role_id" not in existing:
+        with op.batch_alter_table("users") as batch_op:
+            batch_op.add_column(sa.Column("job_role_id", sa.String(), nullable=True))
+            batch_op.create_foreign_key("fk_users_job_role_id", "job_roles", ["job_role_id"], ["id"])
+    op.create_index("ix_users_job_role_id", "users", ["job_role_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_job_role_id", table_name="users", if_exists=True)
+    with op.batch_alter_table("users") as batch_op:
+        batch_op.drop_constraint("fk_users_job_role_id", type_="foreignkey")
+        batch_op.drop_column("job_role_id")
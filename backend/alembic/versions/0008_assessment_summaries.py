@@ -0,0 +1,105 @@
+"""Per-tenant / per-job-role assessment summaries
+
+Revision ID: 0008_assessment_summaries
+Revises: 0007_user_job_role
+Create Date: 2026-10-17 00:00:00.000000
+
+The table is filled from the assessments already stored when it is empty
+(rebuild_analytics.py recomputes it at any time).
+"""
+import uuid
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_assessment_summaries"
+down_revision: Union[str, None] = "0007_user_job_role"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+summaries = sa.table(
+    "assessment_summaries",
+    sa.column("id", sa.String()),
+    sa.column("tenant_id", sa.String()),
+    sa.column("job_role_id", sa.String()),
+    sa.column("total_assessments", sa.Integer()),
+    sa.column("in_progress_assessments", sa.Integer()),
+    sa.column("completed_assessments", sa.Integer()),
+    sa.column("scored_assessments", sa.Integer()),
+    sa.column("score_sum", sa.Float()),
+)
+assessments = sa.table(
+    "assessments",
+    sa.column("id", sa.String()),
+    sa.column("tenant_id", sa.String()),
+    sa.column("job_role_id", sa.String()),
+    sa.column("status", sa.String()),
+    sa.column("total_score", sa.Float()),
+)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if not sa.inspect(bind).has_table("assessment_summaries"):
+        _create_table()
+    if bind.execute(sa.select(sa.func.count()).select_from(summaries)).scalar():
+        return
+    _backfill(bind)
+
+
+def _backfill(bind) -> None:
+    """Same aggregation as analytics.rebuild_summaries"""
+    completed = assessments.c.status == "COMPLETED"
+    rows = bind.execute(
+        sa.select(
+            assessments.c.tenant_id,
+            assessments.c.job_role_id,
+            sa.func.count(assessments.c.id),
+            sa.func.sum(sa.case((assessments.c.status == "IN_PROGRESS", 1), else_=0)),
+            sa.func.sum(sa.case((completed, 1), else_=0)),
+            sa.func.sum(sa.case((completed & assessments.c.total_score.isnot(None), 1), else_=0)),
+            sa.func.sum(sa.case((completed, assessments.c.total_score), else_=None)),
+        ).group_by(assessments.c.tenant_id, assessments.c.job_role_id)
+    ).all()
+    if rows:
+        op.bulk_insert(summaries, [
+            {
+                "id": str(uuid.uuid4()),
+                "tenant_id": tenant_id,
+                "job_role_id": job_role_id,
+                "total_assessments": total,
+                "in_progress_assessments": in_progress or 0,
+                "completed_assessments": completed_count or 0,
+                "scored_assessments": scored or 0,
+                "score_sum": score_sum or 0.0,
+            }
+            for tenant_id, job_role_id, total, in_progress, completed_count, scored, score_sum in rows
+        ])
+
+
+def _create_table() -> None:
+    op.create_table(
+        "assessment_summaries",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("tenant_id", sa.String(), sa.ForeignKey("tenants.id"), nullable=True),
+        sa.Column("job_role_id", sa.String(), sa.ForeignKey("job_roles.id"), nullable=True),
+        sa.Column("total_assessments", sa.Integer(), nullable=True),
+        sa.Column("in_progress_assessments", sa.Integer(), nullable=True),
+        sa.Column("completed_assessments", sa.Integer(), nullable=True),
+        sa.Column("scored_assessments", sa.Integer(), nullable=True),
+        sa.Column("score_sum", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint("tenant_id", "job_role_id"),
+    )
+    op.create_index("ix_assessment_summaries_tenant_id", "assessment_summaries", ["tenant_id"])
+    op.create_index("ix_assessment_summaries_job_role_id", "assessment_summaries", ["job_role_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_assessment_summaries_job_role_id", table_name="assessment_summaries")
+    op.drop_index("ix_assessment_summaries_tenant_id", table_name="assessment_summaries")
+    op.drop_table("assessment_summaries")
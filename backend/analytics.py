@@ -0,0 +1,233 @@
+"""
+Admin dashboard analytics
+
+Assessment counts and scores are kept in the assessment_summaries table, one
+row per (tenant, job role), which is updated incrementally whenever an
+assessment changes state. Overview counts are served from an in-process
+snapshot so that dashboard polling does not hit the database on every request.
+The snapshot is dropped once a transaction that changed a summary commits, and
+a snapshot computed while that happened is not stored.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional
+from sqlalchemy import event, func, case, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import User, Assessment, AssessmentSummary, JobRole
+
+# Seconds an overview snapshot is served before it is recomputed (0 disables caching)
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "30"))
+
+_overview_lock = threading.Lock()
+_overview_snapshot: Optional[Dict[str, Any]] = None
+_overview_expires_at = 0.0
+_overview_generation = 0  # Bumped by every invalidation
+
+_STALE_KEY = "analytics_overview_stale"
+
+_COUNTER_COLUMNS = (
+    "total_assessments",
+    "in_progress_assessments",
+    "completed_assessments",
+    "scored_assessments",
+    "score_sum"
+)
+
+class AssessmentState(NamedTuple):
+    """The parts of an assessment that contribute to its summary row"""
+    tenant_id: Optional[str]
+    job_role_id: Optional[str]
+    status: Optional[str]
+    total_score: Optional[float]
+
+def assessment_state(assessment: Assessment) -> AssessmentState:
+    """Capture an assessment's current contribution to the summaries"""
+    return AssessmentState(
+        assessment.tenant_id,
+        assessment.job_role_id,
+        assessment.status,
+        assessment.total_score
+    )
+
+def _contribution(state: Optional[AssessmentState]) -> Dict[str, float]:
+    if state is None:
+        return {}
+
+    contribution = {"total_assessments": 1}
+    if state.status == 'IN_PROGRESS':
+        contribution["in_progress_assessments"] = 1
+    elif state.status == 'COMPLETED':
+        contribution["completed_assessments"] = 1
+        if state.total_score is not None:
+            contribution["scored_assessments"] = 1
+            contribution["score_sum"] = state.total_score
+    return contribution
+
+def record_assessment_change(db: Session, before: Optional[AssessmentState], after: Optional[AssessmentState]):
+    """
+    Apply an assessment state transition to the summary table.
+
+    Pass before=None for a newly created assessment and after=None for a
+    deleted one. The change is flushed into the caller's transaction and is
+    committed (or rolled back) together with the assessment itself; the
+    overview snapshot is dropped once it commits.
+    """
+    deltas: Dict[tuple, Dict[str, float]] = {}
+    for state, sign in ((before, -1), (after, 1)):
+        if state is None:
+            continue
+        key = (state.tenant_id, state.job_role_id)
+        for column, value in _contribution(state).items():
+            deltas.setdefault(key, {})
+            deltas[key][column] = deltas[key].get(column, 0) + sign * value
+
+    for (tenant_id, job_role_id), columns in deltas.items():
+        columns = {column: value for column, value in columns.items() if value}
+        if columns:
+            _apply_summary_delta(db, tenant_id, job_role_id, columns)
+
+    db.info[_STALE_KEY] = True
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    if session.info.pop(_STALE_KEY, False):
+        invalidate_overview()
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_stale(session: Session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_STALE_KEY, None)
+
+def _apply_summary_delta(db: Session, tenant_id: Optional[str], job_role_id: Optional[str], columns: Dict[str, float]):
+    """Increment the counters of one summary row, creating the row if needed"""
+    summary_filter = (
+        AssessmentSummary.tenant_id == tenant_id,
+        AssessmentSummary.job_role_id == job_role_id
+    )
+    values = {getattr(AssessmentSummary, column): getattr(AssessmentSummary, column) + value for column, value in columns.items()}
+
+    updated = db.query(AssessmentSummary).filter(*summary_filter).update(values, synchronize_session=False)
+    if updated:
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(AssessmentSummary(
+                tenant_id=tenant_id,
+                job_role_id=job_role_id,
+                **{column: columns.get(column, 0) for column in _COUNTER_COLUMNS}
+            ))
+    except IntegrityError:
+        # Another request created the row first; apply the delta to it instead
+        db.query(AssessmentSummary).filter(*summary_filter).update(values, synchronize_session=False)
+
+def rebuild_summaries(db: Session) -> int:
+    """Recompute every summary row from the assessments table; returns the row count"""
+    rows = db.query(
+        Assessment.tenant_id,
+        Assessment.job_role_id,
+        func.count(Assessment.id),
+        func.sum(case((Assessment.status == 'IN_PROGRESS', 1), else_=0)),
+        func.sum(case((Assessment.status == 'COMPLETED', 1), else_=0)),
+        func.sum(case(((Assessment.status == 'COMPLETED') & Assessment.total_score.isnot(None), 1), else_=0)),
+        func.sum(case((Assessment.status == 'COMPLETED', Assessment.total_score), else_=None))
+    ).group_by(Assessment.tenant_id, Assessment.job_role_id).all()
+
+    db.query(AssessmentSummary).delete(synchronize_session=False)
+    for tenant_id, job_role_id, total, in_progress, completed, scored, score_sum in rows:
+        db.add(AssessmentSummary(
+            tenant_id=tenant_id,
+            job_role_id=job_role_id,
+            total_assessments=total,
+            in_progress_assessments=in_progress or 0,
+            completed_assessments=completed or 0,
+            scored_assessments=scored or 0,
+            score_sum=score_sum or 0.0
+        ))
+    db.commit()
+
+    invalidate_overview()
+    return len(rows)
+
+def get_job_role_breakdown(db: Session, tenant_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Per-job-role completion and average score, read from the summary table"""
+    query = db.query(
+        AssessmentSummary.job_role_id,
+        JobRole.title,
+        func.sum(AssessmentSummary.total_assessments),
+        func.sum(AssessmentSummary.in_progress_assessments),
+        func.sum(AssessmentSummary.completed_assessments),
+        func.sum(AssessmentSummary.scored_assessments),
+        func.sum(AssessmentSummary.score_sum)
+    ).outerjoin(JobRole, JobRole.id == AssessmentSummary.job_role_id)
+
+    if tenant_id:
+        query = query.filter(AssessmentSummary.tenant_id == tenant_id)
+
+    result = []
+    for job_role_id, title, total, in_progress, completed, scored, score_sum in query.group_by(
+        AssessmentSummary.job_role_id, JobRole.title
+    ).all():
+        result.append({
+            "job_role_id": job_role_id,
+            "job_role_title": title,
+            "total_assessments": total or 0,
+            "in_progress_assessments": in_progress or 0,
+            "completed_assessments": completed or 0,
+            "completion_rate": (completed or 0) / total if total else 0,
+            "average_score": score_sum / scored if scored else None
+        })
+    return result
+
+def compute_overview(db: Session) -> Dict[str, Any]:
+    """Compute the dashboard overview counts in two queries"""
+    is_candidate = func.lower(User.role) == 'candidate'
+
+    total_candidates, active_candidates, total_job_roles = db.query(
+        func.sum(case((is_candidate, 1), else_=0)),
+        func.sum(case((is_candidate & (User.is_active == True), 1), else_=0)),
+        select(func.count(JobRole.id)).scalar_subquery()
+    ).one()
+
+    total_assessments, completed_assessments = db.query(
+        func.sum(AssessmentSummary.total_assessments),
+        func.sum(AssessmentSummary.completed_assessments)
+    ).one()
+
+    return {
+        "total_candidates": total_candidates or 0,
+        "active_candidates": active_candidates or 0,
+        "total_assessments": total_assessments or 0,
+        "completed_assessments": completed_assessments or 0,
+        "total_job_roles": total_job_roles or 0
+    }
+
+def get_overview(db: Session) -> Dict[str, Any]:
+    """Return the cached overview snapshot, recomputing it once the TTL has passed"""
+    global _overview_snapshot, _overview_expires_at
+
+    with _overview_lock:
+        if _overview_snapshot is not None and time.monotonic() < _overview_expires_at:
+            return dict(_overview_snapshot)
+        generation = _overview_generation
+
+    snapshot = compute_overview(db)
+
+    with _overview_lock:
+        # Don't cache counts read before an invalidation that happened meanwhile
+        if generation == _overview_generation:
+            _overview_snapshot = snapshot
+            _overview_expires_at = time.monotonic() + ANALYTICS_CACHE_TTL_SECONDS
+
+    return dict(snapshot)
+
+def invalidate_overview():
+    """Drop the cached overview so the next request recomputes it"""
+    global _overview_snapshot, _overview_generation
+
+    with _overview_lock:
+        _overview_snapshot = None
+        _overview_generation += 1
@@ -0,0 +1,202 @@
+"""
+Buffered writer for audit_logs
+
+Endpoints used to add an AuditLog row and commit it on the request path. Entries
+are now queued in memory and written by a background task with one bulk INSERT
+per batch, either once AUDIT_BATCH_SIZE entries are pending or every
+AUDIT_FLUSH_INTERVAL_SECONDS. If more than AUDIT_MAX_PENDING entries pile up
+(the database is slow or down), the request that hits the limit waits for a
+flush itself; if that flush fails the buffer is spilled to AUDIT_FALLBACK_PATH
+rather than failing the request. On shutdown the buffer is flushed; entries
+that cannot be written are appended to AUDIT_FALLBACK_PATH and replayed on the
+next startup. Entries that cannot be spilled either are counted as dropped.
+
+Endpoints whose audit entry must commit atomically with their own changes use
+add() instead, which puts the row in the caller's transaction.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import AsyncSessionLocal
+from models import AuditLog, generate_uuid
+
+logger = logging.getLogger(__name__)
+
+# Pending entries that trigger an immediate flush
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "100"))
+
+# Maximum seconds an entry waits in the buffer
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1"))
+
+# Pending entries at which callers block on a flush instead of just queueing
+AUDIT_MAX_PENDING = int(os.getenv("AUDIT_MAX_PENDING", "10000"))
+
+# JSON lines file for entries that could not be written at shutdown
+AUDIT_FALLBACK_PATH = os.getenv("AUDIT_FALLBACK_PATH", "audit_fallback.jsonl")
+
+_lock = threading.Lock()
+_pending: deque = deque()
+_flush_lock: Optional[asyncio.Lock] = None
+_flush_requested: Optional[asyncio.Event] = None
+_stats = {
+    "enqueued": 0,
+    "written": 0,
+    "flushes": 0,
+    "failed_flushes": 0,
+    "backpressure_waits": 0,
+    "fallback_written": 0,
+    "fallback_replayed": 0,
+    "dropped": 0,
+    "max_pending_seen": 0
+}
+
+def _get_flush_lock() -> asyncio.Lock:
+    global _flush_lock
+    if _flush_lock is None:
+        _flush_lock = asyncio.Lock()
+    return _flush_lock
+
+def _entry(actor_user_id: str, action: str, target_type: str, target_id: str, payload: dict = None) -> Dict[str, Any]:
+    return {
+        "id": generate_uuid(),
+        "actor_user_id": actor_user_id,
+        "action": action,
+        "target_type": target_type,
+        "target_id": target_id,
+        "payload_json": payload or {},
+        "created_at": datetime.utcnow()
+    }
+
+def add(db: AsyncSession, actor_user_id: str, action: str, target_type: str, target_id: str, payload: dict = None):
+    """Add an audit entry to db's pending transaction so it commits with the caller's changes"""
+    db.add(AuditLog(**_entry(actor_user_id, action, target_type, target_id, payload)))
+
+async def record(actor_user_id: str, action: str, target_type: str, target_id: str, payload: dict = None):
+    """Queue an audit entry; it is written by the next flush"""
+    entry = _entry(actor_user_id, action, target_type, target_id, payload)
+    with _lock:
+        _pending.append(entry)
+        pending = len(_pending)
+        _stats["enqueued"] += 1
+        _stats["max_pending_seen"] = max(_stats["max_pending_seen"], pending)
+
+    if pending >= AUDIT_MAX_PENDING:
+        with _lock:
+            _stats["backpressure_waits"] += 1
+        try:
+            await flush()
+        except Exception:
+            # The caller's own changes are already committed; don't fail it over the audit log
+            logger.exception("Error flushing audit log under backpressure")
+            _spill_pending()
+    elif pending >= AUDIT_BATCH_SIZE and _flush_requested is not None:
+        _flush_requested.set()
+
+def _take(limit: int) -> List[Dict[str, Any]]:
+    with _lock:
+        return [_pending.popleft() for _ in range(min(limit, len(_pending)))]
+
+def _requeue(entries: List[Dict[str, Any]]):
+    with _lock:
+        _pending.extendleft(reversed(entries))
+
+async def flush() -> int:
+    """Write all pending entries in batches of AUDIT_BATCH_SIZE, returning the count written"""
+    written = 0
+    async with _get_flush_lock():
+        while True:
+            entries = _take(AUDIT_BATCH_SIZE)
+            if not entries:
+                break
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(AuditLog), entries)
+                    await db.commit()
+            except Exception:
+                _requeue(entries)
+                with _lock:
+                    _stats["failed_flushes"] += 1
+                raise
+            written += len(entries)
+            with _lock:
+                _stats["written"] += len(entries)
+                _stats["flushes"] += 1
+    return written
+
+async def run_flush_loop():
+    """Background task that flushes the buffer on size or time thresholds"""
+    global _flush_requested
+    _flush_requested = asyncio.Event()
+    while True:
+        try:
+            await asyncio.wait_for(_flush_requested.wait(), timeout=AUDIT_FLUSH_INTERVAL_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        _flush_requested.clear()
+        try:
+            await flush()
+        except Exception:
+            logger.exception("Error flushing audit log")
+
+def _encode(entry: Dict[str, Any]) -> str:
+    return json.dumps({**entry, "created_at": entry["created_at"].isoformat()})
+
+def _decode(line: str) -> Dict[str, Any]:
+    entry = json.loads(line)
+    entry["created_at"] = datetime.fromisoformat(entry["created_at"])
+    return entry
+
+def _spill_pending():
+    """Move every pending entry to the fallback file, counting them as dropped if it cannot be written"""
+    entries = _take(len(_pending))
+    if not entries:
+        return
+    try:
+        with open(AUDIT_FALLBACK_PATH, "a") as f:
+            for entry in entries:
+                f.write(_encode(entry) + "\n")
+    except OSError:
+        logger.exception("Error writing audit log fallback file; dropping %d entries", len(entries))
+        with _lock:
+            _stats["dropped"] += len(entries)
+        return
+    with _lock:
+        _stats["fallback_written"] += len(entries)
+
+async def shutdown():
+    """Flush on shutdown, spilling unwritten entries to the fallback file"""
+    try:
+        await flush()
+    except Exception:
+        logger.exception("Error flushing audit log at shutdown")
+    _spill_pending()
+
+def replay_fallback():
+    """Queue entries spilled by a previous shutdown and remove the fallback file"""
+    if not os.path.exists(AUDIT_FALLBACK_PATH):
+        return
+    with open(AUDIT_FALLBACK_PATH) as f:
+        entries = [_decode(line) for line in f if line.strip()]
+    with _lock:
+        _pending.extendleft(reversed(entries))
+        _stats["fallback_replayed"] += len(entries)
+    os.remove(AUDIT_FALLBACK_PATH)
+
+def stats() -> Dict[str, Any]:
+    """Buffer depth and flush counters for this worker"""
+    with _lock:
+        return {
+            "pending": len(_pending),
+            "batch_size": AUDIT_BATCH_SIZE,
+            "flush_interval_seconds": AUDIT_FLUSH_INTERVAL_SECONDS,
+            "max_pending": AUDIT_MAX_PENDING,
+            **_stats
+        }
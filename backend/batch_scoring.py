@@ -0,0 +1,189 @@
+"""
+Vectorized scoring for many game results at once
+
+Mirrors the per-item functions in routers.games (score_nback_game,
+score_stroop_game, score_reaction_time_game) over columnar NumPy arrays, for
+re-scoring stored results in bulk. Every arithmetic step is performed in the
+same order and precision as the per-item code, and min/max/thresholds use the
+same comparisons, so the results are bit-for-bit identical. Feedback strings
+are per-item text and are only built on request (BatchScores.feedback()).
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping
+import numpy as np
+
+PERFORMANCE_LEVELS = np.array(["Excellent", "Good", "Average", "Needs Improvement"], dtype=object)
+
+# Metric columns used by each game and the defaults the per-item functions apply
+GAME_METRIC_DEFAULTS: Dict[str, Dict[str, float]] = {
+    "NBACK": {
+        "correct_responses": 0,
+        "incorrect_responses": 0,
+        "misses": 0,
+        "false_positives": 0,
+        "total_trials": 1
+    },
+    "STROOP": {
+        "correct_responses": 0,
+        "incorrect_responses": 0,
+        "average_response_time": 1000,
+        "total_trials": 1
+    },
+    "REACTION_TIME": {
+        "average_response_time": 500,
+        "correct_responses": 0,
+        "incorrect_responses": 0,
+        "total_trials": 1
+    }
+}
+
+class BatchScores:
+    """Columnar scoring results; index i corresponds to input row i"""
+
+    def __init__(self, game_code: str, score: np.ndarray, normalized_score: np.ndarray,
+                 trait_scores: Dict[str, np.ndarray], performance_level: np.ndarray,
+                 accuracy: np.ndarray, average_response_time: np.ndarray = None):
+        self.game_code = game_code
+        self.score = score
+        self.normalized_score = normalized_score
+        self.trait_scores = trait_scores
+        self.performance_level = performance_level
+        self.accuracy = accuracy
+        self.average_response_time = average_response_time
+
+    def __len__(self) -> int:
+        return len(self.score)
+
+    def _feedback(self, i: int, level: str) -> str:
+        accuracy = self.accuracy[i].item()
+        if self.game_code == "NBACK":
+            return f"Accuracy: {accuracy:.1%}, Memory performance: {level.lower()}"
+        rt = self.average_response_time[i].item()
+        if self.game_code == "STROOP":
+            return f"Accuracy: {accuracy:.1%}, Avg response time: {rt:.0f}ms, Attention performance: {level.lower()}"
+        return f"Avg reaction time: {rt:.0f}ms, Accuracy: {accuracy:.1%}, Processing speed: {level.lower()}"
+
+    def feedback(self) -> List[str]:
+        """Feedback text per row, formatted exactly as the per-item functions do"""
+        return [self._feedback(i, level) for i, level in enumerate(self.performance_level)]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """Row i in the shape of GameScoreResponse"""
+        return {
+            "score": self.score[i].item(),
+            "normalized_score": self.normalized_score[i].item(),
+            "trait_scores": {trait: values[i].item() for trait, values in self.trait_scores.items()},
+            "feedback": self._feedback(i, self.performance_level[i]),
+            "performance_level": self.performance_level[i]
+        }
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+def _column(key: str, values: Any) -> np.ndarray:
+    """
+    values as a float64 column. Only real ints and floats are accepted: NumPy
+    would turn None into nan and "900" into 900.0, where the per-item functions
+    raise TypeError, so anything else is a ValueError rather than a silent score.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "iuf":
+        return values.astype(np.float64, copy=False)
+    values = list(values)
+    for value in values:
+        if not _is_number(value):
+            raise ValueError(f"Metric {key!r} must be a number, got {type(value).__name__}")
+    return np.array(values, dtype=np.float64)
+
+def columns_from_metrics(game_code: str, metrics: Iterable[Mapping[str, Any]]) -> Dict[str, np.ndarray]:
+    """Build the metric columns for game_code from per-item metrics dicts, applying the defaults"""
+    defaults = GAME_METRIC_DEFAULTS[game_code]
+    rows = list(metrics)
+    return {
+        key: _column(key, [m.get(key, default) for m in rows])
+        for key, default in defaults.items()
+    }
+
+def _columns(game_code: str, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+    defaults = GAME_METRIC_DEFAULTS[game_code]
+    arrays = {key: _column(key, columns[key]) for key in defaults if key in columns}
+    if not arrays:
+        raise ValueError("At least one metric column is required")
+    n = len(next(iter(arrays.values())))
+    if any(len(a) != n for a in arrays.values()):
+        raise ValueError("Metric columns must have the same length")
+    for key, default in defaults.items():
+        if key not in arrays:
+            arrays[key] = np.full(n, default, dtype=np.float64)
+    return arrays
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    """numerator / denominator where denominator > 0, else 0"""
+    out = np.zeros_like(numerator)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+def _max(low: float, values: np.ndarray) -> np.ndarray:
+    """Element-wise max(low, value) with Python's semantics (value only if value > low)"""
+    return np.where(values > low, values, low)
+
+def _min(high: float, values: np.ndarray) -> np.ndarray:
+    """Element-wise min(high, value) with Python's semantics (value only if value < high)"""
+    return np.where(values < high, values, high)
+
+def _performance_levels(normalized_score: np.ndarray) -> np.ndarray:
+    index = np.select(
+        [normalized_score >= 85, normalized_score >= 70, normalized_score >= 50],
+        [0, 1, 2],
+        default=3
+    )
+    return PERFORMANCE_LEVELS[index]
+
+def _score_nback(c: Dict[str, np.ndarray]) -> BatchScores:
+    if np.any(c["total_trials"] == 0):
+        raise ZeroDivisionError("total_trials must be non-zero for NBACK")
+    total_responses = c["correct_responses"] + c["incorrect_responses"] + c["false_positives"]
+    accuracy = _ratio(c["correct_responses"], total_responses)
+    memory_score = accuracy * 0.8 + (1 - (c["misses"] / c["total_trials"])) * 0.2
+    normalized_score = _min(100, _max(0, memory_score * 100))
+    return BatchScores(
+        "NBACK", memory_score, normalized_score,
+        {"memory": normalized_score},
+        _performance_levels(normalized_score), accuracy
+    )
+
+def _score_stroop(c: Dict[str, np.ndarray]) -> BatchScores:
+    total_responses = c["correct_responses"] + c["incorrect_responses"]
+    accuracy = _ratio(c["correct_responses"], total_responses)
+    speed_bonus = _max(0, 1 - (c["average_response_time"] - 800) / 1000)
+    attention_score = accuracy * 0.7 + speed_bonus * 0.3
+    normalized_score = _min(100, _max(0, attention_score * 100))
+    return BatchScores(
+        "STROOP", attention_score, normalized_score,
+        {"attention": normalized_score * 0.8, "cognitive_flexibility": normalized_score * 0.2},
+        _performance_levels(normalized_score), accuracy, c["average_response_time"]
+    )
+
+def _score_reaction_time(c: Dict[str, np.ndarray]) -> BatchScores:
+    total_responses = c["correct_responses"] + c["incorrect_responses"]
+    accuracy = _ratio(c["correct_responses"], total_responses)
+    speed_score = _max(0, 1 - (c["average_response_time"] - 350) / 500)
+    processing_score = speed_score * accuracy
+    normalized_score = _min(100, _max(0, processing_score * 100))
+    return BatchScores(
+        "REACTION_TIME", processing_score, normalized_score,
+        {"processing_speed": normalized_score},
+        _performance_levels(normalized_score), accuracy, c["average_response_time"]
+    )
+
+BATCH_SCORING_FUNCTIONS = {
+    "NBACK": _score_nback,
+    "STROOP": _score_stroop,
+    "REACTION_TIME": _score_reaction_time,
+}
+
+def score_batch(game_code: str, columns: Mapping[str, Any]) -> BatchScores:
+    """Score many results of one game from columnar metrics (missing columns take the per-item defaults)"""
+    scoring_function = BATCH_SCORING_FUNCTIONS.get(game_code)
+    if not scoring_function:
+        raise ValueError(f"No scoring function available for game {game_code}")
+    return scoring_function(_columns(game_code, columns))
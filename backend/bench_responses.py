@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark: response encoding and compression on the admin list endpoints
+
+Seeds a throwaway SQLite database with candidates, assessments and items
+carrying realistic metrics_json, then for each list endpoint prints:
+
+  - CPU to encode the payload the old way (jsonable_encoder + json.dumps, plus
+    response_model validation where the endpoint declares one) vs. orjson
+  - bytes on the wire uncompressed, gzip and Brotli
+  - end-to-end request time through the app per Accept-Encoding
+
+    python bench_responses.py 5000
+
+Requests go through fastapi.testclient, which needs httpx installed.
+"""
+
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/bench.db"
+
+from typing import List
+from datetime import timedelta
+import orjson
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from pydantic import TypeAdapter
+
+from database import Base, SessionLocal, engine
+from models import Assessment, AssessmentItem, Game, JobRole, User
+from routers.assessments import AssessmentItemResponse
+from routers.auth import create_access_token
+from main import app
+import compression
+
+ROUNDS = 20
+
+def _seed(n):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    games = [Game(id=f"g{i}", code=code, title=code.title(), base_config={}) for i, code in enumerate(["NBACK", "STROOP", "REACTION_TIME"])]
+    db.add_all(games)
+    db.add(JobRole(id="jr1", tenant_id="t1", title="Engineer", required_games=[g.id for g in games], traits_json={}))
+    db.add(User(id="admin", username="admin", email="admin@example.com", role="ADMIN", full_name="Admin", password_hash="x"))
+    db.flush()
+    for i in range(n):
+        db.add(User(id=f"c{i}", username=f"candidate{i}", email=f"candidate{i}@example.com", role="CANDIDATE",
+                    full_name=f"Candidate {i}", job_role_id="jr1", password_hash="x"))
+        db.add(Assessment(id=f"a{i}", tenant_id="t1", candidate_id=f"c{i}", job_role_id="jr1", status="COMPLETED",
+                          total_score=(i % 100) / 100, integrity_flags={}, items_total=3, items_submitted=3))
+    db.flush()
+    for j, game in enumerate(games):
+        db.add(AssessmentItem(
+            assessment_id="a0", game_id=game.id, candidate_id="c0", order_index=j, status="SUBMITTED", score=0.8,
+            metrics_json={
+                "correct_responses": 40, "incorrect_responses": 5, "total_trials": 50, "average_response_time": 512.5,
+                "trials": [{"rt_ms": 400 + k, "correct": k % 7 != 0, "stimulus": f"s{k % 9}"} for k in range(200)]
+            },
+            config_snapshot={"trials": 50}
+        ))
+    db.commit()
+    db.close()
+
+def _time(fn):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    return (time.perf_counter() - started) / ROUNDS * 1000
+
+def _encoding_cpu(payload, response_model):
+    adapter = TypeAdapter(response_model) if response_model else None
+
+    def default_path():
+        content = payload
+        if adapter:
+            content = adapter.dump_python(adapter.validate_python(content), mode="json")
+        return json.dumps(jsonable_encoder(content)).encode()
+
+    return _time(default_path), _time(lambda: orjson.dumps(payload))
+
+def benchmark(n):
+    _seed(n)
+    token = create_access_token({"sub": "admin", "role": "ADMIN"}, timedelta(minutes=30))[0]
+    endpoints = [
+        ("/admin/assessments?limit=500", None),
+        ("/admin/candidates?limit=500", None),
+        ("/assessments/a0/items", List[AssessmentItemResponse])
+    ]
+
+    with TestClient(app) as client:
+        for url, response_model in endpoints:
+            headers = {"Authorization": f"Bearer {token}"}
+            raw = client.get(url, headers={**headers, "Accept-Encoding": "identity"})
+            payload = raw.json()
+            body = raw.content
+
+            default_ms, orjson_ms = _encoding_cpu(payload, response_model)
+            sizes = {"identity": len(body), "gzip": len(gzip.compress(body, compression.GZIP_LEVEL))}
+            if compression.brotli:
+                sizes["br"] = len(compression.brotli.compress(body, quality=compression.BROTLI_QUALITY))
+
+            print(f"{url}")
+            print(f"  encode: default {default_ms:7.2f} ms  orjson {orjson_ms:6.2f} ms  "
+                  f"({default_ms / orjson_ms:.0f}x less CPU)")
+            print("  bytes:  " + "  ".join(f"{name} {size:>9,}" for name, size in sizes.items()) +
+                  f"  ({sizes['identity'] / min(sizes.values()):.1f}x smaller)")
+            print("  request:" + "".join(
+                f"  {encoding} {_time(lambda: client.get(url, headers={**headers, 'Accept-Encoding': encoding})):6.2f} ms"
+                for encoding in sizes
+            ))
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
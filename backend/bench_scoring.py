@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-item game scoring vs. batch_scoring
+
+Generates random metrics for every game in GAME_SCORING_FUNCTIONS, scores them
+with the per-item functions and with batch_scoring.score_batch, checks that
+every score, normalized score, trait score, performance level and feedback
+string is identical, and prints the throughput of both:
+
+    python bench_scoring.py 100000
+"""
+
+import random
+import sys
+import time
+
+import batch_scoring
+from routers.games import GAME_SCORING_FUNCTIONS
+
+SEED = 1234
+
+def _random_metrics(game_code, rng):
+    metrics = {
+        "correct_responses": rng.randint(0, 40),
+        "incorrect_responses": rng.randint(0, 15),
+        "total_trials": rng.randint(1, 60)
+    }
+    if game_code == "NBACK":
+        metrics["misses"] = rng.randint(0, 10)
+        metrics["false_positives"] = rng.randint(0, 10)
+    else:
+        metrics["average_response_time"] = rng.uniform(150, 2500)
+    if rng.random() < 0.05:
+        # Exercise the per-item defaults
+        metrics.pop(rng.choice(list(metrics)))
+    return metrics
+
+def _check(game_code, expected, batch):
+    """Exit with an error if any batch result differs from the per-item result"""
+    feedback = batch.feedback()
+    for i, item in enumerate(expected):
+        got = batch.row(i)
+        got["feedback"] = feedback[i]
+        if got != item.model_dump():
+            print(f"{game_code}: mismatch at row {i}:\n  per-item: {item.model_dump()}\n  batch:    {got}")
+            sys.exit(1)
+
+def benchmark(n):
+    rng = random.Random(SEED)
+    for game_code, scoring_function in GAME_SCORING_FUNCTIONS.items():
+        metrics = [_random_metrics(game_code, rng) for _ in range(n)]
+
+        started = time.perf_counter()
+        expected = [scoring_function(m) for m in metrics]
+        per_item = time.perf_counter() - started
+
+        started = time.perf_counter()
+        columns = batch_scoring.columns_from_metrics(game_code, metrics)
+        columns_elapsed = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch = batch_scoring.score_batch(game_code, columns)
+        batch_elapsed = time.perf_counter() - started
+
+        _check(game_code, expected, batch)
+        print(f"{game_code:14} n={n}  per-item: {per_item * 1000:8.1f} ms  "
+              f"batch: {batch_elapsed * 1000:7.1f} ms (+{columns_elapsed * 1000:.1f} ms to build columns)  "
+              f"speedup: {per_item / batch_elapsed:6.1f}x  results identical")
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
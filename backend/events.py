@@ -0,0 +1,219 @@
+"""
+Live assessment progress events for the admin dashboard
+
+Handlers queue an event with publish_on_commit(); it is handed to the broker
+once the request's transaction commits (and dropped if it rolls back), so
+subscribers never see a state change that did not happen. GET /admin/events
+streams the events matching the subscriber's tenant / job role filters as
+Server-Sent Events.
+
+The default InProcessBroker fans events out to the subscribers of this worker
+only. Deployments with several workers can install a Broker backed by a shared
+message bus with set_broker(); handlers and the endpoint only use the Broker
+interface.
+
+Each subscriber has a bounded queue of EVENTS_QUEUE_SIZE events. Publishing
+never waits: when a slow consumer's queue is full the event is dropped for that
+consumer and it is sent a "resync" event, telling the dashboard to reload its
+lists once. The last EVENTS_REPLAY_SIZE events are kept so a client that
+reconnects with Last-Event-ID receives what it missed; if that id is not
+covered by the buffer (too old, or issued before a restart) the client gets a
+resync instead. Event ids start from the process start time in microseconds,
+so they keep increasing across restarts.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, NamedTuple, Optional, Set
+from sqlalchemy import event as orm_event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import Assessment
+
+# Events buffered per subscriber before it is considered too slow
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+# Recent events kept for Last-Event-ID replay
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "1000"))
+# Seconds between keep-alive comments on an idle stream
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+_PENDING_KEY = "events_pending"
+
+class Event(NamedTuple):
+    id: int
+    type: str  # assessment.started, item.started, item.submitted, assessment.completed
+    tenant_id: Optional[str]
+    job_role_id: Optional[str]
+    data: Dict[str, Any]
+
+    def encode(self) -> str:
+        """Server-Sent Events wire format"""
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+class Subscription:
+    """One stream's filters and bounded queue"""
+
+    def __init__(self, tenant_id: Optional[str], job_role_id: Optional[str], queue_size: int):
+        self.tenant_id = tenant_id
+        self.job_role_id = job_role_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+        self.dropped = 0
+
+    def matches(self, event: Event) -> bool:
+        return (
+            (self.tenant_id is None or event.tenant_id == self.tenant_id)
+            and (self.job_role_id is None or event.job_role_id == self.job_role_id)
+        )
+
+    def offer(self, event: Event) -> bool:
+        """Queue an event without waiting; returns False if it was dropped"""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.dropped += 1
+            return False
+
+class Broker(ABC):
+    """Interface used by the handlers and the events endpoint"""
+
+    @abstractmethod
+    def publish(self, event: Event):
+        ...
+
+    @abstractmethod
+    def subscribe(self, tenant_id: Optional[str], job_role_id: Optional[str],
+                  last_event_id: Optional[int] = None) -> Subscription:
+        ...
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription):
+        ...
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class InProcessBroker(Broker):
+    """Fans events out to the subscribers of this worker"""
+
+    def __init__(self, queue_size: int = EVENTS_QUEUE_SIZE, replay_size: int = EVENTS_REPLAY_SIZE):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers: Set[Subscription] = set()
+        self._recent: deque = deque(maxlen=replay_size)
+        self._published = 0
+        self._dropped = 0
+
+    def publish(self, event: Event):
+        with self._lock:
+            self._recent.append(event)
+            self._published += 1
+            subscribers = [s for s in self._subscribers if s.matches(event)]
+        dropped = sum(1 for s in subscribers if not s.offer(event))
+        if dropped:
+            with self._lock:
+                self._dropped += dropped
+
+    def subscribe(self, tenant_id: Optional[str], job_role_id: Optional[str],
+                  last_event_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(tenant_id, job_role_id, self.queue_size)
+        with self._lock:
+            if last_event_id is not None:
+                if not self._recent or not self._recent[0].id - 1 <= last_event_id <= self._recent[-1].id:
+                    # Missed events are no longer buffered, or the id is not one this worker issued
+                    subscription.overflowed = True
+                else:
+                    for event in self._recent:
+                        if event.id > last_event_id and subscription.matches(event):
+                            subscription.offer(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self._published,
+                "dropped": self._dropped,
+                "queue_size": self.queue_size
+            }
+
+_broker: Broker = InProcessBroker()
+# Seeded from the clock so ids keep increasing across restarts
+_ids = itertools.count(time.time_ns() // 1000)
+
+def get_broker() -> Broker:
+    return _broker
+
+def set_broker(broker: Broker):
+    """Replace the broker, e.g. with one backed by a shared message bus"""
+    global _broker
+    _broker = broker
+
+def publish_on_commit(db: AsyncSession, event_type: str, assessment: Assessment, **data):
+    """Queue an event about an assessment, published once db's transaction commits"""
+    payload = {
+        "assessment_id": assessment.id,
+        "candidate_id": assessment.candidate_id,
+        "tenant_id": assessment.tenant_id,
+        "job_role_id": assessment.job_role_id,
+        "status": assessment.status,
+        "at": datetime.utcnow().isoformat(),
+        **data
+    }
+    db.sync_session.info.setdefault(_PENDING_KEY, []).append(
+        (event_type, assessment.tenant_id, assessment.job_role_id, payload)
+    )
+
+@orm_event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    for event_type, tenant_id, job_role_id, payload in pending or ():
+        _broker.publish(Event(next(_ids), event_type, tenant_id, job_role_id, payload))
+
+@orm_event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
+
+async def stream(tenant_id: Optional[str], job_role_id: Optional[str],
+                 last_event_id: Optional[int] = None) -> AsyncIterator[str]:
+    """
+    Subscribe and encode the events as Server-Sent Events until the client
+    disconnects. The subscription is made once the response starts streaming,
+    so a request dropped before then never registers a subscriber, and one
+    that was registered is always removed.
+    """
+    broker = _broker
+    subscription = broker.subscribe(tenant_id, job_role_id, last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            if subscription.overflowed:
+                subscription.overflowed = False
+                yield f"event: resync\ndata: {json.dumps({'dropped': subscription.dropped})}\n\n"
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield event.encode()
+    finally:
+        broker.unsubscribe(subscription)
+
+def stats() -> Dict[str, Any]:
+    """Broker counters for this worker"""
+    return _broker.stats()
@@ -0,0 +1,133 @@
+"""
+Streaming CSV / NDJSON exports of assessments and assessment items
+
+Exports read through AsyncSession.stream() (a server-side cursor where the
+driver supports one) in partitions of EXPORT_CHUNK_SIZE rows, with candidate,
+job role and game columns joined in the same query. Each partition is encoded
+and handed to the StreamingResponse before the next one is fetched, so memory
+stays constant however many rows are exported. Each export uses its own
+session, which stays open for as long as the client is reading.
+"""
+
+import csv
+import io
+import json
+import os
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional
+from sqlalchemy import Select, select
+from database import AsyncSessionLocal
+from models import Assessment, AssessmentItem, Game, JobRole, User
+
+# Rows fetched from the cursor (and encoded) per chunk of the response
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson"
+}
+
+ASSESSMENT_COLUMNS = [
+    ("assessment_id", Assessment.id),
+    ("tenant_id", Assessment.tenant_id),
+    ("candidate_id", Assessment.candidate_id),
+    ("candidate_name", User.full_name),
+    ("candidate_email", User.email),
+    ("job_role_id", Assessment.job_role_id),
+    ("job_role_title", JobRole.title),
+    ("status", Assessment.status),
+    ("created_at", Assessment.created_at),
+    ("started_at", Assessment.started_at),
+    ("completed_at", Assessment.completed_at),
+    ("total_score", Assessment.total_score),
+    ("items_total", Assessment.items_total),
+    ("items_submitted", Assessment.items_submitted)
+]
+
+ITEM_COLUMNS = [
+    ("item_id", AssessmentItem.id),
+    ("assessment_id", AssessmentItem.assessment_id),
+    ("candidate_id", Assessment.candidate_id),
+    ("candidate_name", User.full_name),
+    ("candidate_email", User.email),
+    ("job_role_id", Assessment.job_role_id),
+    ("job_role_title", JobRole.title),
+    ("assessment_status", Assessment.status),
+    ("game_id", AssessmentItem.game_id),
+    ("game_code", Game.code),
+    ("game_title", Game.title),
+    ("order_index", AssessmentItem.order_index),
+    ("status", AssessmentItem.status),
+    ("score", AssessmentItem.score),
+    ("server_started_at", AssessmentItem.server_started_at),
+    ("server_deadline_at", AssessmentItem.server_deadline_at),
+    ("metrics", AssessmentItem.metrics_json)
+]
+
+def _filtered(query: Select, status: Optional[str], job_role_id: Optional[str],
+              created_from: Optional[datetime], created_to: Optional[datetime]) -> Select:
+    if status:
+        query = query.where(Assessment.status == status)
+    if job_role_id:
+        query = query.where(Assessment.job_role_id == job_role_id)
+    if created_from:
+        query = query.where(Assessment.created_at >= created_from)
+    if created_to:
+        query = query.where(Assessment.created_at < created_to)
+    return query
+
+def assessments_query(status: Optional[str] = None, job_role_id: Optional[str] = None,
+                      created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> Select:
+    """One row per assessment with its candidate and job role"""
+    query = (
+        select(*(column for _, column in ASSESSMENT_COLUMNS))
+        .outerjoin(User, User.id == Assessment.candidate_id)
+        .outerjoin(JobRole, JobRole.id == Assessment.job_role_id)
+        .order_by(Assessment.created_at, Assessment.id)
+    )
+    return _filtered(query, status, job_role_id, created_from, created_to)
+
+def items_query(status: Optional[str] = None, job_role_id: Optional[str] = None,
+                created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> Select:
+    """One row per item of the matching assessments, with candidate, job role and game"""
+    query = (
+        select(*(column for _, column in ITEM_COLUMNS))
+        .join(Assessment, Assessment.id == AssessmentItem.assessment_id)
+        .outerjoin(User, User.id == Assessment.candidate_id)
+        .outerjoin(JobRole, JobRole.id == Assessment.job_role_id)
+        .outerjoin(Game, Game.id == AssessmentItem.game_id)
+        .order_by(Assessment.created_at, AssessmentItem.assessment_id, AssessmentItem.order_index)
+    )
+    return _filtered(query, status, job_role_id, created_from, created_to)
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _encode_csv(rows: List[tuple]) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([
+            json.dumps(value, separators=(",", ":")) if isinstance(value, (dict, list)) else _value(value)
+            for value in row
+        ])
+    return buffer.getvalue()
+
+def _encode_ndjson(names: List[str], rows: List[tuple]) -> str:
+    return "".join(
+        json.dumps(dict(zip(names, (_value(value) for value in row))), separators=(",", ":"), default=str) + "\n"
+        for row in rows
+    )
+
+async def stream(query: Select, columns: List[tuple], format: str) -> AsyncIterator[str]:
+    """Encode the rows of query chunk by chunk as CSV (with a header row) or NDJSON"""
+    names = [name for name, _ in columns]
+    if format == "csv":
+        yield _encode_csv([names])
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        async for rows in result.partitions():
+            yield _encode_csv(rows) if format == "csv" else _encode_ndjson(names, rows)
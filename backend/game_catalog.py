@@ -0,0 +1,117 @@
+"""
+In-process catalog of games
+
+The games table is small and rarely written, yet it was re-queried on every
+assessment start, item listing and score. Each worker keeps an immutable snapshot
+of all games indexed by id and by code. Writes to games bump a version row in
+catalog_versions inside their own transaction and call invalidate() after the
+commit; other workers compare the stored version against their snapshot at most
+once per GAME_CATALOG_CHECK_INTERVAL_SECONDS and reload when it has moved.
+"""
+
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import Game
+import http_cache
+
+# Seconds between checks of the stored catalog version
+GAME_CATALOG_CHECK_INTERVAL_SECONDS = float(os.getenv("GAME_CATALOG_CHECK_INTERVAL_SECONDS", "5"))
+
+CATALOG_NAME = "games"
+
+class CatalogGame(NamedTuple):
+    id: str
+    code: str
+    title: str
+    description: Optional[str]
+    base_config: Mapping[str, Any]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Response shape used by the games endpoints"""
+        return {
+            "id": self.id,
+            "code": self.code,
+            "title": self.title,
+            "description": self.description,
+            "base_config": dict(self.base_config)
+        }
+
+class GameCatalog(NamedTuple):
+    version: int
+    etag: str  # Weak ETag of the snapshot, for conditional GETs
+    games: Tuple[CatalogGame, ...]
+    by_id: Mapping[str, CatalogGame]
+    by_code: Mapping[str, CatalogGame]
+
+_lock = threading.Lock()
+_catalog: Optional[GameCatalog] = None
+_next_check_at = 0.0
+_loads = 0
+
+async def _load(db: AsyncSession) -> GameCatalog:
+    version = await http_cache.stored_version(db, CATALOG_NAME)
+    rows = (await db.scalars(select(Game).order_by(Game.created_at, Game.id))).all()
+    games = tuple(
+        CatalogGame(
+            id=g.id,
+            code=g.code,
+            title=g.title,
+            description=g.description,
+            base_config=MappingProxyType(dict(g.base_config or {}))
+        ) for g in rows
+    )
+    return GameCatalog(
+        version=version,
+        etag=http_cache.etag(CATALOG_NAME, version, json.dumps([g.as_dict() for g in games], sort_keys=True)),
+        games=games,
+        by_id=MappingProxyType({g.id: g for g in games}),
+        by_code=MappingProxyType({g.code: g for g in games})
+    )
+
+async def get(db: AsyncSession) -> GameCatalog:
+    """Return the current catalog, reloading it if it was invalidated or another worker changed it"""
+    global _catalog, _next_check_at, _loads
+
+    with _lock:
+        catalog = _catalog
+        check = catalog is None or time.monotonic() >= _next_check_at
+    if not check:
+        return catalog
+
+    if catalog is not None and await http_cache.stored_version(db, CATALOG_NAME) == catalog.version:
+        with _lock:
+            _next_check_at = time.monotonic() + GAME_CATALOG_CHECK_INTERVAL_SECONDS
+        return catalog
+
+    catalog = await _load(db)
+    with _lock:
+        _catalog = catalog
+        _next_check_at = time.monotonic() + GAME_CATALOG_CHECK_INTERVAL_SECONDS
+        _loads += 1
+    return catalog
+
+async def bump(db: AsyncSession):
+    """Increment the stored catalog version in db's pending transaction"""
+    await http_cache.bump(db, CATALOG_NAME)
+
+def invalidate():
+    """Drop this worker's snapshot so the next get() reloads it"""
+    global _catalog
+    with _lock:
+        _catalog = None
+
+def stats() -> Dict[str, Any]:
+    """Snapshot version and size for this worker"""
+    with _lock:
+        return {
+            "version": _catalog.version if _catalog else None,
+            "games": len(_catalog.games) if _catalog else 0,
+            "loads": _loads,
+            "check_interval_seconds": GAME_CATALOG_CHECK_INTERVAL_SECONDS
+        }
@@ -0,0 +1,120 @@
+"""
+Conditional GET support for read-mostly catalog endpoints
+
+Responses carry a weak ETag built from a version marker of the data they are
+derived from (plus the query string, for paginated lists) and a private
+Cache-Control header. A request whose If-None-Match matches gets a bodiless
+304 before anything is queried or serialized.
+
+Games use the game catalog snapshot (see game_catalog.py). Other catalogs keep
+a version counter in catalog_versions: writers call bump() inside their
+transaction and invalidate() after the commit, and each worker re-reads a
+counter at most once per CATALOG_VERSION_CHECK_INTERVAL_SECONDS. Writes made
+outside the API (scripts) must bump the counter too, or clients keep their
+cached copy until another write does.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from models import CatalogVersion
+
+# Seconds between checks of a stored catalog version
+CATALOG_VERSION_CHECK_INTERVAL_SECONDS = float(os.getenv("CATALOG_VERSION_CHECK_INTERVAL_SECONDS", "5"))
+# max-age for catalog responses; clients revalidate with If-None-Match after it
+CATALOG_CACHE_MAX_AGE_SECONDS = int(os.getenv("CATALOG_CACHE_MAX_AGE_SECONDS", "60"))
+
+JOB_ROLES = "job_roles"
+
+_lock = threading.Lock()
+_versions: Dict[str, Tuple[int, float]] = {}  # name -> (version, next check at)
+_not_modified = 0
+
+async def version(db: AsyncSession, name: str) -> int:
+    """Stored version of a catalog, re-read at most once per check interval"""
+    with _lock:
+        cached = _versions.get(name)
+    if cached is not None and time.monotonic() < cached[1]:
+        return cached[0]
+
+    stored = await stored_version(db, name)
+    with _lock:
+        _versions[name] = (stored, time.monotonic() + CATALOG_VERSION_CHECK_INTERVAL_SECONDS)
+    return stored
+
+async def stored_version(db: AsyncSession, name: str) -> int:
+    """A catalog's version as stored in catalog_versions (0 before its first write)"""
+    return await db.scalar(select(CatalogVersion.version).where(CatalogVersion.name == name)) or 0
+
+async def bump(db: AsyncSession, name: str):
+    """
+    Increment a catalog's stored version in db's pending transaction.
+
+    A single upsert, so concurrent first writes to a catalog both count
+    instead of one failing on the primary key.
+    """
+    insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+    await db.execute(
+        insert(CatalogVersion)
+        .values(name=name, version=1, updated_at=func.now())
+        .on_conflict_do_update(
+            index_elements=[CatalogVersion.name],
+            set_={"version": CatalogVersion.version + 1, "updated_at": func.now()}
+        )
+    )
+
+def invalidate(name: str):
+    """Drop this worker's cached version so the next request re-reads it"""
+    with _lock:
+        _versions.pop(name, None)
+
+def etag(*parts) -> str:
+    """Weak ETag over the given version parts"""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def cache_headers(tag: str) -> Dict[str, str]:
+    return {
+        "ETag": tag,
+        "Cache-Control": f"private, max-age={CATALOG_CACHE_MAX_AGE_SECONDS}, must-revalidate"
+    }
+
+def _matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    opaque = tag[2:] if tag.startswith("W/") else tag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+def conditional(request: Request, response: Response, tag: str) -> Optional[Response]:
+    """
+    Return a 304 response if the request already has this representation;
+    otherwise add the caching headers to response and return None.
+    """
+    global _not_modified
+
+    headers = cache_headers(tag)
+    if _matches(request.headers.get("if-none-match"), tag):
+        with _lock:
+            _not_modified += 1
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def stats() -> Dict[str, Any]:
+    """Cached versions and 304 count for this worker"""
+    with _lock:
+        return {
+            "catalogs": len(_versions),
+            "not_modified": _not_modified,
+            "max_age_seconds": CATALOG_CACHE_MAX_AGE_SECONDS
+        }
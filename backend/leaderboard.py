@@ -0,0 +1,203 @@
+"""
+Per-job-role leaderboard of completed assessments
+
+Each worker keeps, per job role, the LEADERBOARD_SIZE best completed
+assessments in score order (ties go to the earlier completion). A role's board
+is loaded with one query on the (job_role_id, total_score DESC) index the first
+time it is read and is reloaded after LEADERBOARD_TTL_SECONDS, so completions
+on other workers show up within the TTL. Completions on this worker are
+inserted into the board as soon as their transaction commits; edits and
+deletes of completed assessments drop the role's board instead.
+
+Ranks are competition ranks (1 + the number of strictly higher scores).
+A candidate's rank comes from the board when their best score is on it;
+otherwise it is one indexed COUNT.
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from models import Assessment
+
+# Completed assessments kept in memory per job role
+LEADERBOARD_SIZE = int(os.getenv("LEADERBOARD_SIZE", "100"))
+# Seconds a job role's board is served before it is reloaded
+LEADERBOARD_TTL_SECONDS = float(os.getenv("LEADERBOARD_TTL_SECONDS", "30"))
+
+_PENDING_KEY = "leaderboard_pending"
+
+class LeaderboardEntry(NamedTuple):
+    assessment_id: str
+    candidate_id: Optional[str]
+    total_score: float
+    completed_at: Optional[datetime]
+
+    @property
+    def sort_key(self) -> tuple:
+        return (-self.total_score, self.completed_at or datetime.max, self.assessment_id)
+
+class _Board:
+    """Sorted top entries of one job role"""
+
+    def __init__(self, entries: List[LeaderboardEntry], complete: bool):
+        self.keys = [entry.sort_key for entry in entries]
+        self.entries = entries
+        # True when every completed assessment of the role is on the board
+        self.complete = complete
+        self.expires_at = time.monotonic() + LEADERBOARD_TTL_SECONDS
+
+    def add(self, entry: LeaderboardEntry):
+        if any(e.assessment_id == entry.assessment_id for e in self.entries):
+            return
+        key = entry.sort_key
+        if not self.complete and len(self.entries) >= LEADERBOARD_SIZE and key >= self.keys[-1]:
+            return
+        i = bisect_left(self.keys, key)
+        self.keys.insert(i, key)
+        self.entries.insert(i, entry)
+        if len(self.entries) > LEADERBOARD_SIZE:
+            del self.keys[LEADERBOARD_SIZE:]
+            del self.entries[LEADERBOARD_SIZE:]
+            self.complete = False
+
+    def higher_count(self, total_score: float) -> Optional[int]:
+        """Number of entries scoring strictly higher, or None if the board cannot tell"""
+        i = bisect_left(self.keys, (-total_score,))
+        if i < len(self.keys) or self.complete:
+            return i
+        return None
+
+_lock = threading.Lock()
+_boards: Dict[Optional[str], _Board] = {}
+_loads = 0
+_hits = 0
+
+def _completed(job_role_id: Optional[str]):
+    return (
+        Assessment.job_role_id == job_role_id if job_role_id is not None else Assessment.job_role_id.is_(None),
+        Assessment.status == "COMPLETED",
+        Assessment.total_score.isnot(None)
+    )
+
+async def _board(db: AsyncSession, job_role_id: Optional[str]) -> _Board:
+    global _loads, _hits
+
+    with _lock:
+        board = _boards.get(job_role_id)
+        if board is not None and time.monotonic() < board.expires_at:
+            _hits += 1
+            return board
+
+    rows = (await db.execute(
+        select(Assessment.id, Assessment.candidate_id, Assessment.total_score, Assessment.completed_at)
+        .where(*_completed(job_role_id))
+        .order_by(Assessment.total_score.desc(), Assessment.completed_at, Assessment.id)
+        .limit(LEADERBOARD_SIZE)
+    )).all()
+    board = _Board([LeaderboardEntry(*row) for row in rows], complete=len(rows) < LEADERBOARD_SIZE)
+
+    with _lock:
+        _boards[job_role_id] = board
+        _loads += 1
+    return board
+
+def _ranked(board: _Board, entries: List[LeaderboardEntry]) -> List[Dict[str, Any]]:
+    result = []
+    for entry in entries:
+        result.append({
+            "rank": board.higher_count(entry.total_score) + 1,
+            "assessment_id": entry.assessment_id,
+            "candidate_id": entry.candidate_id,
+            "total_score": entry.total_score,
+            "completed_at": entry.completed_at.isoformat() if entry.completed_at else None
+        })
+    return result
+
+async def top(db: AsyncSession, job_role_id: Optional[str], limit: int) -> List[Dict[str, Any]]:
+    """The best `limit` completed assessments of a job role (at most LEADERBOARD_SIZE)"""
+    board = await _board(db, job_role_id)
+    with _lock:
+        return _ranked(board, board.entries[:min(limit, LEADERBOARD_SIZE)])
+
+async def candidate_rank(db: AsyncSession, job_role_id: Optional[str], candidate_id: str) -> Optional[Dict[str, Any]]:
+    """Rank of a candidate's best completed assessment for a job role, or None if they have none"""
+    board = await _board(db, job_role_id)
+    with _lock:
+        best = next((entry for entry in board.entries if entry.candidate_id == candidate_id), None)
+        if best is not None:
+            return _ranked(board, [best])[0]
+        if board.complete:
+            return None
+
+    row = (await db.execute(
+        select(Assessment.id, Assessment.candidate_id, Assessment.total_score, Assessment.completed_at)
+        .where(*_completed(job_role_id), Assessment.candidate_id == candidate_id)
+        .order_by(Assessment.total_score.desc(), Assessment.completed_at, Assessment.id)
+        .limit(1)
+    )).first()
+    if row is None:
+        return None
+    entry = LeaderboardEntry(*row)
+
+    with _lock:
+        higher = board.higher_count(entry.total_score)
+    if higher is None:
+        higher = await db.scalar(
+            select(func.count()).select_from(Assessment)
+            .where(*_completed(job_role_id), Assessment.total_score > entry.total_score)
+        )
+    return {
+        "rank": higher + 1,
+        "assessment_id": entry.assessment_id,
+        "candidate_id": entry.candidate_id,
+        "total_score": entry.total_score,
+        "completed_at": entry.completed_at.isoformat() if entry.completed_at else None
+    }
+
+def record_completion(db: AsyncSession, assessment: Assessment):
+    """Add a completed assessment to its job role's board once db's transaction commits"""
+    if assessment.total_score is None:
+        return
+    entry = LeaderboardEntry(assessment.id, assessment.candidate_id, assessment.total_score, assessment.completed_at)
+    db.sync_session.info.setdefault(_PENDING_KEY, []).append((assessment.job_role_id, entry))
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending(session: Session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    with _lock:
+        for job_role_id, entry in pending:
+            board = _boards.get(job_role_id)
+            if board is not None:
+                board.add(entry)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending(session: Session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_PENDING_KEY, None)
+
+def invalidate(job_role_id: Optional[str] = None):
+    """Drop this worker's board for one job role (or all) so the next read reloads it"""
+    with _lock:
+        if job_role_id is None:
+            _boards.clear()
+        else:
+            _boards.pop(job_role_id, None)
+
+def stats() -> Dict[str, Any]:
+    """Board counters for this worker"""
+    with _lock:
+        return {
+            "job_roles": len(_boards),
+            "size": LEADERBOARD_SIZE,
+            "ttl_seconds": LEADERBOARD_TTL_SECONDS,
+            "loads": _loads,
+            "hits": _hits
+        }
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Load test: latency of an unrelated endpoint while logins run concurrently
+
+Measures /health latency on its own and then during a burst of concurrent
+/auth/login requests, and prints p50/p99 for both. Run against a live server:
+
+    python load_test_logins.py http://localhost:8000 admin@cognihire.com admin123
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+LOGIN_CONCURRENCY = int(os.getenv("LOGIN_CONCURRENCY", "32"))
+LOGIN_REQUESTS = int(os.getenv("LOGIN_REQUESTS", "256"))
+PROBE_INTERVAL_SECONDS = 0.01
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def _probe(base_url, stop_event, samples):
+    """Time /health requests until stop_event is set"""
+    while not stop_event.is_set():
+        started = time.perf_counter()
+        urllib.request.urlopen(f"{base_url}/health").read()
+        samples.append((time.perf_counter() - started) * 1000)
+        time.sleep(PROBE_INTERVAL_SECONDS)
+
+def _login(base_url, username, password):
+    request = urllib.request.Request(
+        f"{base_url}/auth/login",
+        data=json.dumps({"username": username, "password": password}).encode(),
+        headers={"Content-Type": "application/json"}
+    )
+    try:
+        urllib.request.urlopen(request).read()
+        return 200
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def _measure(base_url, duration=None, logins=None):
+    samples = []
+    stop_event = threading.Event()
+    probe = threading.Thread(target=_probe, args=(base_url, stop_event, samples))
+    probe.start()
+
+    statuses = []
+    started = time.perf_counter()
+    if logins:
+        with ThreadPoolExecutor(max_workers=LOGIN_CONCURRENCY) as pool:
+            statuses = list(pool.map(lambda _: _login(base_url, *logins), range(LOGIN_REQUESTS)))
+    else:
+        time.sleep(duration)
+    elapsed = time.perf_counter() - started
+
+    stop_event.set()
+    probe.join()
+    return samples, statuses, elapsed
+
+def load_test(base_url, username, password):
+    baseline, _, _ = _measure(base_url, duration=3)
+    print(f"/health idle:         p50={_percentile(baseline, 0.5):7.1f} ms  p99={_percentile(baseline, 0.99):7.1f} ms  (n={len(baseline)})")
+
+    loaded, statuses, elapsed = _measure(base_url, logins=(username, password))
+    print(f"/health during login: p50={_percentile(loaded, 0.5):7.1f} ms  p99={_percentile(loaded, 0.99):7.1f} ms  (n={len(loaded)})")
+    print(f"{len(statuses)} logins in {elapsed:.1f}s ({len(statuses) / elapsed:.1f}/s), statuses: "
+          + ", ".join(f"{code}={statuses.count(code)}" for code in sorted(set(statuses))))
+
+if __name__ == "__main__":
+    base_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:8000"
+    username = sys.argv[2] if len(sys.argv) > 2 else "admin@cognihire.com"
+    password = sys.argv[3] if len(sys.argv) > 3 else "admin123"
+    load_test(base_url.rstrip("/"), username, password)
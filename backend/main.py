@@ -1,14 +1,24 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from compression import CompressionMiddleware
 from routers import auth, admin, assessments, games, company_auth, job_roles
+from database import AsyncSessionLocal, async_engine, engine
+import token_revocation
+import audit_log
 
 # Create FastAPI app
 app = FastAPI(
     title="Cognihire API",
     description="Cognitive Assessment Platform API",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
+# Compress large responses (gzip, or Brotli when available)
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -16,6 +26,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination headers set by pagination.set_page_headers
+    expose_headers=["X-Next-Cursor", "X-Total-Count", "X-Total-Count-Estimated"],
 )
 
 # Include routers
@@ -26,6 +38,26 @@ app.include_router(games.router, prefix="/games", tags=["Games"])
 app.include_router(company_auth.router, prefix="/auth/company", tags=["Company Auth"])
 app.include_router(job_roles.router, prefix="/job-roles", tags=["Job Roles"])
 
+@app.on_event("startup")
+async def load_revoked_tokens():
+    async with AsyncSessionLocal() as db:
+        await db.run_sync(token_revocation.sync)
+    asyncio.create_task(token_revocation.run_purge_loop())
+
+@app.on_event("startup")
+async def start_audit_log_writer():
+    audit_log.replay_fallback()
+    asyncio.create_task(audit_log.run_flush_loop())
+
+@app.on_event("shutdown")
+async def flush_audit_log():
+    await audit_log.shutdown()
+
+@app.on_event("shutdown")
+async def close_database_pools():
+    await async_engine.dispose()
+    engine.dispose()
+
 @app.get("/")
 async def root():
     return {"message": "Cognihire API", "version": "1.0.0"}
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, ForeignKey, Float, JSON, UniqueConstraint, Index, LargeBinary
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from database import Base
 import uuid
 
@@ -17,6 +17,7 @@ class User(Base):
     role = Column(String, default="CANDIDATE")  # ADMIN, CANDIDATE
     is_active = Column(Boolean, default=True)
     full_name = Column(String, nullable=True)
+    job_role_id = Column(String, ForeignKey("job_roles.id"), nullable=True, index=True)
     last_login_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
@@ -87,19 +88,34 @@ class Game(Base):
     # Relationships
     assessment_items = relationship("AssessmentItem", back_populates="game")
 
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+
+    name = Column(String, primary_key=True)  # games
+    version = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
 class Assessment(Base):
     __tablename__ = "assessments"
+    __table_args__ = (
+        Index("ix_assessments_candidate_status_created", "candidate_id", "status", "created_at"),
+        Index("ix_assessments_job_role_score", "job_role_id", text("total_score DESC")),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     tenant_id = Column(String, ForeignKey("tenants.id"))
     candidate_id = Column(String, ForeignKey("users.id"))
-    job_role_id = Column(String, ForeignKey("job_roles.id"))
+    job_role_id = Column(String, ForeignKey("job_roles.id"), index=True)
     status = Column(String, default="CREATED")  # CREATED, IN_PROGRESS, COMPLETED, EXPIRED
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     total_score = Column(Float, nullable=True)
     integrity_flags = Column(JSON, default=dict)
     expires_at = Column(DateTime, nullable=True)
+    items_total = Column(Integer, default=0)  # Running counters maintained on item creation/submit
+    items_submitted = Column(Integer, default=0)
+    items_scored = Column(Integer, default=0)  # Submitted items with a score
+    score_sum = Column(Float, default=0.0)
     created_at = Column(DateTime, default=func.now())
 
     # Relationships
@@ -110,10 +126,13 @@ class Assessment(Base):
 
 class AssessmentItem(Base):
     __tablename__ = "assessment_items"
+    __table_args__ = (
+        Index("ix_assessment_items_assessment_order", "assessment_id", "order_index"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     assessment_id = Column(String, ForeignKey("assessments.id"))
-    game_id = Column(String, ForeignKey("games.id"))
+    game_id = Column(String, ForeignKey("games.id"), index=True)
     candidate_id = Column(String, ForeignKey("users.id"))
     order_index = Column(Integer)
     timer_seconds = Column(Integer, nullable=True)
@@ -130,8 +149,48 @@ class AssessmentItem(Base):
     game = relationship("Game", back_populates="assessment_items")
     candidate = relationship("User", back_populates="assessment_items")
 
+class ItemTelemetry(Base):
+    __tablename__ = "item_telemetry"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    assessment_item_id = Column(String, ForeignKey("assessment_items.id"), unique=True, index=True)
+    format_version = Column(Integer)
+    trial_count = Column(Integer)
+    data = Column(LargeBinary)  # Packed trial columns, see telemetry.py
+    aggregates = Column(JSON, default=dict)
+    created_at = Column(DateTime, default=func.now())
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class AssessmentSummary(Base):
+    __tablename__ = "assessment_summaries"
+    __table_args__ = (UniqueConstraint("tenant_id", "job_role_id"),)
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    tenant_id = Column(String, ForeignKey("tenants.id"), index=True)
+    job_role_id = Column(String, ForeignKey("job_roles.id"), index=True)
+    total_assessments = Column(Integer, default=0)
+    in_progress_assessments = Column(Integer, default=0)
+    completed_assessments = Column(Integer, default=0)
+    scored_assessments = Column(Integer, default=0)  # Completed assessments with a total_score
+    score_sum = Column(Float, default=0.0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+class ScoreNormBucket(Base):
+    __tablename__ = "score_norm_buckets"
+    __table_args__ = (UniqueConstraint("game_id", "job_role_id", "bucket"),)
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    game_id = Column(String, ForeignKey("games.id"), index=True)
+    job_role_id = Column(String, ForeignKey("job_roles.id"), nullable=True)
+    bucket = Column(Integer)  # Log-scale bucket index, see norms.py
+    count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        Index("ix_audit_logs_actor_created", "actor_user_id", "created_at"),
+    )
 
     id = Column(String, primary_key=True, default=generate_uuid)
     actor_user_id = Column(String, ForeignKey("users.id"))
@@ -0,0 +1,262 @@
+"""
+Percentile norms for game scores
+
+Submitted item scores are counted into log-scale buckets, one set of buckets
+per (game, job role), in the score_norm_buckets table. A score x > 0 falls in
+bucket ceil(log(x) / log(gamma)) with gamma = (1 + a) / (1 - a), so every
+bucket spans a relative error of at most a = NORMS_RELATIVE_ACCURACY whatever
+the scale of the game's scores. Zero and negative scores get their own buckets
+below the positive ones. Submits increment one bucket row inside their own
+transaction; rebuild_norms() recomputes every bucket from assessment_items.
+
+Reads never sort scores: each worker keeps, per game, the sorted bucket keys
+and cumulative counts for every job role and for the game as a whole, and a
+percentile rank is a binary search over them. Snapshots are refreshed after
+NORMS_CACHE_TTL_SECONDS, or as soon as a transaction that counted a score on
+this worker commits.
+"""
+
+import math
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional
+from sqlalchemy import event, func, insert, select, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models import Assessment, AssessmentItem, ScoreNormBucket
+
+# Relative width of a bucket; run rebuild_norms.py after changing it
+NORMS_RELATIVE_ACCURACY = float(os.getenv("NORMS_RELATIVE_ACCURACY", "0.01"))
+# Seconds a per-game snapshot is served before it is reloaded (0 disables caching)
+NORMS_CACHE_TTL_SECONDS = float(os.getenv("NORMS_CACHE_TTL_SECONDS", "60"))
+# Rows read per round trip when rebuilding
+NORMS_REBUILD_CHUNK_SIZE = int(os.getenv("NORMS_REBUILD_CHUNK_SIZE", "10000"))
+
+_GAMMA = (1 + NORMS_RELATIVE_ACCURACY) / (1 - NORMS_RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+_MIN_POSITIVE = 1e-9
+_MAX_INDEX = 5000
+# Bucket keys: negative scores < zero < positive scores (-_MAX_INDEX.._MAX_INDEX)
+_ZERO_BUCKET = -2 * _MAX_INDEX
+_NEGATIVE_BASE = -4 * _MAX_INDEX
+
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+_STALE_KEY = "norms_stale_games"
+
+def _index(magnitude: float) -> int:
+    return max(-_MAX_INDEX, min(_MAX_INDEX, math.ceil(math.log(magnitude) / _LOG_GAMMA)))
+
+def bucket_of(score: float) -> int:
+    """Bucket key for a score; keys sort in the same order as the scores they hold"""
+    if score >= _MIN_POSITIVE:
+        return _index(score)
+    if score <= -_MIN_POSITIVE:
+        return _NEGATIVE_BASE - _index(-score)
+    return _ZERO_BUCKET
+
+def bucket_value(bucket: int) -> float:
+    """Representative score of a bucket (within NORMS_RELATIVE_ACCURACY of every score in it)"""
+    if bucket == _ZERO_BUCKET:
+        return 0.0
+    if bucket < _ZERO_BUCKET:
+        return -bucket_value(_NEGATIVE_BASE - bucket)
+    return 2 * _GAMMA ** bucket / (_GAMMA + 1)
+
+class Distribution(NamedTuple):
+    """Sorted bucket keys with cumulative counts"""
+    buckets: List[int]
+    cumulative: List[int]
+
+    @classmethod
+    def from_counts(cls, counts: Dict[int, int]) -> "Distribution":
+        buckets = sorted(bucket for bucket, count in counts.items() if count > 0)
+        cumulative, total = [], 0
+        for bucket in buckets:
+            total += counts[bucket]
+            cumulative.append(total)
+        return cls(buckets, cumulative)
+
+    @property
+    def count(self) -> int:
+        return self.cumulative[-1] if self.cumulative else 0
+
+    def percentile_rank(self, score: float) -> Optional[float]:
+        """Percentage of scores below this one, counting ties (same bucket) as half"""
+        if not self.buckets:
+            return None
+        bucket = bucket_of(score)
+        i = bisect_left(self.buckets, bucket)
+        below = self.cumulative[i - 1] if i > 0 else 0
+        same = self.cumulative[i] - below if i < len(self.buckets) and self.buckets[i] == bucket else 0
+        return 100.0 * (below + same / 2) / self.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate score at quantile q (0..1)"""
+        if not self.buckets:
+            return None
+        rank = min(self.count, max(1, math.ceil(q * self.count)))
+        return bucket_value(self.buckets[bisect_left(self.cumulative, rank)])
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "quantiles": {f"p{round(q * 100)}": self.quantile(q) for q in QUANTILES}
+        }
+
+class GameNorms(NamedTuple):
+    game_id: str
+    overall: Distribution
+    by_job_role: Dict[Optional[str], Distribution]
+
+_EMPTY = Distribution([], [])
+
+_lock = threading.Lock()
+_snapshots: Dict[str, tuple] = {}  # game_id -> (GameNorms, expires_at)
+_generation = 0  # Bumped by every invalidation
+_hits = 0
+_misses = 0
+
+def _load(db: Session, game_id: str) -> GameNorms:
+    rows = db.execute(
+        select(ScoreNormBucket.job_role_id, ScoreNormBucket.bucket, func.sum(ScoreNormBucket.count))
+        .where(ScoreNormBucket.game_id == game_id)
+        .group_by(ScoreNormBucket.job_role_id, ScoreNormBucket.bucket)
+    ).all()
+
+    overall: Counter = Counter()
+    by_job_role: Dict[Optional[str], Counter] = {}
+    for job_role_id, bucket, count in rows:
+        overall[bucket] += count
+        by_job_role.setdefault(job_role_id, Counter())[bucket] += count
+
+    return GameNorms(
+        game_id,
+        Distribution.from_counts(overall),
+        {job_role_id: Distribution.from_counts(counts) for job_role_id, counts in by_job_role.items()}
+    )
+
+def get_game_norms(db: Session, game_id: str) -> GameNorms:
+    """Return the cached norms for a game, reloading them once the TTL has passed"""
+    global _hits, _misses
+
+    with _lock:
+        cached = _snapshots.get(game_id)
+        if cached is not None and time.monotonic() < cached[1]:
+            _hits += 1
+            return cached[0]
+        _misses += 1
+        generation = _generation
+
+    norms = _load(db, game_id)
+
+    with _lock:
+        # Don't cache counts read before an invalidation that happened meanwhile
+        if generation == _generation:
+            _snapshots[game_id] = (norms, time.monotonic() + NORMS_CACHE_TTL_SECONDS)
+
+    return norms
+
+def percentile_ranks(db: Session, game_id: str, job_role_id: Optional[str], score: Optional[float]) -> Dict[str, Any]:
+    """Percentile rank of a score among all scores for the game and among the job role's scores"""
+    norms = get_game_norms(db, game_id)
+    job_role = norms.by_job_role.get(job_role_id, _EMPTY)
+    if score is None:
+        return {"game": None, "job_role": None, "game_count": norms.overall.count, "job_role_count": job_role.count}
+    return {
+        "game": norms.overall.percentile_rank(score),
+        "job_role": job_role.percentile_rank(score),
+        "game_count": norms.overall.count,
+        "job_role_count": job_role.count
+    }
+
+def record_score(db: Session, game_id: str, job_role_id: Optional[str], score: Optional[float]):
+    """
+    Count a submitted score into its bucket.
+
+    The increment is flushed into the caller's transaction and is committed
+    (or rolled back) together with the submit itself; the game's cached norms
+    are dropped once that transaction commits.
+    """
+    if score is None or not math.isfinite(score):
+        return
+
+    bucket = bucket_of(score)
+    bucket_filter = (
+        ScoreNormBucket.game_id == game_id,
+        ScoreNormBucket.job_role_id == job_role_id if job_role_id is not None else ScoreNormBucket.job_role_id.is_(None),
+        ScoreNormBucket.bucket == bucket
+    )
+    values = {ScoreNormBucket.count: ScoreNormBucket.count + 1}
+
+    updated = db.query(ScoreNormBucket).filter(*bucket_filter).update(values, synchronize_session=False)
+    if not updated:
+        try:
+            with db.begin_nested():
+                db.add(ScoreNormBucket(game_id=game_id, job_role_id=job_role_id, bucket=bucket, count=1))
+        except IntegrityError:
+            # Another request created the row first; count the score there instead
+            db.query(ScoreNormBucket).filter(*bucket_filter).update(values, synchronize_session=False)
+
+    db.info.setdefault(_STALE_KEY, set()).add(game_id)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    for game_id in session.info.pop(_STALE_KEY, ()):
+        invalidate(game_id)
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_stale(session: Session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop(_STALE_KEY, None)
+
+def rebuild_norms(db: Session, chunk_size: int = NORMS_REBUILD_CHUNK_SIZE) -> int:
+    """Recompute every bucket from the submitted items; returns the number of bucket rows"""
+    rows = db.execute(
+        select(AssessmentItem.game_id, Assessment.job_role_id, AssessmentItem.score)
+        .join(Assessment, Assessment.id == AssessmentItem.assessment_id)
+        .where(AssessmentItem.status == "SUBMITTED", AssessmentItem.score.isnot(None))
+        .execution_options(yield_per=chunk_size)
+    )
+
+    counts: Counter = Counter()
+    for game_id, job_role_id, score in rows:
+        if math.isfinite(score):
+            counts[(game_id, job_role_id, bucket_of(score))] += 1
+
+    db.execute(delete(ScoreNormBucket))
+    bucket_rows = [
+        {"game_id": game_id, "job_role_id": job_role_id, "bucket": bucket, "count": count}
+        for (game_id, job_role_id, bucket), count in counts.items()
+    ]
+    for start in range(0, len(bucket_rows), chunk_size):
+        db.execute(insert(ScoreNormBucket), bucket_rows[start:start + chunk_size])
+    db.commit()
+
+    invalidate()
+    return len(bucket_rows)
+
+def invalidate(game_id: Optional[str] = None):
+    """Drop the cached norms for one game (or all games) so the next read reloads them"""
+    global _generation
+
+    with _lock:
+        _generation += 1
+        if game_id is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(game_id, None)
+
+def stats() -> Dict[str, Any]:
+    """Snapshot cache counters for this worker"""
+    with _lock:
+        return {
+            "games": len(_snapshots),
+            "hits": _hits,
+            "misses": _misses,
+            "relative_accuracy": NORMS_RELATIVE_ACCURACY,
+            "ttl_seconds": NORMS_CACHE_TTL_SECONDS
+        }
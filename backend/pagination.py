@@ -0,0 +1,166 @@
+"""
+Keyset pagination for list endpoints
+
+A page is the first `limit` rows after the cursor in (sort key, id) order,
+found with a WHERE on the sort key rather than an OFFSET, so page N costs the
+same as page 1. Cursors are opaque (base64 JSON of the sort key, the last
+row's sort value and its id) and are only valid with the sort they were issued
+for. Sort keys are whitelisted per endpoint from SORT_KEYS; prefix one with "-"
+for descending order. NULL sort values come last in either direction.
+
+List endpoints return a plain JSON array and report the next cursor and total
+in response headers (set_page_headers).
+
+Lists that are already held in memory in a fixed order (the game catalog) are
+sliced after the last id returned instead; their cursors come from
+encode_id_cursor and are not interchangeable with keyset cursors.
+
+Totals are only computed on request: count="exact" runs a COUNT over the
+filtered query, count="estimate" uses the planner's row estimate on
+PostgreSQL (and an exact COUNT elsewhere).
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response
+from sqlalchemy import DateTime, Float, Select, String, and_, func, or_, select, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+
+SORT_KEYS = ("created_at", "total_score", "status")
+COUNT_MODES = ("exact", "estimate")
+MAX_LIMIT = 500
+
+class Page(NamedTuple):
+    rows: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+def encode_cursor(sort: str, value: Any, row_id: str) -> str:
+    """Encode a keyset position as an opaque cursor"""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps({"s": sort, "v": value, "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    """Decode a cursor issued for `sort` into (sort value, id)"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if position["s"] != sort:
+            raise ValueError("cursor was issued for a different sort")
+        return position["v"], position["id"]
+    except (ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def encode_id_cursor(row_id: str) -> str:
+    """Encode the position after row_id in a list with a fixed order"""
+    raw = json.dumps({"id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_id_cursor(cursor: str) -> str:
+    """Decode a cursor from encode_id_cursor into the id of the last row returned"""
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        if not isinstance(position, dict) or position.keys() != {"id"} or not isinstance(position["id"], str):
+            raise ValueError("not an id cursor")
+        return position["id"]
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def parse_sort(sort: str, allowed: Sequence[str]) -> Tuple[str, bool]:
+    """Split "-key" / "key" into (key, descending), rejecting keys that are not whitelisted"""
+    key = sort[1:] if sort.startswith("-") else sort
+    if key not in allowed:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(allowed)} (prefix with - for descending)")
+    return key, sort.startswith("-")
+
+def clamp_limit(limit: int) -> int:
+    return max(1, min(limit, MAX_LIMIT))
+
+def _cursor_value(column, value: Any) -> Any:
+    if value is None:
+        return None
+    try:
+        if isinstance(column.type, DateTime):
+            return datetime.fromisoformat(value)
+        if isinstance(column.type, Float):
+            return float(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return value
+
+def _after(db: AsyncSession, column, id_column, value: Any, row_id: str, descending: bool):
+    """Rows that come after (value, row_id) in (column NULLS LAST, id) order"""
+    if value is not None and isinstance(column.type, DateTime) and db.bind.dialect.name == "sqlite":
+        # SQLite stores func.now() defaults as text without microseconds,
+        # so compare in that format rather than as a bound DATETIME
+        column = type_coerce(column, String)
+        value = str(value)
+
+    if value is None:
+        return and_(column.is_(None), id_column > row_id)
+    beyond = column < value if descending else column > value
+    return or_(beyond, and_(column == value, id_column > row_id), column.is_(None))
+
+async def _count(db: AsyncSession, query: Select, mode: str) -> Tuple[int, bool]:
+    query = query.order_by(None)
+    if mode == "estimate" and db.bind.dialect.name == "postgresql":
+        compiled = query.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True})
+        connection = await db.connection()
+        plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+    return await db.scalar(select(func.count()).select_from(query.subquery())), False
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    model,
+    sort: str,
+    allowed: Sequence[str],
+    limit: int,
+    cursor: Optional[str] = None,
+    count: Optional[str] = None
+) -> Page:
+    """
+    Fetch one page of query, whose first selected entity must be model.
+
+    The filters already on query are kept; ordering, the keyset condition and
+    the limit are added here. Rows are returned as selected.
+    """
+    key, descending = parse_sort(sort, allowed)
+    if count is not None and count not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"count must be one of: {', '.join(COUNT_MODES)}")
+    limit = clamp_limit(limit)
+    column = getattr(model, key)
+
+    total, total_is_estimate = None, False
+    if count:
+        total, total_is_estimate = await _count(db, query, count)
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort)
+        query = query.where(_after(db, column, model.id, _cursor_value(column, value), row_id, descending))
+
+    query = query.order_by(column.is_(None), column.desc() if descending else column, model.id).limit(limit + 1)
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1][0]
+        next_cursor = encode_cursor(sort, getattr(last, key), last.id)
+
+    return Page(rows, next_cursor, total, total_is_estimate)
+
+def set_page_headers(response: Response, page: Page):
+    """Report the next cursor and total of a page whose body is a plain array"""
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        response.headers["X-Total-Count"] = str(page.total)
+        response.headers["X-Total-Count-Estimated"] = "true" if page.total_is_estimate else "false"
@@ -0,0 +1,69 @@
+"""
+Password hashing on a bounded thread pool
+
+bcrypt deliberately costs 100-300 ms of CPU per call. Running it inline in an
+async handler stalls the event loop for every other request, so hashing and
+verification run on a dedicated, size-limited executor instead. When more than
+PASSWORD_HASH_MAX_PENDING calls are queued the request is rejected with 503
+rather than letting a login burst build an unbounded backlog.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_lock = threading.Lock()
+_pending = 0
+_max_pending_seen = 0
+_completed = 0
+_rejected = 0
+
+async def _run(func, *args):
+    global _pending, _max_pending_seen, _completed, _rejected
+
+    with _lock:
+        if _pending >= PASSWORD_HASH_MAX_PENDING:
+            _rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent authentication requests, please retry"
+            )
+        _pending += 1
+        _max_pending_seen = max(_max_pending_seen, _pending)
+
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, func, *args)
+    finally:
+        with _lock:
+            _pending -= 1
+            _completed += 1
+
+async def verify_password(plain_password, hashed_password) -> bool:
+    return await _run(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash(password) -> str:
+    return await _run(pwd_context.hash, password)
+
+def stats() -> Dict[str, Any]:
+    """Queue-depth counters for the metrics endpoint"""
+    with _lock:
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "max_pending": PASSWORD_HASH_MAX_PENDING,
+            "pending": _pending,
+            "active": min(_pending, PASSWORD_HASH_WORKERS),
+            "queued": max(0, _pending - PASSWORD_HASH_WORKERS),
+            "max_pending_seen": _max_pending_seen,
+            "completed": _completed,
+            "rejected": _rejected
+        }
@@ -0,0 +1,83 @@
+"""
+LRU + TTL cache of authenticated principals
+
+Resolving the JWT subject to a User / AdminUser row is the only query most
+authenticated requests make before reaching the handler. Resolved principals are
+cached per worker as detached snapshots keyed by subject and merged into the
+request's session without a SELECT on a hit. Writes that change a principal call
+invalidate() so the next request reloads it; other workers see the change once
+PRINCIPAL_CACHE_TTL_SECONDS has passed.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import make_transient_to_detached
+
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", "1024"))
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+
+_lock = threading.Lock()
+_entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+_hits = 0
+_misses = 0
+
+def _detached_copy(instance):
+    """Copy a loaded row's column values into a clean, session-less instance"""
+    mapper = inspect(instance).mapper
+    copy = mapper.class_(**{attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+async def get(db: AsyncSession, key: Hashable):
+    """Return the cached principal for key attached to db, or None on a miss"""
+    global _hits, _misses
+
+    with _lock:
+        entry = _entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            if entry is not None:
+                del _entries[key]
+            _misses += 1
+            return None
+        _entries.move_to_end(key)
+        _hits += 1
+        snapshot = entry[1]
+
+    return await db.merge(snapshot, load=False)
+
+def put(key: Hashable, instance):
+    """Cache a principal loaded in the current request"""
+    snapshot = _detached_copy(instance)
+
+    with _lock:
+        _entries[key] = (time.monotonic() + PRINCIPAL_CACHE_TTL_SECONDS, snapshot)
+        _entries.move_to_end(key)
+        while len(_entries) > PRINCIPAL_CACHE_SIZE:
+            _entries.popitem(last=False)
+
+def invalidate(principal_id: Optional[str] = None):
+    """Drop cached entries for one principal id, or everything when no id is given"""
+    with _lock:
+        if principal_id is None:
+            _entries.clear()
+            return
+        for key in [key for key, (_, snapshot) in _entries.items() if snapshot.id == principal_id]:
+            del _entries[key]
+
+def stats() -> Dict[str, Any]:
+    """Hit/miss counters for the metrics endpoint"""
+    with _lock:
+        lookups = _hits + _misses
+        return {
+            "size": len(_entries),
+            "max_size": PRINCIPAL_CACHE_SIZE,
+            "ttl_seconds": PRINCIPAL_CACHE_TTL_SECONDS,
+            "hits": _hits,
+            "misses": _misses,
+            "hit_rate": _hits / lookups if lookups else 0.0
+        }
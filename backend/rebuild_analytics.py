@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the assessment_summaries analytics table from scratch
+
+The table itself is created by the alembic migrations (alembic upgrade head).
+"""
+
+from database import SessionLocal
+import analytics
+import sys
+
+def rebuild_analytics():
+    """Recompute per-tenant / per-job-role assessment summaries"""
+    try:
+        db = SessionLocal()
+        
+        count = analytics.rebuild_summaries(db)
+        print(f"Rebuilt {count} assessment summary rows")
+        
+        db.close()
+        
+    except Exception as e:
+        print(f"Error rebuilding analytics: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    rebuild_analytics()
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the score_norm_buckets percentile norms from submitted items
+
+The table itself is created by the alembic migrations (alembic upgrade head).
+"""
+
+from database import SessionLocal
+import norms
+import sys
+
+def rebuild_score_norms():
+    """Recount every per-game / per-job-role score bucket"""
+    try:
+        db = SessionLocal()
+
+        count = norms.rebuild_norms(db)
+        print(f"Rebuilt {count} score norm buckets")
+
+        db.close()
+
+    except Exception as e:
+        print(f"Error rebuilding score norms: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    rebuild_score_norms()
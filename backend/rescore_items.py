@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Re-score stored assessment items with the current game scoring formulas
+
+Items scored by POST /games/score keep their raw metrics next to a
+"server_scoring" block in metrics_json. This job walks assessment_items in
+id order, RESCORE_CHUNK_SIZE rows at a time, re-scores each chunk per game with
+batch_scoring (identical results to GAME_SCORING_FUNCTIONS), and writes score
+and metrics_json back with one bulk UPDATE per chunk. It then recomputes the
+item counters and total_score of every assessment in SQL, and finally
+rebuilds the analytics summaries and the score norms.
+
+Items whose metrics cannot be scored (metrics_json that is not an object, or
+non-numeric metric values) are logged, counted as failed and left unchanged;
+they do not stop the job.
+
+Every chunk is its own short transaction, and progress is saved to a checkpoint
+file after each commit, so the job can be stopped and rerun to resume:
+
+    python rescore_items.py            # start or resume
+    python rescore_items.py --reset    # discard the checkpoint and start over
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from sqlalchemy import select, update, func, case
+from database import SessionLocal
+from models import Assessment, AssessmentItem, Game
+import analytics
+import batch_scoring
+import norms
+
+logger = logging.getLogger(__name__)
+
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", "5000"))
+RESCORE_CHECKPOINT_PATH = os.getenv("RESCORE_CHECKPOINT_PATH", "rescore_checkpoint.json")
+
+def _load_checkpoint(path):
+    checkpoint = {"phase": "items", "last_id": None, "rescored": 0, "skipped": 0, "failed": 0, "assessments": 0}
+    if os.path.exists(path):
+        with open(path) as f:
+            checkpoint.update(json.load(f))
+    return checkpoint
+
+def _save_checkpoint(path, checkpoint):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+def _next_chunk(db, model, columns, last_id, chunk_size):
+    query = select(*columns).order_by(model.id).limit(chunk_size)
+    if last_id is not None:
+        query = query.where(model.id > last_id)
+    return db.execute(query).all()
+
+def _score_updates(code, items):
+    """Score (item_id, raw_metrics) pairs of one game as a batch; returns the UPDATE parameters"""
+    scores = batch_scoring.score_batch(code, batch_scoring.columns_from_metrics(code, [m for _, m in items]))
+    feedback = scores.feedback()
+    updates = []
+    for i, (item_id, raw_metrics) in enumerate(items):
+        row = scores.row(i)
+        updates.append({
+            "id": item_id,
+            "score": row["score"],
+            "metrics_json": {
+                **raw_metrics,
+                "server_scoring": {
+                    "normalized_score": row["normalized_score"],
+                    "trait_scores": row["trait_scores"],
+                    "performance_level": row["performance_level"],
+                    "feedback": feedback[i]
+                }
+            }
+        })
+    return updates
+
+def _rescore_chunk(db, rows, game_codes):
+    """Re-score one chunk of items; returns (rescored, skipped, failed)"""
+    by_game = {}
+    skipped = failed = 0
+    for item_id, game_id, metrics in rows:
+        code = game_codes.get(game_id)
+        if code not in batch_scoring.BATCH_SCORING_FUNCTIONS or metrics is None:
+            skipped += 1
+            continue
+        if not isinstance(metrics, dict):
+            logger.warning("Item %s failed: metrics_json is not an object", item_id)
+            failed += 1
+            continue
+        if "server_scoring" not in metrics:
+            skipped += 1
+            continue
+        raw_metrics = {key: value for key, value in metrics.items() if key != "server_scoring"}
+        by_game.setdefault(code, []).append((item_id, raw_metrics))
+
+    updates = []
+    for code, items in by_game.items():
+        try:
+            updates.extend(_score_updates(code, items))
+        except (ValueError, ZeroDivisionError):
+            # One malformed item fails its whole batch; score the items one at a time to isolate it
+            for item in items:
+                try:
+                    updates.extend(_score_updates(code, [item]))
+                except (ValueError, ZeroDivisionError) as e:
+                    logger.warning("Item %s failed: %s", item[0], e)
+                    failed += 1
+
+    if updates:
+        db.execute(update(AssessmentItem), updates)
+    return len(updates), skipped, failed
+
+def _recompute_assessments(db, assessment_ids):
+    """Recompute item counters and total_score for a chunk of assessments in one UPDATE"""
+    submitted = AssessmentItem.status == "SUBMITTED"
+
+    def item_aggregate(expression):
+        return select(expression).where(AssessmentItem.assessment_id == Assessment.id).scalar_subquery()
+
+    items_scored = item_aggregate(func.count(AssessmentItem.id).filter(submitted & AssessmentItem.score.isnot(None)))
+    score_sum = item_aggregate(func.coalesce(func.sum(case((submitted, AssessmentItem.score), else_=None)), 0.0))
+
+    # Computed in SQL so a submit that lands mid-job is not overwritten with stale counts
+    db.execute(
+        update(Assessment)
+        .where(Assessment.id.in_(assessment_ids))
+        .values(
+            items_submitted=item_aggregate(func.count(AssessmentItem.id).filter(submitted)),
+            items_scored=items_scored,
+            score_sum=score_sum,
+            # Same rule as _check_assessment_completion
+            total_score=case(
+                (Assessment.status != "COMPLETED", Assessment.total_score),
+                (items_scored > 0, score_sum / items_scored),
+                else_=0
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def _report(label, done, started):
+    elapsed = time.perf_counter() - started
+    print(f"{label}: {done} in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.0f}/s)", flush=True)
+
+def rescore_items(chunk_size, checkpoint_path, reset):
+    """Run (or resume) the re-scoring job"""
+    try:
+        if reset and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        checkpoint = _load_checkpoint(checkpoint_path)
+
+        db = SessionLocal()
+        game_codes = dict(db.execute(select(Game.id, Game.code)).all())
+
+        if checkpoint["phase"] == "items":
+            started, done = time.perf_counter(), 0
+            while True:
+                rows = _next_chunk(
+                    db, AssessmentItem,
+                    (AssessmentItem.id, AssessmentItem.game_id, AssessmentItem.metrics_json),
+                    checkpoint["last_id"], chunk_size
+                )
+                if not rows:
+                    break
+                rescored, skipped, failed = _rescore_chunk(db, rows, game_codes)
+                db.commit()
+
+                checkpoint["last_id"] = rows[-1][0]
+                checkpoint["rescored"] += rescored
+                checkpoint["skipped"] += skipped
+                checkpoint["failed"] += failed
+                _save_checkpoint(checkpoint_path, checkpoint)
+                done += len(rows)
+                _report("Items scanned", done, started)
+
+            checkpoint.update(phase="assessments", last_id=None)
+            _save_checkpoint(checkpoint_path, checkpoint)
+            print(f"Re-scored {checkpoint['rescored']} items, skipped {checkpoint['skipped']} without server scoring, "
+                  f"{checkpoint['failed']} failed (malformed metrics)")
+
+        if checkpoint["phase"] == "assessments":
+            started, done = time.perf_counter(), 0
+            while True:
+                rows = _next_chunk(db, Assessment, (Assessment.id,), checkpoint["last_id"], chunk_size)
+                if not rows:
+                    break
+                _recompute_assessments(db, [row[0] for row in rows])
+                db.commit()
+
+                checkpoint["last_id"] = rows[-1][0]
+                checkpoint["assessments"] += len(rows)
+                _save_checkpoint(checkpoint_path, checkpoint)
+                done += len(rows)
+                _report("Assessments recomputed", done, started)
+
+            count = analytics.rebuild_summaries(db)
+            print(f"Rebuilt {count} assessment summary rows")
+            count = norms.rebuild_norms(db)
+            print(f"Rebuilt {count} score norm buckets")
+            checkpoint.update(phase="done", last_id=None)
+            _save_checkpoint(checkpoint_path, checkpoint)
+
+        db.close()
+        print(f"Done: {checkpoint['rescored']} items re-scored, {checkpoint['failed']} failed (malformed metrics), "
+              f"{checkpoint['assessments']} assessments recomputed "
+              f"(remove {checkpoint_path} or pass --reset to run again)")
+
+    except Exception as e:
+        print(f"Error re-scoring items: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-score stored assessment items with the current formulas")
+    parser.add_argument("--chunk-size", type=int, default=RESCORE_CHUNK_SIZE)
+    parser.add_argument("--checkpoint", default=RESCORE_CHECKPOINT_PATH)
+    parser.add_argument("--reset", action="store_true", help="discard the checkpoint and start over")
+    args = parser.parse_args()
+    logging.basicConfig(format="%(levelname)s: %(message)s")
+    rescore_items(args.chunk_size, args.checkpoint, args.reset)
@@ -0,0 +1,18 @@
+"""
+JSON responses for handlers that build their payload themselves
+
+The app's default response class is ORJSONResponse, but FastAPI still runs a
+returned dict through response_model validation (or jsonable_encoder when
+there is no response_model) before encoding it. Handlers whose dicts already
+have exactly the declared response shape, with JSON-ready values (ISO date
+strings, plain dicts and lists), return prevalidated(...) to skip that pass;
+response_model still documents the endpoint in OpenAPI.
+"""
+
+from typing import Any, Optional
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+
+def prevalidated(content: Any, response: Optional[Response] = None) -> ORJSONResponse:
+    """Encode content as-is, keeping any headers the handler set on its injected response"""
+    return ORJSONResponse(content, headers=dict(response.headers) if response is not None else None)
@@ -1,13 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, delete, func, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from database import get_db, pool_stats
 from models import User, Assessment, JobRole, CandidateProfile
-from routers.auth import get_current_admin_user
-from typing import Dict, Any
+from routers.auth import get_current_admin_user, get_streaming_admin_user
+import analytics
+import events
+import exports
+import principal_cache
+import password_hashing
+import audit_log
+import game_catalog
+import http_cache
+import leaderboard
+import norms
+import pagination
+import responses
+from password_hashing import get_password_hash
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
+from datetime import datetime
 import uuid
-from passlib.context import CryptContext
 
 router = APIRouter()
 
@@ -18,97 +32,166 @@ class CreateCandidateRequest(BaseModel):
     full_name: str
     job_role_id: str = None
 
-# Password context for hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 @router.get("/analytics/overview")
 async def get_admin_analytics_overview(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ) -> Dict[str, Any]:
     """Get overview analytics for admin dashboard"""
     
-    # Get total candidates (users who are candidates - case insensitive)
-    total_candidates = db.query(User).filter(
-        func.lower(User.role) == 'candidate'
-    ).count()
+    return await db.run_sync(analytics.get_overview)
+
+@router.get("/analytics/job-roles")
+async def get_admin_analytics_job_roles(
+    tenant_id: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> List[Dict[str, Any]]:
+    """Get per-job-role completion and average score for admin dashboard"""
     
-    # Get active candidates
-    active_candidates = db.query(User).filter(
-        func.lower(User.role) == 'candidate',
-        User.is_active == True
-    ).count()
+    return await db.run_sync(analytics.get_job_role_breakdown, tenant_id)
+
+@router.get("/norms/{game_id}")
+async def get_admin_game_norms(
+    game_id: str,
+    job_role_id: Optional[str] = None,
+    score: Optional[float] = None,
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Get a game's score distribution overall and per job role, and optionally the percentile rank of a score"""
     
-    # Get total assessments
-    total_assessments = db.query(Assessment).count()
+    game_norms = await db.run_sync(norms.get_game_norms, game_id)
+    job_roles = game_norms.by_job_role
+    if job_role_id is not None:
+        job_roles = {job_role_id: job_roles.get(job_role_id, norms.Distribution([], []))}
+
+    result = {
+        "game_id": game_id,
+        "overall": game_norms.overall.summary(),
+        "job_roles": [
+            {"job_role_id": role_id, **distribution.summary()}
+            for role_id, distribution in job_roles.items()
+        ]
+    }
+    if score is not None:
+        result["score"] = score
+        result["percentile_rank"] = game_norms.overall.percentile_rank(score)
+        for entry in result["job_roles"]:
+            entry["percentile_rank"] = job_roles[entry["job_role_id"]].percentile_rank(score)
+    return result
+
+@router.get("/leaderboard")
+async def get_admin_leaderboard(
+    job_role_id: str,
+    limit: int = 10,
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> List[Dict[str, Any]]:
+    """Get the top completed assessments for a job role"""
     
-    # Get completed assessments
-    completed_assessments = db.query(Assessment).filter(
-        Assessment.status == 'COMPLETED'
-    ).count()
+    if limit < 1 or limit > leaderboard.LEADERBOARD_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {leaderboard.LEADERBOARD_SIZE}")
+    
+    return await leaderboard.top(db, job_role_id, limit)
+
+@router.get("/leaderboard/candidates/{candidate_id}")
+async def get_admin_leaderboard_rank(
+    candidate_id: str,
+    job_role_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_admin: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Get a candidate's leaderboard rank (their best completed assessment) for a job role"""
     
-    # Get total job roles
-    total_job_roles = db.query(JobRole).count()
+    rank = await leaderboard.candidate_rank(db, job_role_id, candidate_id)
+    if rank is None:
+        raise HTTPException(status_code=404, detail="No completed assessment for this candidate and job role")
     
-    # Debug: Get all user roles to see what we have
-    all_roles = db.query(User.role).distinct().all()
-    print(f"Debug - All roles in database: {[role[0] for role in all_roles]}")
+    return rank
+
+@router.get("/events")
+async def stream_admin_events(
+    tenant_id: Optional[str] = None,
+    job_role_id: Optional[str] = None,
+    last_event_id: Optional[int] = Header(None),
+    current_admin: User = Depends(get_streaming_admin_user)
+):
+    """Stream assessment progress (started, item started/submitted, completed) as Server-Sent Events"""
     
-    return {
-        "total_candidates": total_candidates,
-        "active_candidates": active_candidates,
-        "total_assessments": total_assessments,
-        "completed_assessments": completed_assessments,
-        "total_job_roles": total_job_roles
-    }
+    return StreamingResponse(
+        events.stream(tenant_id, job_role_id, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/metrics")
+async def get_admin_metrics(
+    current_admin: User = Depends(get_current_admin_user)
+) -> Dict[str, Any]:
+    """Get in-process cache and worker metrics for this API worker"""
     
     return {
-        "total_candidates": total_candidates,
-        "active_candidates": active_candidates,
-        "total_assessments": total_assessments,
-        "completed_assessments": completed_assessments,
-        "total_job_roles": total_job_roles
+        "principal_cache": principal_cache.stats(),
+        "password_hashing": password_hashing.stats(),
+        "database_pool": pool_stats(),
+        "audit_log": audit_log.stats(),
+        "game_catalog": game_catalog.stats(),
+        "norms": norms.stats(),
+        "leaderboard": leaderboard.stats(),
+        "http_cache": http_cache.stats(),
+        "events": events.stats()
     }
 
 @router.get("/candidates")
 async def get_admin_candidates(
+    response: Response,
     is_active: bool = None,
-    db: Session = Depends(get_db),
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    count: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
-    """Get all candidates for admin"""
+    """Get candidates for admin, keyset-paginated by an opaque cursor (next cursor and total in headers)"""
+    
+    # Assessment stats for every candidate in one grouped query
+    assessment_stats = select(
+        Assessment.candidate_id.label("candidate_id"),
+        func.count(Assessment.id).label("assessment_count"),
+        func.sum(case((Assessment.status == 'COMPLETED', 1), else_=0)).label("completed_assessments")
+    ).group_by(Assessment.candidate_id).subquery()
     
     # Query for users who are candidates - case insensitive
-    query = db.query(User).filter(
+    query = select(
+        User,
+        JobRole.title,
+        func.coalesce(assessment_stats.c.assessment_count, 0),
+        func.coalesce(assessment_stats.c.completed_assessments, 0)
+    ).outerjoin(
+        JobRole, JobRole.id == User.job_role_id
+    ).outerjoin(
+        assessment_stats, assessment_stats.c.candidate_id == User.id
+    ).where(
         func.lower(User.role) == 'candidate'
     )
     
     if is_active is not None:
-        query = query.filter(User.is_active == is_active)
+        query = query.where(User.is_active == is_active)
     
-    candidates = query.all()
+    page = await pagination.paginate(db, query, User, sort, ("created_at",), limit, cursor, count)
+    pagination.set_page_headers(response, page)
     
-    result = []
-    for candidate in candidates:
-        # Get job role info
-        job_role = None
-        if candidate.job_role_id:
-            job_role = db.query(JobRole).filter(JobRole.id == candidate.job_role_id).first()
-        
-        # Get assessment stats
-        assessment_count = db.query(Assessment).filter(Assessment.candidate_id == candidate.id).count()
-        completed_assessments = db.query(Assessment).filter(
-            Assessment.candidate_id == candidate.id,
-            Assessment.status == 'COMPLETED'
-        ).count()
-        
-        result.append({
+    candidates = []
+    for candidate, job_role_title, assessment_count, completed_assessments in page.rows:
+        candidates.append({
             "id": candidate.id,
             "username": candidate.username,
             "email": candidate.email,
             "full_name": candidate.full_name,
             "job_role_id": candidate.job_role_id,
-            "job_role_title": job_role.title if job_role else None,
+            "job_role_title": job_role_title,
             "is_active": candidate.is_active,
             "created_at": candidate.created_at.isoformat(),
             "last_login_at": candidate.last_login_at.isoformat() if candidate.last_login_at else None,
@@ -116,35 +199,35 @@ async def get_admin_candidates(
             "completed_assessments": completed_assessments
         })
     
-    return result
+    return responses.prevalidated(candidates, response)
 
 @router.post("/candidates")
 async def create_admin_candidate(
     candidate_data: CreateCandidateRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Create a new candidate"""
     
     # Check if username already exists
-    existing_user = db.query(User).filter(User.username == candidate_data.username).first()
+    existing_user = await db.scalar(select(User).where(User.username == candidate_data.username))
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
     
     # Check if email already exists
-    existing_email = db.query(User).filter(User.email == candidate_data.email).first()
+    existing_email = await db.scalar(select(User).where(User.email == candidate_data.email))
     if existing_email:
         raise HTTPException(status_code=400, detail="Email already exists")
     
     # Validate job role if provided
     if candidate_data.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == candidate_data.job_role_id).first()
+        job_role = await db.scalar(select(JobRole).where(JobRole.id == candidate_data.job_role_id))
         if not job_role:
             raise HTTPException(status_code=400, detail="Invalid job role ID")
     
     # Generate a temporary password (user will need to reset it)
     temp_password = f"temp{uuid.uuid4().hex[:8]}"
-    hashed_password = pwd_context.hash(temp_password)
+    hashed_password = await get_password_hash(temp_password)
     
     # Create new user
     new_user = User(
@@ -159,13 +242,14 @@ async def create_admin_candidate(
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
+    analytics.invalidate_overview()
     
     # Get job role info for response
     job_role = None
     if new_user.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == new_user.job_role_id).first()
+        job_role = await db.scalar(select(JobRole).where(JobRole.id == new_user.job_role_id))
     
     return {
         "id": new_user.id,
@@ -185,15 +269,15 @@ async def create_admin_candidate(
 @router.get("/candidates/{candidate_id}")
 async def get_admin_candidate(
     candidate_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Get a specific candidate for admin"""
     
-    candidate = db.query(User).filter(
+    candidate = await db.scalar(select(User).where(
         User.id == candidate_id,
         User.role != 'admin'
-    ).first()
+    ))
     
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
@@ -201,14 +285,14 @@ async def get_admin_candidate(
     # Get job role info
     job_role = None
     if candidate.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == candidate.job_role_id).first()
+        job_role = await db.scalar(select(JobRole).where(JobRole.id == candidate.job_role_id))
     
     # Get assessment stats
-    assessment_count = db.query(Assessment).filter(Assessment.candidate_id == candidate.id).count()
-    completed_assessments = db.query(Assessment).filter(
+    assessment_count = await db.scalar(select(func.count()).select_from(Assessment).where(Assessment.candidate_id == candidate.id))
+    completed_assessments = await db.scalar(select(func.count()).select_from(Assessment).where(
         Assessment.candidate_id == candidate.id,
         Assessment.status == 'COMPLETED'
-    ).count()
+    ))
     
     return {
         "id": candidate.id,
@@ -228,15 +312,15 @@ async def get_admin_candidate(
 async def update_admin_candidate(
     candidate_id: str,
     update_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Update a candidate (admin only)"""
     
-    candidate = db.query(User).filter(
+    candidate = await db.scalar(select(User).where(
         User.id == candidate_id,
         User.role != 'admin'
-    ).first()
+    ))
     
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
@@ -246,61 +330,81 @@ async def update_admin_candidate(
         if hasattr(candidate, field) and field in ['is_active', 'full_name', 'email']:
             setattr(candidate, field, value)
     
-    db.commit()
-    db.refresh(candidate)
+    await db.commit()
+    await db.refresh(candidate)
+    principal_cache.invalidate(candidate_id)
+    analytics.invalidate_overview()
     
     return {"message": "Candidate updated successfully"}
 
 @router.delete("/candidates/{candidate_id}")
 async def delete_admin_candidate(
     candidate_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Delete a candidate (admin only)"""
     
-    candidate = db.query(User).filter(
+    candidate = await db.scalar(select(User).where(
         User.id == candidate_id,
         User.role != 'admin'
-    ).first()
+    ))
     
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
     
     # Delete related assessments first
-    db.query(Assessment).filter(Assessment.candidate_id == candidate_id).delete()
+    completed_job_role_ids = set()
+    for assessment in (await db.scalars(select(Assessment).where(Assessment.candidate_id == candidate_id))).all():
+        await db.run_sync(analytics.record_assessment_change, analytics.assessment_state(assessment), None)
+        if assessment.status == "COMPLETED":
+            completed_job_role_ids.add(assessment.job_role_id)
+    await db.execute(delete(Assessment).where(Assessment.candidate_id == candidate_id))
     
     # Delete the candidate
-    db.delete(candidate)
-    db.commit()
+    await db.delete(candidate)
+    await db.commit()
+    principal_cache.invalidate(candidate_id)
+    analytics.invalidate_overview()
+    for job_role_id in completed_job_role_ids:
+        leaderboard.invalidate(job_role_id)
     
     return {"message": "Candidate deleted successfully"}
 
 @router.get("/assessments")
 async def get_admin_assessments(
+    response: Response,
     status: str = None,
-    db: Session = Depends(get_db),
+    job_role_id: Optional[str] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    count: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
-    """Get all assessments for admin"""
-    
-    query = db.query(Assessment)
+    """Get assessments for admin, keyset-paginated by an opaque cursor (next cursor and total in headers)"""
+    
+    query = select(
+        Assessment,
+        User.full_name,
+        JobRole.title
+    ).outerjoin(
+        User, User.id == Assessment.candidate_id
+    ).outerjoin(
+        JobRole, JobRole.id == Assessment.job_role_id
+    )
     
     if status:
-        query = query.filter(Assessment.status == status)
+        query = query.where(Assessment.status == status)
+    if job_role_id:
+        query = query.where(Assessment.job_role_id == job_role_id)
     
-    assessments = query.all()
+    page = await pagination.paginate(db, query, Assessment, sort, pagination.SORT_KEYS, limit, cursor, count)
+    pagination.set_page_headers(response, page)
     
     result = []
-    for assessment in assessments:
-        # Get candidate info
-        candidate = db.query(User).filter(User.id == assessment.candidate_id).first()
-        
-        # Get job role info
-        job_role = None
-        if assessment.job_role_id:
-            job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
-        
+    for assessment, candidate_name, job_role_title in page.rows:
         # Calculate progress percentage
         progress_percentage = 0
         if assessment.total_score is not None:
@@ -316,33 +420,72 @@ async def get_admin_assessments(
             "started_at": assessment.started_at.isoformat() if assessment.started_at else None,
             "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None,
             "total_score": assessment.total_score,
-            "candidate_name": candidate.full_name if candidate else None,
-            "job_role_title": job_role.title if job_role else None,
+            "created_at": assessment.created_at.isoformat() if assessment.created_at else None,
+            "candidate_name": candidate_name,
+            "job_role_title": job_role_title,
             "progress_percentage": progress_percentage
         })
     
-    return result
+    return responses.prevalidated(result, response)
+
+def _export_response(query, columns, format: str, name: str) -> StreamingResponse:
+    if format not in exports.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of: {', '.join(exports.FORMATS)}")
+    
+    return StreamingResponse(
+        exports.stream(query, columns, format),
+        media_type=exports.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'}
+    )
+
+@router.get("/assessments/export")
+async def export_admin_assessments(
+    format: str = "csv",
+    status: Optional[str] = None,
+    job_role_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_admin: User = Depends(get_streaming_admin_user)
+):
+    """Stream assessments with candidate and job role as CSV or NDJSON"""
+    
+    query = exports.assessments_query(status, job_role_id, created_from, created_to)
+    return _export_response(query, exports.ASSESSMENT_COLUMNS, format, "assessments")
+
+@router.get("/assessment-items/export")
+async def export_admin_assessment_items(
+    format: str = "csv",
+    status: Optional[str] = None,
+    job_role_id: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_admin: User = Depends(get_streaming_admin_user)
+):
+    """Stream the items (with game and metrics) of the matching assessments as CSV or NDJSON"""
+    
+    query = exports.items_query(status, job_role_id, created_from, created_to)
+    return _export_response(query, exports.ITEM_COLUMNS, format, "assessment_items")
 
 @router.get("/assessments/{assessment_id}")
 async def get_admin_assessment(
     assessment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Get a specific assessment for admin"""
     
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == assessment_id))
     
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
     # Get candidate info
-    candidate = db.query(User).filter(User.id == assessment.candidate_id).first()
+    candidate = await db.scalar(select(User).where(User.id == assessment.candidate_id))
     
     # Get job role info
     job_role = None
     if assessment.job_role_id:
-        job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
+        job_role = await db.scalar(select(JobRole).where(JobRole.id == assessment.job_role_id))
     
     # Calculate progress percentage
     progress_percentage = 0
@@ -367,30 +510,33 @@ async def get_admin_assessment(
 @router.delete("/assessments/{assessment_id}")
 async def delete_admin_assessment(
     assessment_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Delete an assessment (admin only)"""
     
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == assessment_id))
     
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
     
-    db.delete(assessment)
-    db.commit()
+    await db.run_sync(analytics.record_assessment_change, analytics.assessment_state(assessment), None)
+    await db.delete(assessment)
+    await db.commit()
+    if assessment.status == "COMPLETED":
+        leaderboard.invalidate(assessment.job_role_id)
     
     return {"message": "Assessment deleted successfully"}
 
 @router.get("/job-roles/{job_role_id}")
 async def get_admin_job_role(
     job_role_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Get a specific job role for admin"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
@@ -401,12 +547,12 @@ async def get_admin_job_role(
 async def update_admin_job_role(
     job_role_id: str,
     update_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Update a job role (admin only)"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
@@ -416,26 +562,28 @@ async def update_admin_job_role(
         if hasattr(job_role, field) and field in ['title', 'description', 'traits_json', 'config_json']:
             setattr(job_role, field, value)
     
-    db.commit()
-    db.refresh(job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
+    await db.refresh(job_role)
     
     return {"message": "Job role updated successfully"}
 
 @router.delete("/job-roles/{job_role_id}")
 async def delete_admin_job_role(
     job_role_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Delete a job role (admin only)"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
     
     # Check if any candidates are assigned to this job role
-    candidates_with_role = db.query(CandidateProfile).filter(CandidateProfile.job_role_id == job_role_id).count()
+    candidates_with_role = await db.scalar(select(func.count()).select_from(CandidateProfile).where(CandidateProfile.job_role_id == job_role_id))
     if candidates_with_role > 0:
         raise HTTPException(
             status_code=400, 
@@ -443,27 +591,29 @@ async def delete_admin_job_role(
         )
     
     # Check if any assessments use this job role
-    assessments_with_role = db.query(Assessment).filter(Assessment.job_role_id == job_role_id).count()
+    assessments_with_role = await db.scalar(select(func.count()).select_from(Assessment).where(Assessment.job_role_id == job_role_id))
     if assessments_with_role > 0:
         raise HTTPException(
             status_code=400, 
             detail=f"Cannot delete job role. {assessments_with_role} assessments use this role."
         )
     
-    db.delete(job_role)
-    db.commit()
+    await db.delete(job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
     
     return {"message": "Job role deleted successfully"}
 
 @router.post("/job-roles/{job_role_id}/analyze")
 async def analyze_admin_job_role(
     job_role_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Analyze a job role and update traits (admin only)"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
@@ -478,8 +628,10 @@ async def analyze_admin_job_role(
     
     # Update the job role with analyzed traits
     job_role.traits_json = traits
-    db.commit()
-    db.refresh(job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
+    await db.refresh(job_role)
     
     return {
         "message": "Job role analysis completed",
@@ -489,29 +641,38 @@ async def analyze_admin_job_role(
 # Job Roles endpoints for admin
 @router.get("/job-roles")
 async def get_admin_job_roles(
-    skip: int = 0,
+    request: Request,
+    response: Response,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    count: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
-    """Get all job roles for admin"""
-    job_roles = db.query(JobRole).offset(skip).limit(limit).all()
+    """Get job roles for admin, keyset-paginated by an opaque cursor (next cursor and total in headers)"""
+    tag = http_cache.etag(http_cache.JOB_ROLES, await http_cache.version(db, http_cache.JOB_ROLES), request.url.query)
+    not_modified = http_cache.conditional(request, response, tag)
+    if not_modified:
+        return not_modified
+
+    page = await pagination.paginate(db, select(JobRole), JobRole, sort, ("created_at",), limit, cursor, count)
+    pagination.set_page_headers(response, page)
 
-    return [
+    return responses.prevalidated([
         {
             "id": jr.id,
             "title": jr.title,
             "description": jr.description,
             "traits_json": jr.traits_json,
-            "config_json": jr.config_json,
             "created_at": jr.created_at.isoformat()
-        } for jr in job_roles
-    ]
+        } for (jr,) in page.rows
+    ], response)
 
 @router.post("/job-roles")
 async def create_admin_job_role(
     job_role_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Create a new job role"""
@@ -526,8 +687,10 @@ async def create_admin_job_role(
     )
     
     db.add(new_job_role)
-    db.commit()
-    db.refresh(new_job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
+    await db.refresh(new_job_role)
     
     return {
         "id": new_job_role.id,
@@ -541,12 +704,12 @@ async def create_admin_job_role(
 @router.get("/job-roles/{job_role_id}")
 async def get_admin_job_role(
     job_role_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Get a specific job role for admin"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
     
@@ -563,12 +726,12 @@ async def get_admin_job_role(
 async def update_admin_job_role(
     job_role_id: str,
     job_role_data: dict,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Update a job role"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
     
@@ -582,8 +745,10 @@ async def update_admin_job_role(
     if "config_json" in job_role_data:
         job_role.config_json = job_role_data["config_json"]
     
-    db.commit()
-    db.refresh(job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
+    await db.refresh(job_role)
     
     return {
         "id": job_role.id,
@@ -597,29 +762,31 @@ async def update_admin_job_role(
 @router.delete("/job-roles/{job_role_id}")
 async def delete_admin_job_role(
     job_role_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Delete a job role"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
     
-    db.delete(job_role)
-    db.commit()
+    await db.delete(job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
     
     return {"message": "Job role deleted successfully"}
 
 @router.post("/job-roles/{job_role_id}/analyze")
 async def analyze_admin_job_role(
     job_role_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Analyze a job role and generate traits"""
     
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
     
@@ -633,8 +800,10 @@ async def analyze_admin_job_role(
     
     # Update the job role with analyzed traits
     job_role.traits_json = traits
-    db.commit()
-    db.refresh(job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
+    await db.refresh(job_role)
     
     return {
         "message": "Job role analysis completed",
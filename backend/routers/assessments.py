@@ -1,12 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import case, select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.orm.attributes import set_committed_value
 from pydantic import BaseModel
 from typing import List, Optional
 import uuid
 from datetime import datetime, timedelta
 from database import get_db
-from models import Assessment, AssessmentItem, User, JobRole, Game, Tenant
-from routers.auth import get_current_admin_user, get_current_user, log_audit_action
+from models import Assessment, AssessmentItem, ItemTelemetry, User, JobRole, Tenant
+from routers.auth import get_current_admin_user, get_current_user
+import analytics
+import audit_log
+import events
+import game_catalog
+import leaderboard
+import norms
+import pagination
+import responses
+import telemetry
 
 router = APIRouter()
 
@@ -20,21 +32,6 @@ class AssessmentUpdate(BaseModel):
     status: Optional[str] = None
     total_score: Optional[float] = None
 
-class AssessmentResponse(BaseModel):
-    id: str
-    tenant_id: str
-    candidate_id: str
-    job_role_id: str
-    status: str
-    started_at: Optional[str]
-    completed_at: Optional[str]
-    total_score: Optional[float]
-    integrity_flags: Optional[dict]
-    created_at: str
-    candidate_name: Optional[str]
-    job_role_title: Optional[str]
-    progress_percentage: float
-
 class AssessmentItemResponse(BaseModel):
     id: str
     assessment_id: str
@@ -50,6 +47,22 @@ class AssessmentItemResponse(BaseModel):
     game_title: Optional[str]
     game_code: Optional[str]
 
+class AssessmentResponse(BaseModel):
+    id: str
+    tenant_id: str
+    candidate_id: str
+    job_role_id: str
+    status: str
+    started_at: Optional[str]
+    completed_at: Optional[str]
+    total_score: Optional[float]
+    integrity_flags: Optional[dict]
+    created_at: str
+    candidate_name: Optional[str]
+    job_role_title: Optional[str]
+    progress_percentage: float
+    items: Optional[List[AssessmentItemResponse]] = None
+
 class StartAssessmentRequest(BaseModel):
     assessment_id: str
 
@@ -58,24 +71,31 @@ class SubmitItemRequest(BaseModel):
     metrics_json: dict
     response_time_ms: Optional[int] = None
 
+class ItemTelemetryRequest(BaseModel):
+    timestamp_ms: List[int]
+    stimulus: List[Optional[str]]
+    response: List[Optional[str]]  # None when the trial got no response
+    rt_ms: List[Optional[float]]
+    correct: List[bool]
+
 @router.post("/", response_model=AssessmentResponse)
 async def create_assessment(
     assessment_data: AssessmentCreate,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Validate candidate exists
-    candidate = db.query(User).filter(User.id == assessment_data.candidate_id, User.role == "CANDIDATE").first()
+    candidate = await db.scalar(select(User).where(User.id == assessment_data.candidate_id, User.role == "CANDIDATE"))
     if not candidate:
         raise HTTPException(status_code=404, detail="Candidate not found")
 
     # Validate job role exists
-    job_role = db.query(JobRole).filter(JobRole.id == assessment_data.job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == assessment_data.job_role_id))
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
 
     # Get tenant
-    tenant = db.query(Tenant).first()
+    tenant = await db.scalar(select(Tenant))
     if not tenant:
         tenant = Tenant(
             id=str(uuid.uuid4()),
@@ -83,8 +103,8 @@ async def create_assessment(
             subdomain="default"
         )
         db.add(tenant)
-        db.commit()
-        db.refresh(tenant)
+        await db.commit()
+        await db.refresh(tenant)
 
     # Create assessment
     db_assessment = Assessment(
@@ -97,12 +117,12 @@ async def create_assessment(
     )
 
     db.add(db_assessment)
-    db.commit()
-    db.refresh(db_assessment)
+    await db.run_sync(analytics.record_assessment_change, None, analytics.assessment_state(db_assessment))
+    await db.commit()
+    await db.refresh(db_assessment)
 
     # Log creation
-    log_audit_action(
-        db,
+    await audit_log.record(
         current_user.id,
         "CREATE_ASSESSMENT",
         "ASSESSMENT",
@@ -117,48 +137,54 @@ async def create_assessment(
 
 @router.get("/", response_model=List[AssessmentResponse])
 async def get_assessments(
-    skip: int = 0,
+    response: Response,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "-created_at",
+    count: Optional[str] = None,
     candidate_id: Optional[str] = None,
     job_role_id: Optional[str] = None,
     status: Optional[str] = None,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Build query
-    query = db.query(Assessment)
+    query = select(Assessment)
 
     # Apply filters
     if candidate_id:
-        query = query.filter(Assessment.candidate_id == candidate_id)
+        query = query.where(Assessment.candidate_id == candidate_id)
 
     if job_role_id:
-        query = query.filter(Assessment.job_role_id == job_role_id)
+        query = query.where(Assessment.job_role_id == job_role_id)
 
     if status:
         if status not in ["NOT_STARTED", "IN_PROGRESS", "COMPLETED", "EXPIRED", "CANCELLED"]:
             raise HTTPException(status_code=400, detail="Invalid status filter")
-        query = query.filter(Assessment.status == status)
+        query = query.where(Assessment.status == status)
 
     # For candidates, only show their own assessments
     if current_user.role == "CANDIDATE":
-        query = query.filter(Assessment.candidate_id == current_user.id)
+        query = query.where(Assessment.candidate_id == current_user.id)
 
-    assessments = query.offset(skip).limit(limit).all()
+    # Keyset-paginated; the next cursor and optional total are returned in headers
+    page = await pagination.paginate(db, query, Assessment, sort, pagination.SORT_KEYS, limit, cursor, count)
+    pagination.set_page_headers(response, page)
 
-    result = []
-    for assessment in assessments:
-        result.append(await _format_assessment_response(assessment, db))
-
-    return result
+    return await _format_assessment_responses([assessment for (assessment,) in page.rows], db)
 
 @router.get("/{assessment_id}", response_model=AssessmentResponse)
 async def get_assessment(
     assessment_id: str,
+    include_items: bool = False,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    """Get an assessment; include_items embeds its items so a page needs one request"""
+    if include_items:
+        assessment = await _get_assessment_with_items(assessment_id, db)
+    else:
+        assessment = await db.scalar(select(Assessment).where(Assessment.id == assessment_id))
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
@@ -166,16 +192,20 @@ async def get_assessment(
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    return await _format_assessment_response(assessment, db)
+    response = await _format_assessment_response(assessment, db)
+    if include_items:
+        games = (await game_catalog.get(db)).by_id
+        response["items"] = [_format_item(item, games) for item in assessment.assessment_items]
+    return response
 
 @router.put("/{assessment_id}", response_model=AssessmentResponse)
 async def update_assessment(
     assessment_id: str,
     assessment_data: AssessmentUpdate,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == assessment_id))
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
@@ -184,6 +214,8 @@ async def update_assessment(
         if assessment_data.status not in ["NOT_STARTED", "IN_PROGRESS", "COMPLETED", "EXPIRED", "CANCELLED"]:
             raise HTTPException(status_code=400, detail="Invalid status")
 
+    before = analytics.assessment_state(assessment)
+
     # Update fields
     if assessment_data.status:
         assessment.status = assessment_data.status
@@ -193,12 +225,14 @@ async def update_assessment(
     if assessment_data.total_score is not None:
         assessment.total_score = assessment_data.total_score
 
-    db.commit()
-    db.refresh(assessment)
+    await db.run_sync(analytics.record_assessment_change, before, analytics.assessment_state(assessment))
+    await db.commit()
+    if "COMPLETED" in (before.status, assessment.status):
+        leaderboard.invalidate(assessment.job_role_id)
+    await db.refresh(assessment)
 
     # Log update
-    log_audit_action(
-        db,
+    await audit_log.record(
         current_user.id,
         "UPDATE_ASSESSMENT",
         "ASSESSMENT",
@@ -215,9 +249,9 @@ async def update_assessment(
 async def delete_assessment(
     assessment_id: str,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == assessment_id))
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
@@ -226,8 +260,7 @@ async def delete_assessment(
         raise HTTPException(status_code=400, detail="Cannot delete assessment that has been started")
 
     # Log deletion
-    log_audit_action(
-        db,
+    await audit_log.record(
         current_user.id,
         "DELETE_ASSESSMENT",
         "ASSESSMENT",
@@ -235,8 +268,9 @@ async def delete_assessment(
         {"candidate_id": assessment.candidate_id}
     )
 
-    db.delete(assessment)
-    db.commit()
+    await db.run_sync(analytics.record_assessment_change, analytics.assessment_state(assessment), None)
+    await db.delete(assessment)
+    await db.commit()
 
     return {"message": "Assessment deleted successfully"}
 
@@ -244,9 +278,9 @@ async def delete_assessment(
 async def start_assessment(
     assessment_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == assessment_id))
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
@@ -259,16 +293,16 @@ async def start_assessment(
         raise HTTPException(status_code=400, detail="Assessment has already been started")
 
     # Update assessment status
+    before = analytics.assessment_state(assessment)
     assessment.status = "IN_PROGRESS"
     assessment.started_at = datetime.utcnow()
+    await db.run_sync(analytics.record_assessment_change, before, analytics.assessment_state(assessment))
 
     # Create assessment items based on job role traits
     await _create_assessment_items(assessment, db)
 
-    db.commit()
-
-    # Log start
-    log_audit_action(
+    # Log start in the same transaction as the status change and items
+    audit_log.add(
         db,
         current_user.id,
         "START_ASSESSMENT",
@@ -276,6 +310,9 @@ async def start_assessment(
         assessment_id,
         {"candidate_id": assessment.candidate_id}
     )
+    events.publish_on_commit(db, "assessment.started", assessment, items_total=assessment.items_total)
+
+    await db.commit()
 
     return {"message": "Assessment started successfully"}
 
@@ -283,9 +320,9 @@ async def start_assessment(
 async def get_assessment_items(
     assessment_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    assessment = db.query(Assessment).filter(Assessment.id == assessment_id).first()
+    assessment = await _get_assessment_with_items(assessment_id, db)
     if not assessment:
         raise HTTPException(status_code=404, detail="Assessment not found")
 
@@ -293,41 +330,23 @@ async def get_assessment_items(
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
-    items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment_id).order_by(AssessmentItem.order_index).all()
+    games = (await game_catalog.get(db)).by_id
 
-    result = []
-    for item in items:
-        game = db.query(Game).filter(Game.id == item.game_id).first()
-        result.append({
-            "id": item.id,
-            "assessment_id": item.assessment_id,
-            "game_id": item.game_id,
-            "order_index": item.order_index,
-            "timer_seconds": item.timer_seconds,
-            "server_started_at": item.server_started_at.isoformat() if item.server_started_at else None,
-            "server_deadline_at": item.server_deadline_at.isoformat() if item.server_deadline_at else None,
-            "status": item.status,
-            "score": item.score,
-            "metrics_json": item.metrics_json,
-            "config_snapshot": item.config_snapshot,
-            "game_title": game.title if game else None,
-            "game_code": game.code if game else None
-        })
-
-    return result
+    # _format_item builds exactly AssessmentItemResponse
+    return responses.prevalidated([_format_item(item, games) for item in assessment.assessment_items])
 
 @router.post("/items/{item_id}/start")
 async def start_assessment_item(
     item_id: str,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    item = db.query(AssessmentItem).filter(AssessmentItem.id == item_id).first()
+    item = await db.scalar(select(AssessmentItem).where(AssessmentItem.id == item_id))
     if not item:
         raise HTTPException(status_code=404, detail="Assessment item not found")
 
     # Check permissions via assessment
-    assessment = db.query(Assessment).filter(Assessment.id == item.assessment_id).first()
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == item.assessment_id))
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
@@ -342,7 +361,8 @@ async def start_assessment_item(
     if item.timer_seconds:
         item.server_deadline_at = item.server_started_at + timedelta(seconds=item.timer_seconds)
 
-    db.commit()
+    events.publish_on_commit(db, "item.started", assessment, item_id=item.id, game_id=item.game_id)
+    await db.commit()
 
     return {
         "message": "Assessment item started successfully",
@@ -354,14 +374,14 @@ async def submit_assessment_item(
     item_id: str,
     submission: SubmitItemRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    item = db.query(AssessmentItem).filter(AssessmentItem.id == item_id).first()
+    item = await db.scalar(select(AssessmentItem).where(AssessmentItem.id == item_id))
     if not item:
         raise HTTPException(status_code=404, detail="Assessment item not found")
 
     # Check permissions via assessment
-    assessment = db.query(Assessment).filter(Assessment.id == item.assessment_id).first()
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == item.assessment_id))
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
@@ -369,210 +389,359 @@ async def submit_assessment_item(
     if item.status not in ["ACTIVE", "PENDING"]:
         raise HTTPException(status_code=400, detail="Item cannot be submitted")
 
-    # Update item
-    item.status = "SUBMITTED"
-    item.score = submission.score
-    item.metrics_json = submission.metrics_json
-
-    db.commit()
+    # Update item; the status guard makes a concurrent duplicate submit a no-op
+    result = await db.execute(
+        update(AssessmentItem)
+        .where(AssessmentItem.id == item_id, AssessmentItem.status.in_(["ACTIVE", "PENDING"]))
+        .values(status="SUBMITTED", score=submission.score, metrics_json=submission.metrics_json)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        raise HTTPException(status_code=400, detail="Item cannot be submitted")
 
-    # Check if assessment is complete
-    await _check_assessment_completion(assessment, db)
+    # Count the submission and its score norm, and check if assessment is complete, in the same transaction
+    await db.run_sync(norms.record_score, item.game_id, assessment.job_role_id, submission.score)
+    await _record_item_submission(assessment, item, submission.score, db)
+    await db.commit()
 
     return {"message": "Assessment item submitted successfully"}
 
+async def _get_item_for_user(item_id: str, current_user: User, db: AsyncSession) -> AssessmentItem:
+    item = await db.scalar(select(AssessmentItem).where(AssessmentItem.id == item_id))
+    if not item:
+        raise HTTPException(status_code=404, detail="Assessment item not found")
+
+    # Check permissions via assessment
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == item.assessment_id))
+    if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    return item
+
+@router.post("/items/{item_id}/telemetry")
+async def upload_item_telemetry(
+    item_id: str,
+    trials: ItemTelemetryRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Store per-trial telemetry for an item in packed form and return server-side aggregates"""
+    item = await _get_item_for_user(item_id, current_user, db)
+
+    try:
+        data = telemetry.pack(trials.timestamp_ms, trials.stimulus, trials.response, trials.rt_ms, trials.correct)
+    except (ValueError, OverflowError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    aggregates = telemetry.aggregate(telemetry.unpack(data))
+
+    record = await db.scalar(select(ItemTelemetry).where(ItemTelemetry.assessment_item_id == item.id))
+    if not record:
+        record = ItemTelemetry(id=str(uuid.uuid4()), assessment_item_id=item.id)
+        db.add(record)
+    record.format_version = telemetry.FORMAT_VERSION
+    record.trial_count = len(trials.timestamp_ms)
+    record.data = data
+    record.aggregates = aggregates
+
+    await db.commit()
+
+    return {
+        "trial_count": record.trial_count,
+        "stored_bytes": len(data),
+        "aggregates": aggregates
+    }
+
+@router.get("/items/{item_id}/telemetry")
+async def get_item_telemetry(
+    item_id: str,
+    include_trials: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get telemetry aggregates for an item; include_trials also decodes the per-trial arrays"""
+    item = await _get_item_for_user(item_id, current_user, db)
+
+    record = await db.scalar(select(ItemTelemetry).where(ItemTelemetry.assessment_item_id == item.id))
+    if not record:
+        raise HTTPException(status_code=404, detail="No telemetry for this item")
+
+    response = {
+        "trial_count": record.trial_count,
+        "stored_bytes": len(record.data),
+        "aggregates": record.aggregates
+    }
+    if include_trials:
+        response["trials"] = telemetry.to_lists(telemetry.unpack(record.data))
+    return response
+
 @router.get("/current")
 async def get_current_assessment(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get the current assessment for the logged-in candidate"""
     if current_user.role != "CANDIDATE":
         raise HTTPException(status_code=403, detail="Only candidates can access current assessment")
 
     # Find the most recent assessment for this candidate
-    assessment = db.query(Assessment).filter(
+    assessment = await db.scalar(select(Assessment).where(
         Assessment.candidate_id == current_user.id,
         Assessment.status.in_(["NOT_STARTED", "IN_PROGRESS"])
-    ).order_by(Assessment.created_at.desc()).first()
+    ).order_by(Assessment.created_at.desc()))
 
     if not assessment:
         return {"assessment": None, "message": "No active assessment found"}
 
     return {"assessment": await _format_assessment_response(assessment, db)}
 
-async def _create_assessment_items(assessment: Assessment, db: Session):
+# Games assigned for each required trait: (trait, game code, timer seconds, config snapshot)
+TRAIT_GAMES = [
+    ("memory", "NBACK", 300, {"n": 2, "trials": 20, "difficulty": "medium"}),  # Memory trait -> N-Back game
+    ("attention", "STROOP", 240, {"trials": 30, "difficulty": "medium"}),  # Attention trait -> Continuous Performance Task
+    ("processing_speed", "REACTION_TIME", 180, {"trials": 25, "difficulty": "medium"})  # Processing speed trait -> Reaction Time game
+]
+
+# Default games if no traits specified
+DEFAULT_GAMES = [
+    ("NBACK", 300, {}),
+    ("STROOP", 300, {}),
+    ("REACTION_TIME", 300, {})
+]
+
+async def _create_assessment_items(assessment: Assessment, db: AsyncSession):
     """Create assessment items based on job role traits"""
     # Get job role traits
-    job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
+    job_role = await db.get(JobRole, assessment.job_role_id)
     if not job_role or not job_role.traits_json:
-        # Default games if no traits specified
-        default_games = ["NBACK", "STROOP", "REACTION_TIME"]
-        for i, game_code in enumerate(default_games):
-            game = db.query(Game).filter(Game.code == game_code).first()
-            if game:
-                item = AssessmentItem(
-                    id=str(uuid.uuid4()),
-                    assessment_id=assessment.id,
-                    game_id=game.id,
-                    order_index=i,
-                    timer_seconds=300,  # 5 minutes
-                    status="PENDING",
-                    config_snapshot={}
-                )
-                db.add(item)
+        plan = DEFAULT_GAMES
+    else:
+        traits = job_role.traits_json
+        plan = [
+            (code, timer_seconds, config)
+            for trait, code, timer_seconds, config in TRAIT_GAMES
+            if traits.get(trait, {}).get("required", False)
+        ]
+    if not plan:
         return
 
-    # Create items based on traits
-    order_index = 0
-    traits = job_role.traits_json
-
-    # Memory trait -> N-Back game
-    if traits.get("memory", {}).get("required", False):
-        game = db.query(Game).filter(Game.code == "NBACK").first()
-        if game:
-            item = AssessmentItem(
-                id=str(uuid.uuid4()),
-                assessment_id=assessment.id,
-                game_id=game.id,
-                order_index=order_index,
-                timer_seconds=300,
-                status="PENDING",
-                config_snapshot={"n": 2, "trials": 20, "difficulty": "medium"}
-            )
-            db.add(item)
-            order_index += 1
-
-    # Attention trait -> Continuous Performance Task
-    if traits.get("attention", {}).get("required", False):
-        game = db.query(Game).filter(Game.code == "STROOP").first()
-        if game:
-            item = AssessmentItem(
-                id=str(uuid.uuid4()),
-                assessment_id=assessment.id,
-                game_id=game.id,
-                order_index=order_index,
-                timer_seconds=240,
-                status="PENDING",
-                config_snapshot={"trials": 30, "difficulty": "medium"}
-            )
-            db.add(item)
-            order_index += 1
-
-    # Processing speed trait -> Reaction Time game
-    if traits.get("processing_speed", {}).get("required", False):
-        game = db.query(Game).filter(Game.code == "REACTION_TIME").first()
-        if game:
-            item = AssessmentItem(
-                id=str(uuid.uuid4()),
-                assessment_id=assessment.id,
-                game_id=game.id,
-                order_index=order_index,
-                timer_seconds=180,
-                status="PENDING",
-                config_snapshot={"trials": 25, "difficulty": "medium"}
-            )
-            db.add(item)
-            order_index += 1
-
-async def _check_assessment_completion(assessment: Assessment, db: Session):
-    """Check if assessment is complete and calculate final score"""
-    items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment.id).all()
+    # Codes without a game in the catalog are skipped
+    games = (await game_catalog.get(db)).by_code
+
+    items = []
+    for code, timer_seconds, config in plan:
+        if code in games:
+            items.append({
+                "id": str(uuid.uuid4()),
+                "assessment_id": assessment.id,
+                "game_id": games[code].id,
+                "order_index": len(items),
+                "timer_seconds": timer_seconds,
+                "status": "PENDING",
+                "config_snapshot": config
+            })
+    if items:
+        await db.execute(insert(AssessmentItem), items)
+    assessment.items_total = len(items)
+
+async def _record_item_submission(assessment: Assessment, item: AssessmentItem, score: Optional[float], db: AsyncSession):
+    """Bump the assessment's item counters and complete it once every item is submitted"""
+    # Increment in SQL so concurrent submits for the same assessment serialize on the row
+    counters = (await db.execute(
+        update(Assessment)
+        .where(Assessment.id == assessment.id)
+        .values(
+            items_submitted=Assessment.items_submitted + 1,
+            items_scored=Assessment.items_scored + (0 if score is None else 1),
+            score_sum=Assessment.score_sum + (score or 0)
+        )
+        .returning(Assessment.items_total, Assessment.items_submitted, Assessment.items_scored, Assessment.score_sum)
+        .execution_options(synchronize_session=False)
+    )).one()
+    for key, value in counters._mapping.items():
+        set_committed_value(assessment, key, value)
+    events.publish_on_commit(
+        db, "item.submitted", assessment,
+        item_id=item.id, game_id=item.game_id, score=score,
+        items_submitted=assessment.items_submitted, items_total=assessment.items_total
+    )
+    await _check_assessment_completion(assessment, db)
 
-    if not items:
+async def record_item_rescore(assessment: Assessment, old_score: Optional[float], new_score: Optional[float], db: AsyncSession):
+    """
+    Swap a submitted item's score in the assessment's running counters, and in
+    its total_score once completed (same rule as _check_assessment_completion).
+    The caller invalidates the job role's leaderboard after commit if the
+    assessment is completed.
+    """
+    before = analytics.assessment_state(assessment)
+    items_scored = Assessment.items_scored + (new_score is not None) - (old_score is not None)
+    score_sum = Assessment.score_sum + (new_score or 0) - (old_score or 0)
+    counters = (await db.execute(
+        update(Assessment)
+        .where(Assessment.id == assessment.id)
+        .values(
+            items_scored=items_scored,
+            score_sum=score_sum,
+            total_score=case(
+                (Assessment.status != "COMPLETED", Assessment.total_score),
+                (items_scored > 0, score_sum / items_scored),
+                else_=0
+            )
+        )
+        .returning(Assessment.items_scored, Assessment.score_sum, Assessment.total_score, Assessment.status)
+        .execution_options(synchronize_session=False)
+    )).one()
+    for key, value in counters._mapping.items():
+        set_committed_value(assessment, key, value)
+    await db.run_sync(analytics.record_assessment_change, before, analytics.assessment_state(assessment))
+
+async def _check_assessment_completion(assessment: Assessment, db: AsyncSession):
+    """Complete the assessment and set its final score if all items are submitted"""
+    if not assessment.items_total or assessment.items_submitted < assessment.items_total:
+        return
+    if assessment.status == "COMPLETED":
         return
 
-    # Check if all items are submitted
-    submitted_count = sum(1 for item in items if item.status == "SUBMITTED")
-    total_count = len(items)
+    before = analytics.assessment_state(assessment)
 
-    if submitted_count == total_count:
-        # Calculate total score
-        total_score = 0
-        valid_scores = 0
+    # Calculate total score
+    if assessment.items_scored:
+        assessment.total_score = assessment.score_sum / assessment.items_scored
+    else:
+        assessment.total_score = 0
+
+    assessment.status = "COMPLETED"
+    assessment.completed_at = datetime.utcnow()
+    await db.run_sync(analytics.record_assessment_change, before, analytics.assessment_state(assessment))
+    leaderboard.record_completion(db, assessment)
+    events.publish_on_commit(db, "assessment.completed", assessment, total_score=assessment.total_score)
+
+async def _get_assessment_with_items(assessment_id: str, db: AsyncSession) -> Optional[Assessment]:
+    """Load an assessment and its items (ordered by order_index) in one joined query"""
+    result = await db.execute(
+        select(Assessment)
+        .outerjoin(Assessment.assessment_items)
+        .options(contains_eager(Assessment.assessment_items))
+        .where(Assessment.id == assessment_id)
+        .order_by(AssessmentItem.order_index)
+    )
+    return result.unique().scalar_one_or_none()
 
-        for item in items:
-            if item.score is not None:
-                total_score += item.score
-                valid_scores += 1
+def _format_item(item: AssessmentItem, games) -> dict:
+    """Format an assessment item, taking the game title/code from the catalog"""
+    game = games.get(item.game_id)
+    return {
+        "id": item.id,
+        "assessment_id": item.assessment_id,
+        "game_id": item.game_id,
+        "order_index": item.order_index,
+        "timer_seconds": item.timer_seconds,
+        "server_started_at": item.server_started_at.isoformat() if item.server_started_at else None,
+        "server_deadline_at": item.server_deadline_at.isoformat() if item.server_deadline_at else None,
+        "status": item.status,
+        "score": item.score,
+        "metrics_json": item.metrics_json,
+        "config_snapshot": item.config_snapshot,
+        "game_title": game.title if game else None,
+        "game_code": game.code if game else None
+    }
 
-        if valid_scores > 0:
-            assessment.total_score = total_score / valid_scores
-        else:
-            assessment.total_score = 0
+async def _format_assessment_response(assessment: Assessment, db: AsyncSession) -> dict:
+    """Format assessment response with additional data"""
+    return (await _format_assessment_responses([assessment], db))[0]
+
+async def _format_assessment_responses(assessments: List[Assessment], db: AsyncSession) -> List[dict]:
+    """Format a page of assessments, resolving related rows in a constant number of queries"""
+    if not assessments:
+        return []
+
+    # Get candidate names
+    candidate_ids = {a.candidate_id for a in assessments if a.candidate_id}
+    candidates = {}
+    if candidate_ids:
+        candidates = {u.id: u for u in (await db.scalars(select(User).where(User.id.in_(candidate_ids)))).all()}
+
+    # Get job roles
+    job_role_ids = {a.job_role_id for a in assessments if a.job_role_id}
+    job_roles = {}
+    if job_role_ids:
+        job_roles = {jr.id: jr for jr in (await db.scalars(select(JobRole).where(JobRole.id.in_(job_role_ids)))).all()}
+
+    # For NOT_STARTED assessments, collect the games to display from their job roles
+    not_started_roles = [
+        job_roles[a.job_role_id] for a in assessments
+        if a.status == "NOT_STARTED" and a.job_role_id in job_roles
+    ]
+    games = {}
+    default_games = ()
+    if not_started_roles:
+        catalog = await game_catalog.get(db)
+        games = catalog.by_id
+        default_games = catalog.games[:3]  # Get first 3 games as default
 
-        assessment.status = "COMPLETED"
-        assessment.completed_at = datetime.utcnow()
+    result = []
+    for assessment in assessments:
+        candidate = candidates.get(assessment.candidate_id)
+        candidate_name = None
+        if candidate:
+            candidate_name = candidate.full_name or candidate.username
 
-        db.commit()
+        job_role = job_roles.get(assessment.job_role_id)
+        job_role_title = job_role.title if job_role else None
 
-async def _format_assessment_response(assessment: Assessment, db: Session) -> dict:
-    """Format assessment response with additional data"""
-    # Get candidate name
-    candidate = db.query(User).filter(User.id == assessment.candidate_id).first()
-    candidate_name = None
-    if candidate:
-        candidate_name = candidate.full_name or candidate.username
-
-    # Get job role title
-    job_role = db.query(JobRole).filter(JobRole.id == assessment.job_role_id).first()
-    job_role_title = job_role.title if job_role else None
-
-    # Calculate progress
-    items = db.query(AssessmentItem).filter(AssessmentItem.assessment_id == assessment.id).all()
-    if items:
-        completed_items = sum(1 for item in items if item.status == "SUBMITTED")
-        progress_percentage = (completed_items / len(items)) * 100
-    else:
-        progress_percentage = 0
-
-    # For NOT_STARTED assessments, provide basic cognitive games info from job role
-    cognitive_games = []
-    if assessment.status == "NOT_STARTED" and job_role:
-        # Get required games from job role (if any are defined)
-        required_games = job_role.required_games or []
-        if required_games:
-            for game_id in required_games:
-                game = db.query(Game).filter(Game.id == game_id).first()
-                if game:
+        # Calculate progress
+        if assessment.items_total:
+            progress_percentage = (assessment.items_submitted / assessment.items_total) * 100
+        else:
+            progress_percentage = 0
+
+        # For NOT_STARTED assessments, provide basic cognitive games info from job role
+        cognitive_games = []
+        if assessment.status == "NOT_STARTED" and job_role:
+            # Get required games from job role (if any are defined)
+            required_games = job_role.required_games or []
+            if required_games:
+                for game_id in required_games:
+                    game = games.get(game_id)
+                    if game:
+                        cognitive_games.append({
+                            "id": game.id,
+                            "game_id": game.id,
+                            "type": game.code.lower(),
+                            "title": game.title,
+                            "description": game.description,
+                            "time_limit": 240,  # Default time limit
+                            "order_index": len(cognitive_games),
+                            "status": "pending"
+                        })
+            else:
+                # If no required games defined, provide some default games for display
+                for i, game in enumerate(default_games):
                     cognitive_games.append({
                         "id": game.id,
                         "game_id": game.id,
                         "type": game.code.lower(),
                         "title": game.title,
                         "description": game.description,
-                        "time_limit": 240,  # Default time limit
-                        "order_index": len(cognitive_games),
+                        "time_limit": 240,
+                        "order_index": i,
                         "status": "pending"
                     })
-        else:
-            # If no required games defined, provide some default games for display
-            default_games = db.query(Game).limit(3).all()  # Get first 3 games as default
-            for i, game in enumerate(default_games):
-                cognitive_games.append({
-                    "id": game.id,
-                    "game_id": game.id,
-                    "type": game.code.lower(),
-                    "title": game.title,
-                    "description": game.description,
-                    "time_limit": 240,
-                    "order_index": i,
-                    "status": "pending"
-                })
 
-    return {
-        "id": assessment.id,
-        "tenant_id": assessment.tenant_id,
-        "candidate_id": assessment.candidate_id,
-        "job_role_id": assessment.job_role_id,
-        "status": assessment.status,
-        "started_at": assessment.started_at.isoformat() if assessment.started_at else None,
-        "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None,
-        "total_score": assessment.total_score,
-        "integrity_flags": assessment.integrity_flags,
-        "created_at": assessment.created_at.isoformat(),
-        "candidate_name": candidate_name,
-        "job_role_title": job_role_title,
-        "progress_percentage": progress_percentage,
-        "cognitive_games": cognitive_games
-    }
\ No newline at end of file
+        result.append({
+            "id": assessment.id,
+            "tenant_id": assessment.tenant_id,
+            "candidate_id": assessment.candidate_id,
+            "job_role_id": assessment.job_role_id,
+            "status": assessment.status,
+            "started_at": assessment.started_at.isoformat() if assessment.started_at else None,
+            "completed_at": assessment.completed_at.isoformat() if assessment.completed_at else None,
+            "total_score": assessment.total_score,
+            "integrity_flags": assessment.integrity_flags,
+            "created_at": assessment.created_at.isoformat(),
+            "candidate_name": candidate_name,
+            "job_role_title": job_role_title,
+            "progress_percentage": progress_percentage,
+            "cognitive_games": cognitive_games
+        })
+
+    return result
@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel
 import uuid
-from database import get_db
-from models import User, Tenant, AuditLog, BlacklistedToken
+from database import AsyncSessionLocal, get_db
+from models import User, Tenant, BlacklistedToken
+import token_revocation
+import audit_log
+import principal_cache
+from password_hashing import verify_password, get_password_hash
 import os
 
 router = APIRouter()
@@ -42,15 +46,8 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -64,7 +61,7 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt, jti, expire
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -79,8 +76,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
             raise credentials_exception
             
         # Check if token is blacklisted
-        blacklisted = db.query(BlacklistedToken).filter(BlacklistedToken.token_jti == jti).first()
-        if blacklisted:
+        if await token_revocation.is_revoked(db, jti):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has been invalidated",
@@ -90,9 +86,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
+    user = await principal_cache.get(db, ("user", username))
     if user is None:
-        raise credentials_exception
+        user = await db.scalar(select(User).where(User.username == username))
+        if user is None:
+            raise credentials_exception
+        principal_cache.put(("user", username), user)
     if not user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return user
@@ -105,21 +104,21 @@ async def get_current_admin_user(current_user: User = Depends(get_current_user))
         )
     return current_user
 
-def log_audit_action(db: Session, actor_user_id: str, action: str, target_type: str, target_id: str, payload: dict = None):
-    audit_log = AuditLog(
-        actor_user_id=actor_user_id,
-        action=action,
-        target_type=target_type,
-        target_id=target_id,
-        payload_json=payload
-    )
-    db.add(audit_log)
-    db.commit()
+async def get_streaming_admin_user(token: str = Depends(oauth2_scheme)):
+    """
+    get_current_admin_user for streaming responses. The admin is resolved in a
+    short-lived session that is closed before the response starts, so a long
+    download or event stream does not keep a pooled connection checked out.
+    The returned user is detached.
+    """
+    async with AsyncSessionLocal() as db:
+        current_user = await get_current_user(token, db)
+    return await get_current_admin_user(current_user)
 
 @router.post("/login")
-async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == login_data.username).first()
-    if not user or not verify_password(login_data.password, user.password_hash):
+async def login(login_data: LoginRequest, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.username == login_data.username))
+    if not user or not await verify_password(login_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -131,10 +130,11 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 
     # Update last login
     user.last_login_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(user.id)
 
     # Log login action
-    log_audit_action(db, user.id, "LOGIN", "USER", user.id, {"ip": "system"})
+    await audit_log.record(user.id, "LOGIN", "USER", user.id, {"ip": "system"})
 
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token, jti, expires_at = create_access_token(
@@ -154,16 +154,16 @@ async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     }
 
 @router.post("/register")
-async def register(register_data: RegisterRequest, db: Session = Depends(get_db)):
+async def register(register_data: RegisterRequest, db: AsyncSession = Depends(get_db)):
     # Check if user exists
-    if db.query(User).filter(User.username == register_data.username).first():
+    if await db.scalar(select(User).where(User.username == register_data.username)):
         raise HTTPException(status_code=400, detail="Username already registered")
 
-    if db.query(User).filter(User.email == register_data.email).first():
+    if await db.scalar(select(User).where(User.email == register_data.email)):
         raise HTTPException(status_code=400, detail="Email already registered")
 
     # Get default tenant
-    tenant = db.query(Tenant).first()
+    tenant = await db.scalar(select(Tenant))
     if not tenant:
         # Create default tenant if it doesn't exist
         tenant = Tenant(
@@ -172,11 +172,11 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
             subdomain="default"
         )
         db.add(tenant)
-        db.commit()
-        db.refresh(tenant)
+        await db.commit()
+        await db.refresh(tenant)
 
     # Create user
-    hashed_password = get_password_hash(register_data.password)
+    hashed_password = await get_password_hash(register_data.password)
     db_user = User(
         id=str(uuid.uuid4()),
         tenant_id=tenant.id,
@@ -198,11 +198,11 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
         )
         db.add(candidate_profile)
 
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     # Log registration action
-    log_audit_action(db, db_user.id, "REGISTER", "USER", db_user.id, {"role": register_data.role})
+    await audit_log.record(db_user.id, "REGISTER", "USER", db_user.id, {"role": register_data.role})
 
     # Create access token for automatic login
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -227,7 +227,7 @@ async def register(register_data: RegisterRequest, db: Session = Depends(get_db)
     }
 
 @router.get("/profile")
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     from models import CandidateProfile
 
     profile_data = {
@@ -242,7 +242,7 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 
     # Add candidate profile data if user is a candidate
     if current_user.role == "CANDIDATE":
-        candidate_profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == current_user.id).first()
+        candidate_profile = await db.scalar(select(CandidateProfile).where(CandidateProfile.user_id == current_user.id))
         if candidate_profile:
             profile_data["full_name"] = candidate_profile.full_name
             profile_data["job_role_id"] = candidate_profile.job_role_id
@@ -253,7 +253,7 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 async def update_profile(
     profile_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Update user basic info
     if "email" in profile_data:
@@ -262,7 +262,7 @@ async def update_profile(
     # Update candidate profile if user is candidate
     if current_user.role == "CANDIDATE":
         from models import CandidateProfile
-        candidate_profile = db.query(CandidateProfile).filter(CandidateProfile.user_id == current_user.id).first()
+        candidate_profile = await db.scalar(select(CandidateProfile).where(CandidateProfile.user_id == current_user.id))
         if candidate_profile:
             if "full_name" in profile_data:
                 candidate_profile.full_name = profile_data["full_name"]
@@ -274,10 +274,11 @@ async def update_profile(
             )
             db.add(candidate_profile)
 
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(current_user.id)
 
     # Log profile update
-    log_audit_action(db, current_user.id, "UPDATE_PROFILE", "USER", current_user.id, profile_data)
+    await audit_log.record(current_user.id, "UPDATE_PROFILE", "USER", current_user.id, profile_data)
 
     return {"message": "Profile updated successfully"}
 
@@ -285,19 +286,20 @@ async def update_profile(
 async def change_password(
     password_data: dict,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     old_password = password_data.get("old_password")
     new_password = password_data.get("new_password")
 
-    if not verify_password(old_password, current_user.password_hash):
+    if not await verify_password(old_password, current_user.password_hash):
         raise HTTPException(status_code=400, detail="Incorrect old password")
 
-    current_user.password_hash = get_password_hash(new_password)
-    db.commit()
+    current_user.password_hash = await get_password_hash(new_password)
+    await db.commit()
+    principal_cache.invalidate(current_user.id)
 
     # Log password change
-    log_audit_action(db, current_user.id, "CHANGE_PASSWORD", "USER", current_user.id)
+    await audit_log.record(current_user.id, "CHANGE_PASSWORD", "USER", current_user.id)
 
     return {"message": "Password changed successfully"}
 
@@ -307,13 +309,13 @@ async def get_users(
     limit: int = 100,
     role: str = None,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    query = db.query(User)
+    query = select(User)
     if role:
-        query = query.filter(User.role == role)
+        query = query.where(User.role == role)
 
-    users = query.offset(skip).limit(limit).all()
+    users = (await db.scalars(query.offset(skip).limit(limit))).all()
     return {
         "users": [
             {
@@ -325,7 +327,7 @@ async def get_users(
                 "created_at": user.created_at
             } for user in users
         ],
-        "total": query.count()
+        "total": await db.scalar(select(func.count()).select_from(query.subquery()))
     }
 
 @router.put("/users/{user_id}/status")
@@ -333,18 +335,18 @@ async def update_user_status(
     user_id: str,
     status_data: dict,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     user.is_active = status_data.get("is_active", user.is_active)
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(user_id)
 
     # Log status change
-    log_audit_action(
-        db,
+    await audit_log.record(
         current_user.id,
         "UPDATE_USER_STATUS",
         "USER",
@@ -358,7 +360,7 @@ async def update_user_status(
 async def logout(
     token: str = Depends(oauth2_scheme),
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     try:
         # Decode token to get JTI
@@ -373,34 +375,27 @@ async def logout(
             # Add token to blacklist
             blacklisted_token = BlacklistedToken(
                 token_jti=jti,
-                user_id=current_user.id,
                 expires_at=expires_at
             )
             db.add(blacklisted_token)
-            db.commit()
+            await db.commit()
+            token_revocation.revoke(jti, expires_at)
             
         # Log logout action
-        log_audit_action(db, current_user.id, "LOGOUT", "USER", current_user.id)
+        await audit_log.record(current_user.id, "LOGOUT", "USER", current_user.id)
         
         return {"message": "Logged out successfully"}
     except Exception as e:
         # Log logout anyway even if blacklisting fails
-        log_audit_action(db, current_user.id, "LOGOUT", "USER", current_user.id)
+        await audit_log.record(current_user.id, "LOGOUT", "USER", current_user.id)
         return {"message": "Logged out successfully"}
 
 @router.post("/cleanup-expired-tokens")
 async def cleanup_expired_tokens(
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Clean up expired blacklisted tokens (admin only)"""
-    now = datetime.utcnow()
-    expired_tokens = db.query(BlacklistedToken).filter(BlacklistedToken.expires_at < now).all()
-    
-    count = len(expired_tokens)
-    for token in expired_tokens:
-        db.delete(token)
-    
-    db.commit()
+    count = await db.run_sync(token_revocation.purge_expired)
     
     return {"message": f"Cleaned up {count} expired tokens"}
\ No newline at end of file
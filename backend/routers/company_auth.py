@@ -1,13 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 import uuid
 from database import get_db
-from models import Company, AdminUser, AuditLog, BlacklistedToken, User
+from models import Company, AdminUser, User
+import token_revocation
+import audit_log
+import principal_cache
+from password_hashing import verify_password, get_password_hash
 import os
 
 router = APIRouter()
@@ -52,14 +56,6 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -72,22 +68,10 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt, jti, expire
 
-def log_audit_action(db: Session, actor_id: str, action: str, target_type: str, target_id: str, payload: dict = None):
-    audit_log = AuditLog(
-        id=str(uuid.uuid4()),
-        actor_user_id=actor_id,
-        action=action,
-        target_type=target_type,
-        target_id=target_id,
-        payload_json=payload or {}
-    )
-    db.add(audit_log)
-    db.commit()
-
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-async def get_current_admin_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_admin_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     """Get current admin user from JWT token (supports both AdminUser and User with ADMIN role)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -104,8 +88,7 @@ async def get_current_admin_user(token: str = Depends(oauth2_scheme), db: Sessio
             raise credentials_exception
             
         # Check if token is blacklisted
-        blacklisted = db.query(BlacklistedToken).filter(BlacklistedToken.token_jti == jti).first()
-        if blacklisted:
+        if await token_revocation.is_revoked(db, jti):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has been invalidated",
@@ -115,38 +98,46 @@ async def get_current_admin_user(token: str = Depends(oauth2_scheme), db: Sessio
     except JWTError:
         raise credentials_exception
 
-    # First try to find AdminUser
-    admin_user = db.query(AdminUser).filter(AdminUser.email == email).first()
-    if admin_user is not None:
-        if not admin_user.is_active:
+    principal = await principal_cache.get(db, ("admin", email))
+    if principal is None:
+        # First try to find AdminUser, then a regular User with ADMIN role
+        principal = await db.scalar(select(AdminUser).where(AdminUser.email == email))
+        if principal is None:
+            regular_user = await db.scalar(select(User).where(User.email == email))
+            if regular_user is not None and regular_user.role.upper() == "ADMIN":
+                principal = regular_user
+        if principal is not None:
+            principal_cache.put(("admin", email), principal)
+    
+    if isinstance(principal, AdminUser):
+        if not principal.is_active:
             raise HTTPException(status_code=400, detail="Inactive admin user")
-        return admin_user
+        return principal
     
-    # If not found as AdminUser, try regular User with ADMIN role
-    regular_user = db.query(User).filter(User.email == email).first()
-    if regular_user is not None and regular_user.role.upper() == "ADMIN":
-        if not regular_user.is_active:
+    if principal is not None:
+        if not principal.is_active:
             raise HTTPException(status_code=400, detail="Inactive user")
-        return regular_user
+        return principal
     
     # If neither found, raise exception
     raise credentials_exception
 
 @router.post("/company/signup")
-async def company_signup(signup_data: CompanySignupRequest, db: Session = Depends(get_db)):
+async def company_signup(signup_data: CompanySignupRequest, db: AsyncSession = Depends(get_db)):
     """Register a new company and create an admin user"""
     
     # Check if company email already exists
-    if db.query(Company).filter(Company.email == signup_data.email).first():
+    if await db.scalar(select(Company).where(Company.email == signup_data.email)):
         raise HTTPException(status_code=400, detail="Company email already registered")
     
     # Check if admin email already exists
-    if db.query(AdminUser).filter(AdminUser.email == signup_data.email).first():
+    if await db.scalar(select(AdminUser).where(AdminUser.email == signup_data.email)):
         raise HTTPException(status_code=400, detail="Admin email already registered")
     
+    hashed_password = await get_password_hash(signup_data.password)
+    
     try:
         # Create company
-        hashed_password = get_password_hash(signup_data.password)
         company = Company(
             id=str(uuid.uuid4()),
             name=signup_data.company_name,
@@ -161,7 +152,7 @@ async def company_signup(signup_data: CompanySignupRequest, db: Session = Depend
             }
         )
         db.add(company)
-        db.flush()  # Get the company ID
+        await db.flush()  # Get the company ID
         
         # Create admin user
         admin_user = AdminUser(
@@ -172,10 +163,10 @@ async def company_signup(signup_data: CompanySignupRequest, db: Session = Depend
             password_hash=hashed_password
         )
         db.add(admin_user)
-        db.commit()
+        await db.commit()
         
         # Log registration
-        log_audit_action(db, admin_user.id, "COMPANY_SIGNUP", "COMPANY", company.id, {
+        await audit_log.record(admin_user.id, "COMPANY_SIGNUP", "COMPANY", company.id, {
             "company_name": signup_data.company_name,
             "admin_email": signup_data.email
         })
@@ -215,15 +206,15 @@ async def company_signup(signup_data: CompanySignupRequest, db: Session = Depend
         }
         
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create company: {str(e)}")
 
 @router.post("/company/login")
-async def company_login(login_data: CompanyLoginRequest, db: Session = Depends(get_db)):
+async def company_login(login_data: CompanyLoginRequest, db: AsyncSession = Depends(get_db)):
     """Login for company (direct company account)"""
     
-    company = db.query(Company).filter(Company.email == login_data.email).first()
-    if not company or not verify_password(login_data.password, company.password_hash):
+    company = await db.scalar(select(Company).where(Company.email == login_data.email))
+    if not company or not await verify_password(login_data.password, company.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -232,10 +223,10 @@ async def company_login(login_data: CompanyLoginRequest, db: Session = Depends(g
     
     # Update last login
     company.last_login_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
     
     # Log login action
-    log_audit_action(db, company.id, "COMPANY_LOGIN", "COMPANY", company.id, {"email": company.email})
+    await audit_log.record(company.id, "COMPANY_LOGIN", "COMPANY", company.id, {"email": company.email})
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -259,11 +250,11 @@ async def company_login(login_data: CompanyLoginRequest, db: Session = Depends(g
     }
 
 @router.post("/admin/login")
-async def admin_login(login_data: CompanyLoginRequest, db: Session = Depends(get_db)):
+async def admin_login(login_data: CompanyLoginRequest, db: AsyncSession = Depends(get_db)):
     """Login for admin users"""
     
-    admin_user = db.query(AdminUser).filter(AdminUser.email == login_data.email).first()
-    if not admin_user or not verify_password(login_data.password, admin_user.password_hash):
+    admin_user = await db.scalar(select(AdminUser).where(AdminUser.email == login_data.email))
+    if not admin_user or not await verify_password(login_data.password, admin_user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -274,16 +265,17 @@ async def admin_login(login_data: CompanyLoginRequest, db: Session = Depends(get
         raise HTTPException(status_code=400, detail="Account is deactivated")
     
     # Get company info
-    company = db.query(Company).filter(Company.id == admin_user.company_id).first()
+    company = await db.scalar(select(Company).where(Company.id == admin_user.company_id))
     if not company:
         raise HTTPException(status_code=404, detail="Company not found")
     
     # Update last login
     admin_user.last_login_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate(admin_user.id)
     
     # Log login action
-    log_audit_action(db, admin_user.id, "ADMIN_LOGIN", "ADMIN_USER", admin_user.id, {"email": admin_user.email})
+    await audit_log.record(admin_user.id, "ADMIN_LOGIN", "ADMIN_USER", admin_user.id, {"email": admin_user.email})
     
     # Create access token
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -306,21 +298,22 @@ async def admin_login(login_data: CompanyLoginRequest, db: Session = Depends(get
     }
 
 @router.post("/unified/login")
-async def unified_login(login_data: CompanyLoginRequest, db: Session = Depends(get_db)):
+async def unified_login(login_data: CompanyLoginRequest, db: AsyncSession = Depends(get_db)):
     """Unified login endpoint that handles admin users, companies, and candidates"""
     
     # First try admin user login (email-based)
-    admin_user = db.query(AdminUser).filter(AdminUser.email == login_data.email).first()
-    if admin_user and verify_password(login_data.password, admin_user.password_hash) and admin_user.is_active:
+    admin_user = await db.scalar(select(AdminUser).where(AdminUser.email == login_data.email))
+    if admin_user and await verify_password(login_data.password, admin_user.password_hash) and admin_user.is_active:
         # Get company info
-        company = db.query(Company).filter(Company.id == admin_user.company_id).first()
+        company = await db.scalar(select(Company).where(Company.id == admin_user.company_id))
         
         # Update last login
         admin_user.last_login_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
+        principal_cache.invalidate(admin_user.id)
         
         # Log login action
-        log_audit_action(db, admin_user.id, "ADMIN_LOGIN", "ADMIN_USER", admin_user.id, {"email": admin_user.email})
+        await audit_log.record(admin_user.id, "ADMIN_LOGIN", "ADMIN_USER", admin_user.id, {"email": admin_user.email})
         
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -345,18 +338,19 @@ async def unified_login(login_data: CompanyLoginRequest, db: Session = Depends(g
     # Try candidate/user login (email OR username)
     candidate = None
     # First try by email
-    candidate = db.query(User).filter(User.email == login_data.email).first()
+    candidate = await db.scalar(select(User).where(User.email == login_data.email))
     # If not found by email, try by username (in case they enter username in email field)
     if not candidate:
-        candidate = db.query(User).filter(User.username == login_data.email).first()
+        candidate = await db.scalar(select(User).where(User.username == login_data.email))
     
-    if candidate and verify_password(login_data.password, candidate.password_hash) and candidate.is_active:
+    if candidate and await verify_password(login_data.password, candidate.password_hash) and candidate.is_active:
         # Update last login
         candidate.last_login_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
+        principal_cache.invalidate(candidate.id)
         
         # Log login action
-        log_audit_action(db, candidate.id, "CANDIDATE_LOGIN", "USER", candidate.id, {"email": candidate.email})
+        await audit_log.record(candidate.id, "CANDIDATE_LOGIN", "USER", candidate.id, {"email": candidate.email})
         
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -379,14 +373,14 @@ async def unified_login(login_data: CompanyLoginRequest, db: Session = Depends(g
         }
     
     # If candidate login fails, try company login
-    company = db.query(Company).filter(Company.email == login_data.email).first()
-    if company and verify_password(login_data.password, company.password_hash):
+    company = await db.scalar(select(Company).where(Company.email == login_data.email))
+    if company and await verify_password(login_data.password, company.password_hash):
         # Update last login
         company.last_login_at = datetime.utcnow()
-        db.commit()
+        await db.commit()
         
         # Log login action
-        log_audit_action(db, company.id, "COMPANY_LOGIN", "COMPANY", company.id, {"email": company.email})
+        await audit_log.record(company.id, "COMPANY_LOGIN", "COMPANY", company.id, {"email": company.email})
         
         # Create access token
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -1,12 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select, func, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uuid
 import json
 from database import get_db
 from models import Game, AssessmentItem, User
-from routers.auth import get_current_admin_user, get_current_user, log_audit_action
+from routers.auth import get_current_admin_user, get_current_user
+from routers.assessments import record_item_rescore
+import audit_log
+import game_catalog
+import http_cache
+import leaderboard
+import norms
+import pagination
+import responses
 
 router = APIRouter()
 
@@ -163,10 +172,10 @@ GAME_SCORING_FUNCTIONS = {
 async def create_game(
     game_data: GameCreate,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if code already exists
-    existing_game = db.query(Game).filter(Game.code == game_data.code).first()
+    existing_game = await db.scalar(select(Game).where(Game.code == game_data.code))
     if existing_game:
         raise HTTPException(status_code=400, detail="Game code already exists")
 
@@ -180,12 +189,13 @@ async def create_game(
     )
 
     db.add(db_game)
-    db.commit()
-    db.refresh(db_game)
+    await game_catalog.bump(db)
+    await db.commit()
+    await db.refresh(db_game)
+    game_catalog.invalidate()
 
     # Log creation
-    log_audit_action(
-        db,
+    await audit_log.record(
         current_user.id,
         "CREATE_GAME",
         "GAME",
@@ -203,67 +213,104 @@ async def create_game(
 
 @router.get("/", response_model=List[GameResponse])
 async def get_games(
-    skip: int = 0,
+    response: Response,
     limit: int = 100,
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    # Build query
-    query = db.query(Game)
+    catalog = await game_catalog.get(db)
+    games = catalog.games
+    limit = pagination.clamp_limit(limit)
+
+    # The catalog is in memory in (created_at, id) order; the cursor is the last game returned
+    if cursor:
+        after = catalog.by_id.get(pagination.decode_id_cursor(cursor))
+        if after is None:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        games = games[games.index(after) + 1:]
 
     if search:
-        search_term = f"%{search}%"
-        query = query.filter(
-            (Game.code.ilike(search_term)) |
-            (Game.title.ilike(search_term)) |
-            (Game.description.ilike(search_term))
-        )
+        search_term = search.lower()
+        games = [
+            game for game in games
+            if search_term in game.code.lower()
+            or search_term in game.title.lower()
+            or search_term in (game.description or "").lower()
+        ]
+
+    page = games[:limit + 1]
+    if len(page) > limit:
+        page = page[:limit]
+        response.headers["X-Next-Cursor"] = pagination.encode_id_cursor(page[-1].id)
+    # CatalogGame.as_dict() builds exactly GameResponse
+    return responses.prevalidated([game.as_dict() for game in page], response)
 
-    games = query.offset(skip).limit(limit).all()
+@router.get("/available")
+async def get_available_games(
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get all available games with their configurations"""
+    catalog = await game_catalog.get(db)
+    not_modified = http_cache.conditional(request, response, catalog.etag)
+    if not_modified:
+        return not_modified
 
-    return [
-        {
-            "id": game.id,
-            "code": game.code,
-            "title": game.title,
-            "description": game.description,
-            "base_config": game.base_config
-        } for game in games
-    ]
+    return {
+        "games": [game.as_dict() for game in catalog.games],
+        "total": len(catalog.games)
+    }
+
+@router.get("/by-code/{game_code}")
+async def get_game_by_code(
+    game_code: str,
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get game by code (useful for frontend)"""
+    catalog = await game_catalog.get(db)
+    game = catalog.by_code.get(game_code)
+    if not game:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    not_modified = http_cache.conditional(request, response, catalog.etag)
+    if not_modified:
+        return not_modified
+
+    return game.as_dict()
 
 @router.get("/{game_id}", response_model=GameResponse)
 async def get_game(
     game_id: str,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    game = db.query(Game).filter(Game.id == game_id).first()
+    game = (await game_catalog.get(db)).by_id.get(game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    return {
-        "id": game.id,
-        "code": game.code,
-        "title": game.title,
-        "description": game.description,
-        "base_config": game.base_config
-    }
+    return game.as_dict()
 
 @router.put("/{game_id}", response_model=GameResponse)
 async def update_game(
     game_id: str,
     game_data: GameUpdate,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    game = db.query(Game).filter(Game.id == game_id).first()
+    game = await db.scalar(select(Game).where(Game.id == game_id))
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
     # Check code uniqueness if changing
     if game_data.code and game_data.code != game.code:
-        existing = db.query(Game).filter(Game.code == game_data.code, Game.id != game_id).first()
+        existing = await db.scalar(select(Game).where(Game.code == game_data.code, Game.id != game_id))
         if existing:
             raise HTTPException(status_code=400, detail="Game code already exists")
 
@@ -277,12 +324,13 @@ async def update_game(
     if game_data.base_config:
         game.base_config = game_data.base_config
 
-    db.commit()
-    db.refresh(game)
+    await game_catalog.bump(db)
+    await db.commit()
+    await db.refresh(game)
+    game_catalog.invalidate()
 
     # Log update
-    log_audit_action(
-        db,
+    await audit_log.record(
         current_user.id,
         "UPDATE_GAME",
         "GAME",
@@ -302,14 +350,14 @@ async def update_game(
 async def delete_game(
     game_id: str,
     current_user: User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    game = db.query(Game).filter(Game.id == game_id).first()
+    game = await db.scalar(select(Game).where(Game.id == game_id))
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
     # Check if game is being used in assessments
-    assessment_count = db.query(AssessmentItem).filter(AssessmentItem.game_id == game_id).count()
+    assessment_count = await db.scalar(select(func.count()).select_from(AssessmentItem).where(AssessmentItem.game_id == game_id))
     if assessment_count > 0:
         raise HTTPException(
             status_code=400,
@@ -317,8 +365,7 @@ async def delete_game(
         )
 
     # Log deletion
-    log_audit_action(
-        db,
+    await audit_log.record(
         current_user.id,
         "DELETE_GAME",
         "GAME",
@@ -326,8 +373,10 @@ async def delete_game(
         {"code": game.code, "title": game.title}
     )
 
-    db.delete(game)
-    db.commit()
+    await db.delete(game)
+    await game_catalog.bump(db)
+    await db.commit()
+    game_catalog.invalidate()
 
     return {"message": "Game deleted successfully"}
 
@@ -335,22 +384,22 @@ async def delete_game(
 async def score_game_performance(
     score_request: GameScoreRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Score a game performance based on metrics"""
     # Get assessment item
-    item = db.query(AssessmentItem).filter(AssessmentItem.id == score_request.assessment_item_id).first()
+    item = await db.scalar(select(AssessmentItem).where(AssessmentItem.id == score_request.assessment_item_id))
     if not item:
         raise HTTPException(status_code=404, detail="Assessment item not found")
 
     # Get game
-    game = db.query(Game).filter(Game.id == item.game_id).first()
+    game = (await game_catalog.get(db)).by_id.get(item.game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
 
     # Check permissions via assessment
     from models import Assessment
-    assessment = db.query(Assessment).filter(Assessment.id == item.assessment_id).first()
+    assessment = await db.scalar(select(Assessment).where(Assessment.id == item.assessment_id))
     if current_user.role == "CANDIDATE" and assessment.candidate_id != current_user.id:
         raise HTTPException(status_code=403, detail="Access denied")
 
@@ -363,8 +412,7 @@ async def score_game_performance(
     score_response = scoring_function(score_request.raw_metrics)
 
     # Update assessment item
-    item.score = score_response.score
-    item.metrics_json = {
+    metrics_json = {
         **score_request.raw_metrics,
         "server_scoring": {
             "normalized_score": score_response.normalized_score,
@@ -373,47 +421,31 @@ async def score_game_performance(
             "feedback": score_response.feedback
         }
     }
+    if item.status == "SUBMITTED":
+        # The old score is already in the assessment's counters; swap it in the same transaction.
+        # The guard on the old score makes a concurrent re-score of the same item fail instead of double counting.
+        old_score = item.score
+        result = await db.execute(
+            update(AssessmentItem)
+            .where(
+                AssessmentItem.id == item.id,
+                AssessmentItem.score.is_(None) if old_score is None else AssessmentItem.score == old_score
+            )
+            .values(score=score_response.score, metrics_json=metrics_json)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            raise HTTPException(status_code=409, detail="Assessment item was re-scored concurrently")
+        await record_item_rescore(assessment, old_score, score_response.score, db)
+    else:
+        item.score = score_response.score
+        item.metrics_json = metrics_json
 
-    db.commit()
-
-    return score_response.dict()
-
-@router.get("/available")
-async def get_available_games(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get all available games with their configurations"""
-    games = db.query(Game).all()
-
-    return {
-        "games": [
-            {
-                "id": game.id,
-                "code": game.code,
-                "title": game.title,
-                "description": game.description,
-                "base_config": game.base_config
-            } for game in games
-        ],
-        "total": len(games)
-    }
+    await db.commit()
+    if assessment.status == "COMPLETED":
+        leaderboard.invalidate(assessment.job_role_id)
 
-@router.get("/by-code/{game_code}")
-async def get_game_by_code(
-    game_code: str,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get game by code (useful for frontend)"""
-    game = db.query(Game).filter(Game.code == game_code).first()
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
+    # Where the score falls among submitted scores for this game and job role
+    percentiles = await db.run_sync(norms.percentile_ranks, item.game_id, assessment.job_role_id, score_response.score)
 
-    return {
-        "id": game.id,
-        "code": game.code,
-        "title": game.title,
-        "description": game.description,
-        "base_config": game.base_config
-    }
\ No newline at end of file
+    return {**score_response.dict(), "percentiles": percentiles}
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models import JobRole, User
 from routers.auth import get_current_admin_user
 from typing import List, Optional
+from datetime import datetime
 from pydantic import BaseModel
 import uuid
+import http_cache
+import pagination
 
 router = APIRouter()
 
@@ -20,24 +24,36 @@ class JobRoleResponse(BaseModel):
     title: str
     description: Optional[str]
     required_games: List[str]
-    created_at: str
+    created_at: datetime
 
     class Config:
         from_attributes = True
 
 @router.get("/", response_model=List[JobRoleResponse])
 async def get_job_roles(
-    db: Session = Depends(get_db),
+    request: Request,
+    response: Response,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    sort: str = "created_at",
+    count: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
-    """Get all job roles"""
-    job_roles = db.query(JobRole).all()
-    return job_roles
+    """Get job roles, keyset-paginated (next cursor and optional total in headers)"""
+    tag = http_cache.etag(http_cache.JOB_ROLES, await http_cache.version(db, http_cache.JOB_ROLES), request.url.query)
+    not_modified = http_cache.conditional(request, response, tag)
+    if not_modified:
+        return not_modified
+
+    page = await pagination.paginate(db, select(JobRole), JobRole, sort, ("created_at",), limit, cursor, count)
+    pagination.set_page_headers(response, page)
+    return [job_role for (job_role,) in page.rows]
 
 @router.post("/", response_model=JobRoleResponse)
 async def create_job_role(
     job_role: JobRoleCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Create a new job role"""
@@ -53,33 +69,37 @@ async def create_job_role(
     )
 
     db.add(db_job_role)
-    db.commit()
-    db.refresh(db_job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
+    await db.refresh(db_job_role)
     return db_job_role
 
 @router.delete("/{job_role_id}")
 async def delete_job_role(
     job_role_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Delete a job role"""
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
 
-    db.delete(job_role)
-    db.commit()
+    await db.delete(job_role)
+    await http_cache.bump(db, http_cache.JOB_ROLES)
+    await db.commit()
+    http_cache.invalidate(http_cache.JOB_ROLES)
     return {"message": "Job role deleted successfully"}
 
 @router.get("/{job_role_id}/analyze")
 async def analyze_job_role(
     job_role_id: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
     """Analyze job role requirements and provide insights"""
-    job_role = db.query(JobRole).filter(JobRole.id == job_role_id).first()
+    job_role = await db.scalar(select(JobRole).where(JobRole.id == job_role_id))
     if not job_role:
         raise HTTPException(status_code=404, detail="Job role not found")
 
@@ -0,0 +1,156 @@
+"""
+Compact storage of per-trial game telemetry
+
+Clients post one array per field (timestamp, stimulus, response, reaction time,
+correct). Instead of storing a JSON object per trial, the arrays are packed into
+a single zlib-compressed blob:
+
+    header   struct "<4sBIq": magic b"TLM1", format version, trial count,
+             first timestamp (ms)
+    labels   u32 length + JSON [stimulus labels, response labels]
+    columns  timestamp deltas (u32 ms), reaction times (u16 ms, 0xFFFF = no
+             response), stimulus and response label indices (u16, 0xFFFF =
+             none), correct flags (bit-packed)
+
+A 500-trial session packs to roughly 2-3 KB. Aggregates (accuracy, reaction
+time distribution, anticipations, lapses) are derived on the server from the
+decoded columns.
+"""
+
+import json
+import math
+import struct
+import zlib
+from typing import Any, Dict, List, Optional
+import numpy as np
+
+FORMAT_VERSION = 1
+MAX_TRIALS = 5000
+
+_MAGIC = b"TLM1"
+_HEADER = struct.Struct("<4sBIq")
+_LENGTH = struct.Struct("<I")
+_MISSING = 0xFFFF
+_INT64 = np.iinfo(np.int64)
+
+# Reaction times below this are anticipations, above it lapses (ms)
+ANTICIPATION_RT_MS = 100
+LAPSE_RT_MS = 2000
+
+def _label_indices(values: List[Optional[str]]):
+    labels = sorted({v for v in values if v is not None})
+    if len(labels) >= _MISSING:
+        raise ValueError("Too many distinct labels")
+    lookup = {label: i for i, label in enumerate(labels)}
+    return labels, np.array([_MISSING if v is None else lookup[v] for v in values], dtype="<u2")
+
+def pack(timestamp_ms: List[int], stimulus: List[Optional[str]], response: List[Optional[str]],
+         rt_ms: List[Optional[float]], correct: List[bool]) -> bytes:
+    """Pack per-trial columns into a compressed blob; raises ValueError on malformed input"""
+    n = len(timestamp_ms)
+    if n == 0 or n > MAX_TRIALS:
+        raise ValueError(f"Between 1 and {MAX_TRIALS} trials are required")
+    if any(len(column) != n for column in (stimulus, response, rt_ms, correct)):
+        raise ValueError("All trial arrays must have the same length")
+
+    if any(not _INT64.min <= t <= _INT64.max for t in timestamp_ms):
+        raise ValueError("timestamp_ms values must fit in a signed 64-bit integer")
+    timestamps = np.array(timestamp_ms, dtype=np.int64)
+    deltas = np.diff(timestamps)
+    if np.any(deltas < 0) or np.any(deltas > 0xFFFFFFFF):
+        raise ValueError("timestamp_ms must be non-decreasing")
+
+    if any(rt is not None and not math.isfinite(rt) for rt in rt_ms):
+        raise ValueError("rt_ms values must be finite")
+    rts = np.array([_MISSING if rt is None else round(rt) for rt in rt_ms], dtype=np.int64)
+    if np.any(rts < 0) or np.any(rts > _MISSING):
+        raise ValueError(f"rt_ms must be between 0 and {_MISSING - 1}")
+
+    stimulus_labels, stimulus_index = _label_indices(stimulus)
+    response_labels, response_index = _label_indices(response)
+    labels = json.dumps([stimulus_labels, response_labels], separators=(",", ":")).encode()
+
+    body = b"".join([
+        _HEADER.pack(_MAGIC, FORMAT_VERSION, n, int(timestamps[0])),
+        _LENGTH.pack(len(labels)), labels,
+        deltas.astype("<u4").tobytes(),
+        rts.astype("<u2").tobytes(),
+        stimulus_index.tobytes(),
+        response_index.tobytes(),
+        np.packbits(np.array(correct, dtype=bool)).tobytes()
+    ])
+    return zlib.compress(body, 9)
+
+def unpack(blob: bytes) -> Dict[str, np.ndarray]:
+    """Decode a blob from pack() into columns; missing RTs are NaN, missing labels None"""
+    body = zlib.decompress(blob)
+    magic, version, n, first_timestamp = _HEADER.unpack_from(body, 0)
+    if magic != _MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Unsupported telemetry format")
+    offset = _HEADER.size
+    (labels_length,) = _LENGTH.unpack_from(body, offset)
+    offset += _LENGTH.size
+    stimulus_labels, response_labels = json.loads(body[offset:offset + labels_length])
+    offset += labels_length
+
+    def column(dtype, count):
+        nonlocal offset
+        values = np.frombuffer(body, dtype=dtype, count=count, offset=offset)
+        offset += values.nbytes
+        return values
+
+    deltas = column("<u4", n - 1)
+    rts = column("<u2", n)
+    stimulus_index = column("<u2", n)
+    response_index = column("<u2", n)
+    correct = np.unpackbits(column(np.uint8, (n + 7) // 8), count=n).astype(bool)
+
+    def labels_for(index, labels):
+        return np.array([None if i == _MISSING else labels[i] for i in index.tolist()], dtype=object)
+
+    return {
+        "timestamp_ms": first_timestamp + np.concatenate(([0], np.cumsum(deltas, dtype=np.int64))),
+        "stimulus": labels_for(stimulus_index, stimulus_labels),
+        "response": labels_for(response_index, response_labels),
+        "rt_ms": np.where(rts == _MISSING, np.nan, rts.astype(np.float64)),
+        "correct": correct
+    }
+
+def aggregate(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Server-side aggregates over decoded trial columns"""
+    n = len(columns["correct"])
+    responded = columns["response"] != None  # noqa: E711  (element-wise comparison on an object array)
+    correct = columns["correct"] & responded
+    rts = columns["rt_ms"][responded & ~np.isnan(columns["rt_ms"])]
+    duration = int(columns["timestamp_ms"][-1] - columns["timestamp_ms"][0])
+
+    result = {
+        "total_trials": n,
+        "responses": int(responded.sum()),
+        "correct_responses": int(correct.sum()),
+        "incorrect_responses": int((responded & ~correct).sum()),
+        "misses": int(n - responded.sum()),
+        "accuracy": float(correct.sum() / responded.sum()) if responded.any() else 0.0,
+        "duration_ms": duration,
+        "anticipations": int((rts < ANTICIPATION_RT_MS).sum()),
+        "lapses": int((rts > LAPSE_RT_MS).sum())
+    }
+    if len(rts):
+        result.update({
+            "average_response_time": float(rts.mean()),
+            "median_response_time": float(np.median(rts)),
+            "response_time_sd": float(rts.std()),
+            "response_time_p10": float(np.percentile(rts, 10)),
+            "response_time_p90": float(np.percentile(rts, 90))
+        })
+    return result
+
+def to_lists(columns: Dict[str, np.ndarray]) -> Dict[str, list]:
+    """Decoded columns as JSON-serializable lists (None for missing values)"""
+    return {
+        "timestamp_ms": columns["timestamp_ms"].tolist(),
+        "stimulus": columns["stimulus"].tolist(),
+        "response": columns["response"].tolist(),
+        "rt_ms": [None if np.isnan(rt) else rt for rt in columns["rt_ms"].tolist()],
+        "correct": columns["correct"].tolist()
+    }
@@ -0,0 +1,96 @@
+"""
+Shared fixtures. Every test session runs against a throwaway SQLite database
+created from the models; DATABASE_URL is set before any backend module is
+imported.
+
+    pip install -r requirements-dev.txt
+    python -m pytest tests
+"""
+
+import os
+import sys
+import tempfile
+import uuid
+from datetime import timedelta
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ["AUDIT_FALLBACK_PATH"] = os.path.join(_db_dir, "audit_fallback.jsonl")
+sys.path.insert(0, BACKEND_DIR)
+
+import pytest
+from sqlalchemy import event
+
+import game_catalog
+from database import Base, SessionLocal, async_engine, engine
+from models import Game, JobRole, Tenant, User
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture(scope="session")
+def admin(schema):
+    session = SessionLocal()
+    session.add(User(id="admin", username="admin", email="admin@example.com", role="ADMIN",
+                     full_name="Admin", password_hash="x"))
+    session.commit()
+    session.close()
+    return "admin"
+
+@pytest.fixture
+def admin_headers(admin):
+    from routers.auth import create_access_token
+    token = create_access_token({"sub": admin, "role": "ADMIN"}, timedelta(minutes=30))[0]
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def client(schema):
+    from fastapi.testclient import TestClient
+    from main import app
+    with TestClient(app) as client:
+        yield client
+
+@pytest.fixture
+def assessment_id(db, client, admin_headers):
+    """A started assessment with an NBACK and a STROOP item, in a fresh tenant and job role"""
+    for code in ("NBACK", "STROOP"):
+        if not db.query(Game).filter_by(code=code).first():
+            db.add(Game(code=code, title=code.title()))
+    suffix = uuid.uuid4().hex[:8]
+    tenant = Tenant(id=f"t-{suffix}", name="Tenant")
+    job_role = JobRole(id=f"jr-{suffix}", tenant_id=tenant.id, title="Engineer",
+                       traits_json={"memory": {"required": True}, "attention": {"required": True}})
+    candidate = User(id=f"c-{suffix}", username=f"candidate-{suffix}", email=f"c-{suffix}@example.com",
+                     role="CANDIDATE", full_name="Candidate", password_hash="x")
+    db.add_all([tenant, job_role, candidate])
+    db.commit()
+    game_catalog.invalidate()
+
+    response = client.post("/assessments/", headers=admin_headers,
+                           json={"candidate_id": candidate.id, "job_role_id": job_role.id})
+    assert response.status_code == 200
+    assessment_id = response.json()["id"]
+    assert client.post(f"/assessments/{assessment_id}/start", headers=admin_headers).status_code == 200
+    return assessment_id
+
+@pytest.fixture
+def statements():
+    """SQL statements executed by the API's async engine while the test runs"""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
@@ -0,0 +1,46 @@
+"""Admin list endpoints return plain arrays and page through the X-Next-Cursor header"""
+
+import uuid
+
+import pytest
+
+from models import Assessment, JobRole, Tenant, User
+
+@pytest.fixture
+def job_role_id(db):
+    suffix = uuid.uuid4().hex[:8]
+    tenant = Tenant(id=f"t-{suffix}", name="Tenant")
+    job_role = JobRole(id=f"jr-{suffix}", tenant_id=tenant.id, title="Engineer", traits_json={})
+    db.add_all([tenant, job_role])
+    for i in range(5):
+        candidate = User(id=f"c-{suffix}-{i}", username=f"candidate-{suffix}-{i}", email=f"c-{suffix}-{i}@example.com",
+                         role="CANDIDATE", full_name=f"Candidate {i}", password_hash="x")
+        db.add(candidate)
+        db.add(Assessment(tenant_id=tenant.id, candidate_id=candidate.id, job_role_id=job_role.id,
+                          status="NOT_STARTED", integrity_flags={}))
+    db.commit()
+    return job_role.id
+
+def test_assessments_page_through_headers(client, admin_headers, job_role_id):
+    params = {"job_role_id": job_role_id, "limit": 2, "count": "exact"}
+    response = client.get("/admin/assessments", params=params, headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "5"
+    assert response.headers["X-Total-Count-Estimated"] == "false"
+
+    seen = [row["id"] for row in response.json()]
+    while "X-Next-Cursor" in response.headers:
+        response = client.get("/admin/assessments", params={**params, "cursor": response.headers["X-Next-Cursor"]},
+                              headers=admin_headers)
+        assert response.status_code == 200
+        seen += [row["id"] for row in response.json()]
+
+    assert len(seen) == len(set(seen)) == 5
+
+@pytest.mark.parametrize("url", ["/admin/candidates", "/admin/assessments", "/admin/job-roles"])
+def test_lists_are_plain_arrays(client, admin_headers, job_role_id, url):
+    response = client.get(url, params={"limit": 1}, headers=admin_headers)
+    assert response.status_code == 200
+    assert isinstance(response.json(), list) and len(response.json()) == 1
+    assert "X-Next-Cursor" in response.headers
+    assert "X-Total-Count" not in response.headers  # only computed on request
@@ -0,0 +1,80 @@
+"""Summary deltas on SQLite through the sync (pysqlite) and async (aiosqlite) drivers"""
+
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import event
+
+import analytics
+from database import AsyncSessionLocal, SessionLocal, async_engine, engine
+from models import AssessmentSummary, JobRole, Tenant
+
+DELTA = {"total_assessments": 1, "completed_assessments": 1, "scored_assessments": 1, "score_sum": 0.5}
+
+@pytest.fixture
+def summary_key(db):
+    suffix = uuid.uuid4().hex[:8]
+    tenant = Tenant(id=f"t-{suffix}", name="Tenant")
+    job_role = JobRole(id=f"jr-{suffix}", tenant_id=tenant.id, title="Engineer", traits_json={})
+    db.add_all([tenant, job_role])
+    db.commit()
+    return tenant.id, job_role.id
+
+@pytest.fixture
+def hide_existing_row():
+    """
+    Make the next summary UPDATE match nothing, as if another transaction
+    created the row after it ran, so the savepoint INSERT hits the unique
+    constraint.
+    """
+    hidden = []
+
+    def rewrite(conn, cursor, statement, parameters, context, executemany):
+        if not hidden and statement.startswith("UPDATE assessment_summaries"):
+            hidden.append(statement)
+            statement = statement.replace(" WHERE ", " WHERE 0 AND ", 1)
+        return statement, parameters
+
+    for target in (engine, async_engine.sync_engine):
+        event.listen(target, "before_cursor_execute", rewrite, retval=True)
+    yield hidden
+    for target in (engine, async_engine.sync_engine):
+        event.remove(target, "before_cursor_execute", rewrite)
+
+def _apply_sync(key, delta):
+    db = SessionLocal()
+    analytics._apply_summary_delta(db, *key, delta)
+    db.commit()
+    db.close()
+
+def _apply_async(key, delta):
+    async def apply():
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(analytics._apply_summary_delta, *key, delta)
+            await db.commit()
+    asyncio.run(apply())
+    asyncio.run(async_engine.dispose())
+
+def _summary(db, key):
+    db.expire_all()
+    return db.query(AssessmentSummary).filter_by(tenant_id=key[0], job_role_id=key[1]).one()
+
+@pytest.mark.parametrize("apply", [_apply_sync, _apply_async], ids=["pysqlite", "aiosqlite"])
+def test_delta_creates_then_increments_row(db, summary_key, apply):
+    apply(summary_key, DELTA)
+    apply(summary_key, DELTA)
+    summary = _summary(db, summary_key)
+    assert (summary.total_assessments, summary.completed_assessments, summary.score_sum) == (2, 2, 1.0)
+
+@pytest.mark.parametrize("apply", [_apply_sync, _apply_async], ids=["pysqlite", "aiosqlite"])
+def test_delta_recovers_from_concurrent_insert(db, summary_key, apply, hide_existing_row):
+    _apply_sync(summary_key, DELTA)
+    hide_existing_row.clear()
+
+    apply(summary_key, DELTA)
+
+    assert hide_existing_row, "the savepoint path was not exercised"
+    summary = _summary(db, summary_key)
+    assert (summary.total_assessments, summary.scored_assessments, summary.score_sum) == (2, 2, 1.0)
+    assert db.query(AssessmentSummary).filter_by(tenant_id=summary_key[0]).count() == 1
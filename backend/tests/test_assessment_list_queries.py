@@ -0,0 +1,42 @@
+"""Listing assessments runs the same number of statements whatever the page size"""
+
+import uuid
+
+import pytest
+
+from models import Assessment, Game, JobRole, Tenant, User
+
+PAGE_SIZES = (1, 50)
+
+@pytest.fixture
+def job_role_id(db):
+    suffix = uuid.uuid4().hex[:8]
+    tenant = Tenant(id=f"t-{suffix}", name="Tenant")
+    games = [Game(id=f"g-{suffix}-{i}", code=f"GAME_{suffix}_{i}", title=f"Game {i}") for i in range(3)]
+    job_role = JobRole(id=f"jr-{suffix}", tenant_id=tenant.id, title="Engineer",
+                       required_games=[g.id for g in games], traits_json={})
+    db.add_all([tenant, job_role, *games])
+    for i in range(max(PAGE_SIZES)):
+        candidate = User(id=f"c-{suffix}-{i}", username=f"candidate-{suffix}-{i}", email=f"c-{suffix}-{i}@example.com",
+                         role="CANDIDATE", full_name=f"Candidate {i}", password_hash="x")
+        db.add(candidate)
+        db.add(Assessment(tenant_id=tenant.id, candidate_id=candidate.id, job_role_id=job_role.id,
+                          status=["NOT_STARTED", "IN_PROGRESS", "COMPLETED"][i % 3], integrity_flags={},
+                          items_total=3, items_submitted=i % 4))
+    db.commit()
+    return job_role.id
+
+def test_list_query_count_is_independent_of_page_size(client, admin_headers, statements, job_role_id):
+    url = f"/assessments/?job_role_id={job_role_id}&limit="
+    # Warm the principal and game catalog caches
+    assert client.get(url + str(max(PAGE_SIZES)), headers=admin_headers).status_code == 200
+
+    counts = {}
+    for limit in PAGE_SIZES:
+        statements.clear()
+        response = client.get(url + str(limit), headers=admin_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = len(statements)
+
+    assert counts[1] == counts[50], counts
@@ -0,0 +1,34 @@
+"""batch_scoring must agree with the per-item scoring functions, including on metrics they reject"""
+
+import numpy as np
+import pytest
+
+import batch_scoring
+from routers.games import GAME_SCORING_FUNCTIONS
+
+STROOP_METRICS = {"correct_responses": 27, "incorrect_responses": 3, "average_response_time": 850, "total_trials": 30}
+
+def test_batch_matches_per_item():
+    rows = [STROOP_METRICS, {**STROOP_METRICS, "average_response_time": 1400.5}, {}]
+    batch = batch_scoring.score_batch("STROOP", batch_scoring.columns_from_metrics("STROOP", rows))
+    for i, metrics in enumerate(rows):
+        assert batch.row(i) == GAME_SCORING_FUNCTIONS["STROOP"](metrics).dict()
+
+@pytest.mark.parametrize("key, value", [
+    ("average_response_time", None),
+    ("average_response_time", "900"),
+    ("correct_responses", "27"),
+])
+def test_malformed_metrics_are_rejected_by_both(key, value):
+    metrics = {**STROOP_METRICS, key: value}
+    with pytest.raises(TypeError):
+        GAME_SCORING_FUNCTIONS["STROOP"](metrics)
+    with pytest.raises(ValueError, match=key):
+        batch_scoring.columns_from_metrics("STROOP", [STROOP_METRICS, metrics])
+    with pytest.raises(ValueError, match=key):
+        batch_scoring.score_batch("STROOP", {key: [850, value]})
+
+@pytest.mark.parametrize("column", [[True, False], np.array([True, False]), np.array(["850", "900"])])
+def test_non_numeric_columns_are_rejected(column):
+    with pytest.raises(ValueError, match="average_response_time"):
+        batch_scoring.score_batch("STROOP", {"average_response_time": column})
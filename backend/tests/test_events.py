@@ -0,0 +1,46 @@
+"""The SSE stream registers its subscriber only while it runs and always removes it"""
+
+import asyncio
+
+import events
+
+def _subscribers():
+    return events.stats()["subscribers"]
+
+def test_stream_unsubscribes_when_closed():
+    async def run():
+        before = _subscribers()
+        stream = events.stream(None, None)
+        assert _subscribers() == before  # nothing registered until the response starts
+        assert await stream.__anext__() == "retry: 3000\n\n"
+        assert _subscribers() == before + 1
+        await stream.aclose()
+        assert _subscribers() == before
+
+    asyncio.run(run())
+
+def test_stream_unsubscribes_when_cancelled():
+    async def run():
+        before = _subscribers()
+        stream = events.stream(None, None)
+        await stream.__anext__()
+        task = asyncio.ensure_future(stream.__anext__())  # waits for the next event
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await stream.aclose()
+        assert _subscribers() == before
+
+    asyncio.run(run())
+
+def test_endpoint_response_dropped_before_streaming_leaves_no_subscriber():
+    from routers.admin import stream_admin_events
+
+    async def run():
+        before = _subscribers()
+        response = await stream_admin_events(tenant_id=None, job_role_id=None, last_event_id=None, current_admin=None)
+        assert _subscribers() == before
+        await response.body_iterator.aclose()
+        assert _subscribers() == before
+
+    asyncio.run(run())
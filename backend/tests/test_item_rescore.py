@@ -0,0 +1,58 @@
+"""Re-scoring a submitted item through POST /games/score keeps the assessment's counters in step"""
+
+import pytest
+
+import game_catalog
+from models import Assessment
+from routers.games import GAME_SCORING_FUNCTIONS
+
+STROOP_METRICS = {"correct_responses": 27, "incorrect_responses": 3, "average_response_time": 850, "total_trials": 30}
+
+def _items(client, headers, assessment_id):
+    items = client.get(f"/assessments/{assessment_id}/items", headers=headers).json()
+    assert len(items) == 2
+    stroop_game_id = game_catalog._catalog.by_code["STROOP"].id
+    return sorted(items, key=lambda item: item["game_id"] != stroop_game_id)  # STROOP item first
+
+def _submit(client, headers, item_id, score):
+    response = client.post(f"/assessments/items/{item_id}/submit", headers=headers, json={"score": score, "metrics_json": {}})
+    assert response.status_code == 200
+
+def _rescore(client, headers, item_id):
+    response = client.post("/games/score", headers=headers,
+                           json={"assessment_item_id": item_id, "raw_metrics": STROOP_METRICS})
+    assert response.status_code == 200
+
+def _assessment(db, assessment_id):
+    db.expire_all()
+    return db.get(Assessment, assessment_id)
+
+def test_rescore_before_completion_counts_in_total(db, client, admin_headers, assessment_id):
+    stroop, other = _items(client, admin_headers, assessment_id)
+    new_score = GAME_SCORING_FUNCTIONS["STROOP"](STROOP_METRICS).score
+
+    _submit(client, admin_headers, stroop["id"], 0.2)
+    _rescore(client, admin_headers, stroop["id"])
+    _submit(client, admin_headers, other["id"], 0.4)
+
+    assessment = _assessment(db, assessment_id)
+    assert assessment.status == "COMPLETED"
+    assert assessment.items_scored == 2
+    assert assessment.score_sum == pytest.approx(new_score + 0.4)
+    assert assessment.total_score == pytest.approx((new_score + 0.4) / 2)
+
+def test_rescore_after_completion_updates_total(db, client, admin_headers, assessment_id):
+    stroop, other = _items(client, admin_headers, assessment_id)
+    new_score = GAME_SCORING_FUNCTIONS["STROOP"](STROOP_METRICS).score
+
+    _submit(client, admin_headers, stroop["id"], 0.2)
+    _submit(client, admin_headers, other["id"], 0.4)
+    assert _assessment(db, assessment_id).total_score == pytest.approx(0.3)
+
+    _rescore(client, admin_headers, stroop["id"])
+
+    assessment = _assessment(db, assessment_id)
+    assert assessment.items_scored == 2
+    assert assessment.total_score == pytest.approx((new_score + 0.4) / 2)
+    board = client.get(f"/admin/leaderboard?job_role_id={assessment.job_role_id}", headers=admin_headers).json()
+    assert [entry["total_score"] for entry in board] == [pytest.approx(assessment.total_score)]
@@ -0,0 +1,47 @@
+"""Malformed telemetry uploads are rejected with 400, not a server error"""
+
+import json
+import math
+
+import pytest
+
+import telemetry
+
+TRIALS = {
+    "timestamp_ms": [1_700_000_000_000, 1_700_000_000_900],
+    "stimulus": ["red", "blue"],
+    "response": ["red", None],
+    "rt_ms": [412.5, None],
+    "correct": [True, False],
+}
+
+MALFORMED = [
+    ("rt_ms", [math.inf, None], "finite"),
+    ("rt_ms", [412.5, -math.inf], "finite"),
+    ("timestamp_ms", [100000000000000000000, 100000000000000000900], "64-bit"),
+    ("timestamp_ms", [-(2 ** 63) - 1, 0], "64-bit"),
+]
+
+@pytest.mark.parametrize("field, values, message", MALFORMED)
+def test_pack_rejects_out_of_range_values(field, values, message):
+    with pytest.raises(ValueError, match=message):
+        telemetry.pack(**{**TRIALS, field: values})
+
+def _item_url(client, headers, assessment_id):
+    item = client.get(f"/assessments/{assessment_id}/items", headers=headers).json()[0]
+    return f"/assessments/items/{item['id']}/telemetry"
+
+def test_upload_round_trips(client, admin_headers, assessment_id):
+    url = _item_url(client, admin_headers, assessment_id)
+    assert client.post(url, headers=admin_headers, json=TRIALS).status_code == 200
+    trials = client.get(url, params={"include_trials": True}, headers=admin_headers).json()["trials"]
+    assert trials == {**TRIALS, "rt_ms": [412.0, None]}
+
+@pytest.mark.parametrize("field, values, message", MALFORMED)
+def test_upload_rejects_out_of_range_values(client, admin_headers, assessment_id, field, values, message):
+    url = _item_url(client, admin_headers, assessment_id)
+    # Python's json accepts Infinity, as do clients that serialize it
+    body = json.dumps({**TRIALS, field: values})
+    response = client.post(url, headers={**admin_headers, "Content-Type": "application/json"}, content=body)
+    assert response.status_code == 400
+    assert message in response.json()["detail"]
@@ -0,0 +1,87 @@
+"""
+alembic upgrade head on a database with the original schema (the checked-in
+test.db) yields the schema the models declare, and the hot lookups are
+planned as index searches on it.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+
+from conftest import BACKEND_DIR
+from database import Base
+from models import Assessment, AssessmentItem, AuditLog, User
+
+@pytest.fixture(scope="module")
+def upgraded_engine(tmp_path_factory):
+    path = tmp_path_factory.mktemp("migrations") / "upgraded.db"
+    shutil.copy(os.path.join(BACKEND_DIR, "test.db"), path)
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "upgrade", "head"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{path}"},
+        check=True,
+        capture_output=True
+    )
+    engine = create_engine(f"sqlite:///{path}")
+    yield engine
+    engine.dispose()
+
+def test_upgrade_head_matches_models(upgraded_engine):
+    inspector = inspect(upgraded_engine)
+    for table in Base.metadata.sorted_tables:
+        assert inspector.has_table(table.name), table.name
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        assert set(table.columns.keys()) <= columns, table.name
+        indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+        assert {i.name for i in table.indexes} <= indexes, table.name
+
+# (indexes that may serve the lookup, query)
+HOT_LOOKUPS = [
+    (
+        ("ix_assessments_candidate_status_created",),
+        select(Assessment).where(
+            Assessment.candidate_id == "c1",
+            Assessment.status.in_(["NOT_STARTED", "IN_PROGRESS"])
+        ).order_by(Assessment.created_at.desc())
+    ),
+    (
+        # The leaderboard's (job_role_id, total_score) index has the same prefix
+        ("ix_assessments_job_role_id", "ix_assessments_job_role_score"),
+        select(Assessment).where(Assessment.job_role_id == "jr1")
+    ),
+    (
+        ("ix_assessment_items_assessment_order",),
+        select(AssessmentItem).where(AssessmentItem.assessment_id == "a1").order_by(AssessmentItem.order_index)
+    ),
+    (("ix_assessment_items_game_id",), select(AssessmentItem).where(AssessmentItem.game_id == "g1")),
+    (
+        ("ix_audit_logs_actor_created",),
+        select(AuditLog).where(AuditLog.actor_user_id == "u1").order_by(AuditLog.created_at.desc())
+    ),
+    (("ix_users_job_role_id",), select(User).where(User.job_role_id == "jr1")),
+]
+
+@pytest.mark.parametrize("indexes, query", HOT_LOOKUPS, ids=[indexes[0] for indexes, _ in HOT_LOOKUPS])
+def test_hot_lookup_uses_index(upgraded_engine, indexes, query):
+    compiled = query.compile(dialect=upgraded_engine.dialect, compile_kwargs={"literal_binds": True})
+    with upgraded_engine.connect() as connection:
+        plan = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}")]
+    assert any(f"INDEX {index} " in step for step in plan for index in indexes), plan
+    assert not any(step.startswith("SCAN") for step in plan), plan
+
+def test_upgrade_backfills_assessment_summaries(upgraded_engine):
+    with upgraded_engine.connect() as connection:
+        expected = connection.exec_driver_sql(
+            "SELECT tenant_id, job_role_id, COUNT(*), SUM(status = 'COMPLETED') FROM assessments "
+            "GROUP BY tenant_id, job_role_id"
+        ).all()
+        summaries = connection.exec_driver_sql(
+            "SELECT tenant_id, job_role_id, total_assessments, completed_assessments FROM assessment_summaries"
+        ).all()
+    assert expected
+    assert sorted(summaries, key=repr) == sorted(expected, key=repr)
@@ -0,0 +1,51 @@
+"""norms.record_score drops the game's cached norms only once its transaction commits"""
+
+import uuid
+
+import pytest
+
+import norms
+from models import Game
+
+@pytest.fixture
+def game_id(db):
+    game = Game(code=f"G-{uuid.uuid4().hex[:8]}", title="Game")
+    db.add(game)
+    db.commit()
+    return game.id
+
+def _cached_count(db, game_id):
+    return norms.get_game_norms(db, game_id).overall.count
+
+def test_cache_dropped_after_commit(db, game_id):
+    assert _cached_count(db, game_id) == 0
+
+    norms.record_score(db, game_id, None, 0.5)
+    db.flush()
+    # Other requests keep reading the committed norms until the submit commits
+    assert _cached_count(db, game_id) == 0
+
+    db.commit()
+    assert _cached_count(db, game_id) == 1
+
+def test_cache_kept_after_rollback(db, game_id):
+    norms.record_score(db, game_id, None, 0.5)
+    db.commit()
+    assert _cached_count(db, game_id) == 1
+
+    norms.record_score(db, game_id, None, 0.7)
+    db.rollback()
+    assert norms._STALE_KEY not in db.info
+    assert _cached_count(db, game_id) == 1
+
+def test_load_racing_a_commit_is_not_cached(db, game_id, monkeypatch):
+    load = norms._load
+
+    def load_then_commit_elsewhere(session, game_id):
+        loaded = load(session, game_id)
+        norms.invalidate(game_id)  # a submit committed while this read was in flight
+        return loaded
+
+    monkeypatch.setattr(norms, "_load", load_then_commit_elsewhere)
+    norms.get_game_norms(db, game_id)
+    assert game_id not in norms._snapshots
@@ -0,0 +1,28 @@
+"""rescore_items._rescore_chunk: which items are skipped, which fail"""
+
+import logging
+
+import pytest
+
+import rescore_items
+
+GAME_CODES = {"g-stroop": "STROOP", "g-other": "MEMORY_MATCH"}
+SCORED = {"correct_responses": 27, "incorrect_responses": 3, "average_response_time": 850, "server_scoring": {}}
+
+@pytest.mark.parametrize("game_id, metrics, expected", [
+    ("g-other", SCORED, (0, 1, 0)),
+    ("g-stroop", None, (0, 1, 0)),
+    ("g-stroop", {}, (0, 1, 0)),
+    ("g-stroop", {"correct_responses": 27}, (0, 1, 0)),
+    ("g-stroop", 5, (0, 0, 1)),
+    ("g-stroop", [], (0, 0, 1)),
+    ("g-stroop", ["server_scoring"], (0, 0, 1)),
+    ("g-stroop", "server_scoring", (0, 0, 1)),
+    ("g-stroop", {**SCORED, "average_response_time": None}, (0, 0, 1)),
+    ("g-stroop", {**SCORED, "correct_responses": "27"}, (0, 0, 1)),
+])
+def test_unscorable_items_are_skipped_or_failed(game_id, metrics, expected, caplog):
+    # Nothing is re-scored, so no UPDATE is issued and no session is needed
+    with caplog.at_level(logging.WARNING, logger=rescore_items.logger.name):
+        assert rescore_items._rescore_chunk(None, [("item-1", game_id, metrics)], GAME_CODES) == expected
+    assert ("item-1" in caplog.text) == bool(expected[2])
@@ -0,0 +1,97 @@
+"""
+Process-local set of revoked token JTIs
+
+Logged-out tokens are persisted in blacklisted_tokens. Instead of querying that
+table on every authenticated request, each worker keeps the non-expired JTIs in
+memory and pulls newly revoked rows incrementally (by created_at) at most once
+per REVOCATION_SYNC_INTERVAL_SECONDS. Entries are dropped once the token's own
+expiry has passed, and expired rows are purged from the table in the background.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from database import AsyncSessionLocal
+from models import BlacklistedToken
+
+# Seconds between incremental syncs of tokens revoked by other workers
+REVOCATION_SYNC_INTERVAL_SECONDS = float(os.getenv("REVOCATION_SYNC_INTERVAL_SECONDS", "5"))
+
+# Seconds between background purges of expired blacklisted_tokens rows
+REVOCATION_PURGE_INTERVAL_SECONDS = float(os.getenv("REVOCATION_PURGE_INTERVAL_SECONDS", "3600"))
+
+# Re-read rows slightly older than the watermark so that rows committed late,
+# or stored with second precision (SQLite func.now()), are not missed
+_SYNC_OVERLAP = timedelta(seconds=2)
+
+_lock = threading.Lock()
+_revoked: Dict[str, datetime] = {}
+_watermark: Optional[datetime] = None
+_next_sync_at = 0.0
+
+def sync(db: Session):
+    """Load tokens revoked since the last sync (everything on the first call)"""
+    global _watermark, _next_sync_at
+
+    now = datetime.utcnow()
+    query = db.query(
+        BlacklistedToken.token_jti,
+        BlacklistedToken.expires_at,
+        BlacklistedToken.created_at
+    ).filter(BlacklistedToken.expires_at > now)
+
+    watermark = _watermark
+    if watermark is not None:
+        query = query.filter(BlacklistedToken.created_at >= watermark - _SYNC_OVERLAP)
+
+    rows = query.all()
+
+    with _lock:
+        for jti, expires_at, created_at in rows:
+            _revoked[jti] = expires_at
+            if created_at and (_watermark is None or created_at > _watermark):
+                _watermark = created_at
+        if _watermark is None:
+            _watermark = now
+
+        for jti in [jti for jti, expires_at in _revoked.items() if expires_at <= now]:
+            del _revoked[jti]
+
+        _next_sync_at = time.monotonic() + REVOCATION_SYNC_INTERVAL_SECONDS
+
+async def is_revoked(db: AsyncSession, jti: str) -> bool:
+    """Check a JTI against the in-memory set, syncing first if it is stale"""
+    if time.monotonic() >= _next_sync_at:
+        await db.run_sync(sync)
+
+    with _lock:
+        expires_at = _revoked.get(jti)
+    return expires_at is not None and expires_at > datetime.utcnow()
+
+def revoke(jti: str, expires_at: datetime):
+    """Record a token revoked by this worker (after its blacklist row is committed)"""
+    with _lock:
+        _revoked[jti] = expires_at
+
+def purge_expired(db: Session) -> int:
+    """Delete expired blacklisted_tokens rows; returns the number deleted"""
+    count = db.query(BlacklistedToken).filter(
+        BlacklistedToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return count
+
+async def run_purge_loop():
+    """Background task that periodically purges expired blacklisted tokens"""
+    while True:
+        await asyncio.sleep(REVOCATION_PURGE_INTERVAL_SECONDS)
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.run_sync(purge_expired)
+        except Exception as e:
+            print(f"Error purging expired tokens: {e}")